@@ -1,23 +1,46 @@
 """Defines Snapshot Impact Analysis object."""
 
+import json
 import os
 import logging
-import math
 import re
+import tempfile
 
 import numpy as np
+import pandas as pd
 from pandas import DataFrame
 
 from jade.utils.utils import dump_data
 from PyDSS.pydss_results import PyDssResults
 from disco.analysis import Analysis, Input
-from disco.exceptions import AnalysisRunException
+from disco.exceptions import AnalysisConfigurationException, AnalysisRunException
 from disco.extensions.pydss_simulation.pydss_configuration import PyDssConfiguration
 from disco.utils.custom_type import CustomType
 
 
 logger = logging.getLogger(__name__)
 
+BASE_CASE_VOLTAGES_FILENAME = "base-case-bus-voltages.npz"
+RESULTS_DATASET_DIRNAME = "snapshot-impact-analysis-results"
+OUTPUT_FORMATS = ("csv", "feather")
+ELEMENT_LOADINGS_DIRNAME = "snapshot-element-loadings"
+ELEMENT_LOADINGS_FILENAME = "element-loadings.npz"
+_NAMES_SUFFIX = "__names"
+
+_FLOAT_RESULT_COLUMNS = {
+    'pv_kw',
+    'pv_pmpp',
+    'peak_load',
+    'pv_to_load_ratio',
+    'min_voltage',
+    'max_voltage',
+    'max_voltage_deviation',
+    'max_line',
+    'max_xfmr_loading',
+}
+
+_REGEX_ELEMENT_COLUMN = re.compile(r"^(.+)__[ABCN]\d+(?:__\w+)?(?: \[.*\])?$")
+
 class SnapshotImpactAnalysis(Analysis):
     """Snapshot impact analysis class with default values"""
     INPUTS = [
@@ -29,10 +52,13 @@ class SnapshotImpactAnalysis(Analysis):
         Input('line_overload_2', CustomType('percent'), 100),
         Input('transformer_overload_1', CustomType('percent'), 100),
         Input('transformer_overload_2', CustomType('percent'), 100),
+        Input('output_format', CustomType(str), 'csv'),
+        Input('export_element_loadings', CustomType(bool), False),
     ]
 
     def __init__(self, *args, **kwargs):
         self._include_voltage_deviation = False
+        self._element_loadings = {}
         super(SnapshotImpactAnalysis, self).__init__(*args, **kwargs)
 
     def run(self, output, **kwargs):
@@ -41,17 +67,28 @@ class SnapshotImpactAnalysis(Analysis):
         Parameters
         ----------
         output : directory containing job outputs
+        config : PyDssConfiguration
+            (optional) already-deserialized configuration of the jobs
 
         """
-        base_config = os.path.join(output, '..', 'config.json')
-        config = PyDssConfiguration.deserialize(base_config)
+        output_format = self.get_input('output_format').current_value
+        if output_format not in OUTPUT_FORMATS:
+            raise AnalysisConfigurationException(
+                f"output_format={output_format} must be one of {OUTPUT_FORMATS}"
+            )
+
+        config = kwargs.get("config")
+        if config is None:
+            base_config = os.path.join(output, '..', 'config.json')
+            # Only this job and its base case are needed; don't deserialize every job.
+            config = PyDssConfiguration.deserialize_lazily(base_config)
         job = config.get_job(self._job_name)
         simulation = config.create_from_result(job, output)
         results = PyDssResults(simulation.pydss_project_path)
         scenario = results.scenarios[0]
 
-        # get base scenario, if there is one
-        base_scenario = None
+        # get base case voltages, if there is a base case
+        base_voltages = None
         self._include_voltage_deviation = job.model.include_voltage_deviation
 
         if self._include_voltage_deviation:
@@ -73,10 +110,19 @@ class SnapshotImpactAnalysis(Analysis):
             if base_case != self._job_name:
                 base_job = config.get_feeder_job(job.model.deployment.feeder, base_case)
                 base_simulation = config.create_from_result(base_job, output)
-                base_results = PyDssResults(base_simulation.pydss_project_path)
-                base_scenario = base_results.scenarios[0]
+                base_voltages = _get_base_case_voltages(base_simulation, base_job.name, output)
+
+        bus_voltages = _read_bus_voltages(scenario)
+        if self._include_voltage_deviation and job.model.base_case == job.name:
+            # Later jobs on this feeder compare against these voltages.
+            _write_base_case_voltages(
+                os.path.join(output, job.name, BASE_CASE_VOLTAGES_FILENAME),
+                job.name,
+                os.path.getmtime(simulation.pydss_store_filename),
+                bus_voltages,
+            )
 
-        voltage_violations = self._run_voltage_violations(scenario, base_scenario)
+        voltage_violations = self._run_voltage_violations(scenario, bus_voltages, base_voltages)
         line_loading = self._run_line_loading(scenario)
         transformer_loading = self._run_transformer_loading(scenario)
 
@@ -84,6 +130,22 @@ class SnapshotImpactAnalysis(Analysis):
                                           transformer_loading)
 
         self._add_to_results('violations', results)
+        if self.get_input('export_element_loadings').current_value:
+            write_element_loadings(
+                os.path.join(output, ELEMENT_LOADINGS_DIRNAME),
+                job.feeder,
+                job.name,
+                self._element_loadings,
+            )
+
+        if output_format == "feather":
+            # One typed part per job instead of two small files per job; the merge
+            # stage concatenates each feeder's parts.
+            results['name'] = job.name
+            results['feeder_head_info'] = json.dumps(scenario.read_feeder_head_info())
+            write_results_dataset_part(os.path.join(output, RESULTS_DATASET_DIRNAME), results)
+            return
+
         # output to csv
         result_df = DataFrame(columns=results.keys())
         result_df.loc[0] = results
@@ -105,27 +167,24 @@ class SnapshotImpactAnalysis(Analysis):
             logger.exception("read_feeder_head_info failed")
             raise
 
-    def _run_voltage_violations(self, scenario, base_scenario):
+    def _run_voltage_violations(self, scenario, bus_voltages, base_voltages):
         """Run voltage violations from hosting capacity analysis
 
         Parameters
         ----------
         scenario : ValuesByPropertyAcrossElementsResults
+        bus_voltages : DataFrame
+            bus voltages of the scenario, from _read_bus_voltages
+        base_voltages : DataFrame | None
+            bus voltages of the base case, if comparing against one
 
         """
-        # just one terminal, all phases
-        bus_voltages = self._normalize_dataframe_values(scenario, 'Buses', 'puVmagAngle', 1,
-                                                        mag_ang='mag')
-
-        vmin, vmax, uv1, ov1, uv_count1, ov_count1, uv2, ov2, uv_count2, ov_count2 = \
-            _check_voltage_violations(
-                # TODO dynamically grab all phases, 1 terminal
-                bus_voltages['Value'],
-                self.get_input('over_voltage').current_value,
-                self.get_input('under_voltage').current_value,
-                self.get_input('over_voltage_conservative').current_value,
-                self.get_input('under_voltage_conservative').current_value
-            )
+        voltage_bands = self._get_voltage_bands()
+        vmin, vmax, band_violations = _count_voltage_violations(
+            # TODO dynamically grab all phases, 1 terminal
+            bus_voltages['Value'].values,
+            list(voltage_bands.values()),
+        )
 
         total_pv_kw = None
         total_pv_pmpp = None
@@ -144,15 +203,12 @@ class SnapshotImpactAnalysis(Analysis):
             'pv_to_load_ratio': pv_to_load_ratio,
             'min_voltage': vmin,
             'max_voltage': vmax,
-            'undervoltage_A_flag': uv1,
-            'overvoltage_A_flag': ov1,
-            'undervoltage_A_count': uv_count1,
-            'overvoltage_A_count': ov_count1,
-            'undervoltage_B_flag': uv2,
-            'overvoltage_B_flag': ov2,
-            'undervoltage_B_count': uv_count2,
-            'overvoltage_B_count': ov_count2
         }
+        for label, (uv, ov, uv_count, ov_count) in zip(voltage_bands, band_violations):
+            violations[f'undervoltage_{label}_flag'] = uv
+            violations[f'overvoltage_{label}_flag'] = ov
+            violations[f'undervoltage_{label}_count'] = uv_count
+            violations[f'overvoltage_{label}_count'] = ov_count
 
         # ensure that deviation indices are set (base scenarios)
         if self._include_voltage_deviation:
@@ -160,9 +216,7 @@ class SnapshotImpactAnalysis(Analysis):
             violations['voltage_deviation_flag'] = None
             violations['voltage_deviation_count'] = None
 
-        if base_scenario is not None:
-            base_voltages = self._normalize_dataframe_values(base_scenario, 'Buses', 'puVmagAngle',
-                                                             1, mag_ang='mag')
+        if base_voltages is not None:
             voltage_deviation, voltage_deviation_flag, voltage_deviation_count = _compare_voltages(
                 base_voltages['Value'],
                 bus_voltages['Value']
@@ -174,6 +228,26 @@ class SnapshotImpactAnalysis(Analysis):
 
         return violations
 
+    def _get_voltage_bands(self):
+        """Return the voltage bands checked for violations, keyed by label.
+
+        Returns
+        -------
+        dict
+            label : (lower bound, upper bound) in per unit
+
+        """
+        return {
+            'A': (
+                self.get_input('under_voltage').current_value,
+                self.get_input('over_voltage').current_value,
+            ),
+            'B': (
+                self.get_input('under_voltage_conservative').current_value,
+                self.get_input('over_voltage_conservative').current_value,
+            ),
+        }
+
     def _run_line_loading(self, scenario):
         """Run line loading from hosting capacity analysis
 
@@ -184,10 +258,10 @@ class SnapshotImpactAnalysis(Analysis):
         """
         # just one terminal, all phases
 
-        lines_currents_dataframe = self._normalize_dataframe_values(scenario, "Lines", "Currents",
-                                                                    1, convert=True)
+        lines_currents_dataframe = _read_element_values(scenario, "Lines", "Currents", 1,
+                                                        convert=True)
 
-        _, max_line_loading, lo1, lv_count1, lo2, lv_count2 = \
+        line_loadings, max_line_loading, lo1, lv_count1, lo2, lv_count2 = \
             _get_line_loading(
                 lines_currents_dataframe,
                 scenario.get_full_dataframe("Lines", "NormalAmps"),
@@ -195,8 +269,8 @@ class SnapshotImpactAnalysis(Analysis):
                 self.get_input('line_overload_1').current_value,
                 self.get_input('line_overload_2').current_value
             )
+        self._element_loadings['lines'] = line_loadings
         line_loading = {
-            # 'line_loadings': line_loadings,
             'max_line': max_line_loading,
             '1X_line_overloading_flag': lo1,
             '1X_line_overloading_count': lv_count1,
@@ -214,23 +288,24 @@ class SnapshotImpactAnalysis(Analysis):
         scenario : ValuesByPropertyAcrossElementsResults
 
         """
-        transformers_df = scenario.read_element_info_file("Transformers")
-        transformers_phase_info_df = scenario.read_element_info_file("TransformersPhase")
-        transformers_currents_df = self._normalize_dataframe_values(scenario, "Transformers",
-                                                                    "Currents", 1, convert=True)
+        transformer_index = _make_transformer_index(
+            scenario.read_element_info_file("Transformers"),
+            scenario.read_element_info_file("TransformersPhase"),
+        )
+        transformers_currents_df = _read_element_values(scenario, "Transformers", "Currents", 1,
+                                                        convert=True)
         transformers_normal_amps_df = scenario.get_full_dataframe("Transformers", "NormalAmps")
 
-        _, max_xfmr_loading, to1, tv_count1, to2, tv_count2 = \
+        xfmr_loading_s, max_xfmr_loading, to1, tv_count1, to2, tv_count2 = \
             _get_transformer_loading(
-                transformers_df,
-                transformers_phase_info_df,
+                transformer_index,
                 transformers_currents_df,
                 transformers_normal_amps_df,
                 self.get_input('transformer_overload_1').current_value,
                 self.get_input('transformer_overload_2').current_value
             )
+        self._element_loadings['transformers'] = xfmr_loading_s
         transformer_loading = {
-            # 'xfmr_loading_s': xfmr_loading_s,
             'max_xfmr_loading': max_xfmr_loading,
             '1X_xfmr_overloading_flag': to1,
             '1X_xfmr_overloading_count': tv_count1,
@@ -240,143 +315,255 @@ class SnapshotImpactAnalysis(Analysis):
 
         return transformer_loading
 
-    def _normalize_dataframe_values(self, scenario, class_name, property_name, terminal=None,
-                                    convert=False, **kwargs):
-        """Normalize dataframe columns to row values
 
-        Parameters
-        ----------
-        scenario : ValuesByPropertyAcrossElementsResults
-        class_name : str
-        property_name : str
-        terminal : int
-        convert : bool
-            (optional) convert values to Magnitude
-        **kwargs : dict
-            any extra named parameters (mag_ang, etc) to be passed to get_dataframe
+def _read_element_values(scenario, class_name, property_name, terminal=None, convert=False,
+                         **kwargs):
+    """Read one property for all elements of a class into long format.
 
-        Returns
-        -------
-        results_dataframe : DataFrame
+    The whole dataset is read with one call instead of one read per element.
 
-        """
-        results_list = list()
-        phase_terminal = None
-        if terminal is not None:
-            phase_terminal = re.compile(rf"[ABCN]{terminal}")
+    Parameters
+    ----------
+    scenario : ValuesByPropertyAcrossElementsResults
+    class_name : str
+    property_name : str
+    terminal : int
+    convert : bool
+        (optional) convert values to Magnitude
+    **kwargs : dict
+        any extra named parameters (mag_ang, etc) to be passed to get_full_dataframe
 
-        for element in scenario.list_element_names(class_name, property_name):
-            dataframe = scenario.get_dataframe(class_name, property_name, element,
-                                               phase_terminal=phase_terminal, **kwargs)
-            for column in dataframe.columns:
-                value = dataframe[column].values.item()
-                result = {'Name': element, 'PhaseTerminal': column, 'Value': value}
+    Returns
+    -------
+    results_dataframe : DataFrame
+        columns Name, PhaseTerminal, Value; one row per element phase
 
-                if convert:
-                    complex_number = complex(value)
-                    result['Value'] = math.sqrt(complex_number.real**2 + complex_number.imag**2)
+    """
+    if terminal is not None:
+        kwargs["phase_terminal"] = re.compile(rf"[ABCN]{terminal}")
 
-                results_list.append(result)
+    dataframe = scenario.get_full_dataframe(class_name, property_name, **kwargs)
+    if len(dataframe) != 1:
+        raise AnalysisRunException(
+            f"expected one time point for {class_name}/{property_name}, got {len(dataframe)}"
+        )
 
-        columns = ['Name', 'PhaseTerminal', 'Value']
-        return DataFrame(results_list, columns=columns)
+    # Columns are '<element>__<phase_terminal>[__<option>] [<units>]'; anything else,
+    # such as index columns, is not element data.
+    names = dataframe.columns.str.extract(_REGEX_ELEMENT_COLUMN, expand=False)
+    columns = dataframe.columns[names.notna()]
+    values = dataframe[columns].to_numpy().reshape(-1)
+    if convert:
+        values = np.abs(values.astype(complex))
 
+    return DataFrame({
+        'Name': names.dropna().values,
+        'PhaseTerminal': columns.values,
+        'Value': values,
+    })
 
-# TODO: refactor to take in the scenario here instead of remaking it in analysis.py
-def _check_voltage_violations(bus_voltages, ub1=1.05, lb1=0.95, ub2=1.05833, lb2=0.91667):
-    vmax = max(bus_voltages)
-    vmin = min(bus_voltages)
-    uv_count1 = len([v for v in bus_voltages if v < lb1])
-    ov_count1 = len([v for v in bus_voltages if v > ub1])
-    uv_count2 = len([v for v in bus_voltages if v < lb2])
-    ov_count2 = len([v for v in bus_voltages if v > ub2])
 
-    ov1 = vmax > ub1
-    uv1 = vmin < lb1
-    ov2 = vmax > ub2
-    uv2 = vmin < lb2
+def _read_bus_voltages(scenario):
+    # just one terminal, all phases
+    return _read_element_values(scenario, 'Buses', 'puVmagAngle', 1, mag_ang='mag')
 
-    return vmin, vmax, uv1, ov1, uv_count1, ov_count1, uv2, ov2, uv_count2, ov_count2
+
+def _get_base_case_voltages(simulation, job_name, output):
+    """Return the bus voltages of a base case job.
+
+    The voltages are read from the cache file in the job's output directory if
+    it was written from the current results; otherwise they are read from the
+    PyDSS results and the cache file is rewritten.
+
+    Parameters
+    ----------
+    simulation : PyDssSimulation
+    job_name : str
+    output : str
+        directory containing job outputs
+
+    Returns
+    -------
+    DataFrame
+
+    """
+    filename = os.path.join(output, job_name, BASE_CASE_VOLTAGES_FILENAME)
+    mtime = os.path.getmtime(simulation.pydss_store_filename)
+    voltages = _read_base_case_voltages(filename, job_name, mtime)
+    if voltages is None:
+        results = PyDssResults(simulation.pydss_project_path)
+        voltages = _read_bus_voltages(results.scenarios[0])
+        _write_base_case_voltages(filename, job_name, mtime, voltages)
+
+    return voltages
+
+
+def _read_base_case_voltages(filename, job_name, mtime):
+    """Return the cached base case voltages or None if the cache is missing or stale."""
+    if not os.path.exists(filename):
+        return None
+
+    with np.load(filename, allow_pickle=False) as data:
+        if str(data["job_name"]) != job_name or float(data["mtime"]) != mtime:
+            logger.info("Base case voltage cache %s is stale", filename)
+            return None
+        logger.debug("Read base case voltages from %s", filename)
+        return DataFrame({
+            'Name': data["names"],
+            'PhaseTerminal': data["phase_terminals"],
+            'Value': data["values"],
+        })
+
+
+def _write_base_case_voltages(filename, job_name, mtime, voltages):
+    # Jobs for the same feeder can run concurrently; make the write atomic.
+    tmp_filename = f"{filename}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_filename, "wb") as f_out:
+            np.savez(
+                f_out,
+                job_name=np.array(job_name),
+                mtime=np.array(mtime),
+                names=voltages['Name'].to_numpy(dtype=str),
+                phase_terminals=voltages['PhaseTerminal'].to_numpy(dtype=str),
+                values=voltages['Value'].to_numpy(dtype=float),
+            )
+        os.replace(tmp_filename, filename)
+    except Exception:
+        if os.path.exists(tmp_filename):
+            os.remove(tmp_filename)
+        raise
+    logger.debug("Wrote base case voltages to %s", filename)
+
+
+def _count_voltage_violations(bus_voltages, bands):
+    """Count under/over voltage violations for any number of voltage bands.
+
+    The voltages are sorted once and every band boundary is located with a
+    binary search, so adding bands does not add passes over the voltages.
+
+    Parameters
+    ----------
+    bus_voltages : numpy.ndarray
+    bands : list
+        list of (lower bound, upper bound) tuples
+
+    Returns
+    -------
+    tuple
+        (vmin, vmax, violations) where violations is a list aligned with bands
+        of (undervoltage flag, overvoltage flag, undervoltage count,
+        overvoltage count)
+
+    """
+    voltages = np.sort(np.asarray(bus_voltages, dtype=float))
+    if voltages.size == 0:
+        raise ValueError("bus_voltages is empty")
+    vmin = voltages[0]
+    vmax = voltages[-1]
+    lower, upper = (np.array(x, dtype=float) for x in zip(*bands))
+    uv_counts = np.searchsorted(voltages, lower, side="left")
+    ov_counts = len(voltages) - np.searchsorted(voltages, upper, side="right")
+
+    violations = [
+        (vmin < lb, vmax > ub, int(uv_count), int(ov_count))
+        for lb, ub, uv_count, ov_count in zip(lower, upper, uv_counts, ov_counts)
+    ]
+    return vmin, vmax, violations
 
 
 # TODO: refactor to take in the scenario here instead of remaking it in analysis.py
 def _get_line_loading(line_currents_df, line_normalamps_df, deployment_name, ub1=1.0, ub2=1.5):
-    line_loadings = {}
-    lv_count1 = 0
-    lv_count2 = 0
-
-    # loop through unique line names
-    for line in line_currents_df.Name.unique():
-        current_mag = []
-        # filter out only results with current line name
-        line_currents = line_currents_df.query(f"Name == '{line}'")
-        nphases = int(len(line_currents))
-        # loop through line's magnitudes
-        for _, magnitude in line_currents.iterrows():
-            current_mag.append(magnitude['Value'] / line_normalamps_df.iloc[0][f"{line}__NormalAmps"])
-
-        # TODO Kwami: how can this be empty?  That occurred in sb100/2045/Q.
-        # deployment_name is only being passed in to debug this problem.
-        if not current_mag:
-            line_loadings[line] = 0.0
-            logger.error("current_mag was empty, set line_loadings=0.0 "
-                         "nphases=%s lencolumns=%s deployment_name=%s line=%s",
-                         nphases, len(line_currents_df.keys()), deployment_name, line)
-        else:
-            line_loadings[line] = max(current_mag)
-            if max(current_mag) > ub1:
-                lv_count1 += 1
-            if max(current_mag) > ub2:
-                lv_count2 += 1
-
-    max_line_loading = max(list(line_loadings.values()))
+    names, max_loadings = _get_max_loadings(line_currents_df, line_normalamps_df)
+    line_loadings = dict(zip(names, max_loadings))
+    max_line_loading = np.max(max_loadings)
+    lv_count1 = int(np.count_nonzero(max_loadings > ub1))
+    lv_count2 = int(np.count_nonzero(max_loadings > ub2))
     lo1 = max_line_loading > ub1
     lo2 = max_line_loading > ub2
 
     return line_loadings, max_line_loading, lo1, lv_count1, lo2, lv_count2
 
 
+def _get_max_loadings(currents_df, normalamps_df):
+    """Return the maximum per-unit loading of each element across its phases.
+
+    Parameters
+    ----------
+    currents_df : DataFrame
+        long-format current magnitudes with columns Name, PhaseTerminal, Value
+    normalamps_df : DataFrame
+        one row with a column named '<element>__NormalAmps' per element
+
+    Returns
+    -------
+    tuple
+        (names, max_loadings) where names is an array of element names in
+        order of first appearance and max_loadings is the aligned array of
+        maximum loadings
+
+    """
+    if currents_df.empty:
+        return np.array([], dtype=object), np.array([], dtype=float)
+
+    codes, names = pd.factorize(currents_df["Name"], sort=False)
+    normal_amps = normalamps_df.iloc[0][[f"{x}__NormalAmps" for x in names]].values
+    loadings = currents_df["Value"].values / normal_amps.astype(float)[codes]
+
+    # Group the rows by element and reduce each contiguous group with max.
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(len(names)))
+    max_loadings = np.maximum.reduceat(loadings[order], starts)
+
+    return np.asarray(names), max_loadings
+
+
+def _make_transformer_index(transformer_dataframe, highside_phase_conn_dataframe):
+    """Return transformer winding/phase info indexed by full transformer name.
+
+    Parameters
+    ----------
+    transformer_dataframe : DataFrame
+        Transformers element info; Name does not include the class prefix.
+    highside_phase_conn_dataframe : DataFrame
+        TransformersPhase element info; Transformer includes the class prefix.
+
+    Returns
+    -------
+    DataFrame
+        columns NumWindings, HighSideConnection, NumPhases
+
+    """
+    transformers = transformer_dataframe.drop_duplicates("Name")
+    windings = pd.Series(
+        transformers["NumWindings"].values,
+        index="Transformer." + transformers["Name"],
+        name="NumWindings",
+    )
+    phase_info = highside_phase_conn_dataframe.drop_duplicates("Transformer").set_index(
+        "Transformer"
+    )[["HighSideConnection", "NumPhases"]]
+    index = phase_info.join(windings, how="inner")
+    return index[["NumWindings", "HighSideConnection", "NumPhases"]]
+
+
 # TODO: refactor to take in the scenario here instead of remaking it in analysis.py
-def _get_transformer_loading(transformer_dataframe, highside_phase_conn_dataframe,
-                            transformer_currents_dataframe, transformer_normalamps_dataframe,
-                            ub1=1.0, ub2=1.5):
-    xfmr_loading_s = {}
-    tv_count1 = 0
-    tv_count2 = 0
-
-    # loop through unique line names
-    for xfmr in transformer_currents_dataframe.Name.unique():
-        current_mag = []
-        transformer_name = xfmr.replace('Transformer.', '')
-        # find transformer data in given dataframes
-        transformer = transformer_dataframe.query(f"Name == '{transformer_name}'").iloc[0]
-        transformer_phase = highside_phase_conn_dataframe.query(f"Transformer == '{xfmr}'").iloc[0]
-        transformer_currents = transformer_currents_dataframe.query(f"Name == '{xfmr}'")
-
-        # set variables necessary
-        # TODO: really this shouldn't be necessary, since the dataframe will only have
-        # the phases needed when passed in
-        nwindings = transformer["NumWindings"]
-        high_side_connection = transformer_phase["HighSideConnection"]
-        num_phases = int(transformer_phase["NumPhases"])
-        phase = len(transformer_currents)
-
-        if num_phases == 3 and high_side_connection == "wye":
-            phase = 4
-        elif num_phases == 3 and high_side_connection == "delta":
-            phase = 3
-
-        for _, magnitude in transformer_currents.iterrows():
-            normal_amps = transformer_normalamps_dataframe.iloc[0][f"{xfmr}__NormalAmps"]
-            current_mag.append(magnitude['Value'] / normal_amps)
-
-        xfmr_loading_s[xfmr] = max(current_mag)
-        if max(current_mag) > ub1:
-            tv_count1 += 1
-        if max(current_mag) > ub2:
-            tv_count2 += 1
-
-    max_xfmr_loading = max(list(xfmr_loading_s.values()))
+def _get_transformer_loading(transformer_index, transformer_currents_dataframe,
+                             transformer_normalamps_dataframe, ub1=1.0, ub2=1.5):
+    missing = set(transformer_currents_dataframe["Name"].unique()).difference(
+        transformer_index.index
+    )
+    if missing:
+        raise AnalysisRunException(
+            f"transformers are missing from element info files: {sorted(missing)}"
+        )
+
+    names, max_loadings = _get_max_loadings(transformer_currents_dataframe,
+                                            transformer_normalamps_dataframe)
+    xfmr_loading_s = dict(zip(names, max_loadings))
+    max_xfmr_loading = np.max(max_loadings)
+    tv_count1 = int(np.count_nonzero(max_loadings > ub1))
+    tv_count2 = int(np.count_nonzero(max_loadings > ub2))
     to1 = max_xfmr_loading > ub1
     to2 = max_xfmr_loading > ub2
 
@@ -392,6 +579,323 @@ def _compare_voltages(base_voltage_df, voltage_df, limit=0.03):
     return voltage_deviation, voltage_deviation_flag, voltage_deviation_count
 
 
+def write_results_dataset_part(directory, results):
+    """Write one job's results to a results dataset.
+
+    Each job writes its own Feather part, <feeder>/<job>.feather, so
+    concurrent jobs never write the same file. merge_results_dataset
+    concatenates a feeder's parts into <feeder>.feather.
+
+    Parameters
+    ----------
+    directory : str
+    results : dict
+        results for one job; must include 'name' and 'feeder'
+
+    """
+    feeder_dir = os.path.join(directory, results['feeder'])
+    os.makedirs(feeder_dir, exist_ok=True)
+    df = _make_typed_results_dataframe([results])
+    _write_file_atomically(os.path.join(feeder_dir, f"{results['name']}.feather"), df.to_feather)
+
+
+def list_results_dataset_feeders(directory):
+    """Return the feeders stored in a results dataset.
+
+    Parameters
+    ----------
+    directory : str
+
+    Returns
+    -------
+    list
+
+    """
+    feeders = set()
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                feeders.add(entry.name)
+            elif entry.name.endswith(".feather"):
+                feeders.add(entry.name[:-len(".feather")])
+    return sorted(feeders)
+
+
+def read_results_dataset(directory, feeder):
+    """Return the results for all jobs of a feeder in a results dataset.
+
+    Includes the merged file and any parts written since the last merge.
+
+    Parameters
+    ----------
+    directory : str
+    feeder : str
+
+    Returns
+    -------
+    DataFrame
+
+    """
+    return _read_results_dataset(directory, feeder)[0]
+
+
+def merge_results_dataset(directory, feeder):
+    """Concatenate a feeder's job parts into its merged file and delete the
+    parts.
+
+    Parameters
+    ----------
+    directory : str
+    feeder : str
+
+    Returns
+    -------
+    DataFrame
+        results for all jobs of the feeder
+
+    """
+    df, parts = _read_results_dataset(directory, feeder)
+    if parts:
+        _write_file_atomically(
+            _get_results_dataset_filename(directory, feeder),
+            df.reset_index(drop=True).to_feather,
+        )
+        for part in parts:
+            os.remove(part)
+        logger.debug("Merged %s results dataset parts for feeder=%s", len(parts), feeder)
+
+    return df
+
+
+def write_element_loadings(directory, feeder, job_name, loadings):
+    """Write the max loading of each element for one job.
+
+    Each job writes its own part, <feeder>/<job>.npz, holding float32 arrays
+    and the element names they belong to. merge_element_loadings combines a
+    feeder's parts into one file with a shared name index.
+
+    Parameters
+    ----------
+    directory : str
+    feeder : str
+    job_name : str
+    loadings : dict
+        element type (such as 'lines') : dict of element name to max loading
+
+    """
+    feeder_dir = os.path.join(directory, feeder)
+    os.makedirs(feeder_dir, exist_ok=True)
+    arrays = {}
+    for element_type, values in loadings.items():
+        arrays[element_type] = np.array(list(values.values()), dtype=np.float32)
+        arrays[element_type + _NAMES_SUFFIX] = np.array(list(values), dtype=str)
+
+    _write_file_atomically(
+        os.path.join(feeder_dir, f"{job_name}.npz"),
+        lambda filename: _save_npz(filename, arrays),
+    )
+    logger.debug("Wrote element loadings for job=%s to %s", job_name, feeder_dir)
+
+
+def merge_element_loadings(directory, feeder):
+    """Combine a feeder's per-job element loadings into one file and delete
+    the parts.
+
+    The merged file stores the names of each element type once, in an index
+    shared by all jobs, and one float32 row per job aligned with it.
+
+    Parameters
+    ----------
+    directory : str
+    feeder : str
+
+    """
+    feeder_dir = os.path.join(directory, feeder)
+    parts = _list_element_loadings_parts(feeder_dir)
+    if not parts:
+        return
+
+    jobs = _read_merged_element_loadings(feeder_dir)
+    for job_name, filename in parts.items():
+        # A rerun job replaces its merged row.
+        jobs[job_name] = _read_element_loadings_part(filename)
+
+    job_names = sorted(jobs)
+    element_types = sorted({x for loadings in jobs.values() for x in loadings})
+    arrays = {"job_names": np.array(job_names, dtype=str)}
+    for element_type in element_types:
+        # Merged rows are NaN for elements not in the job; drop them so that
+        # names no longer used by any job leave the index.
+        rows = [
+            jobs[x][element_type].dropna() if element_type in jobs[x] else None
+            for x in job_names
+        ]
+        positions = {}
+        for series in rows:
+            if series is not None:
+                for name in series.index:
+                    positions.setdefault(name, len(positions))
+
+        matrix = np.full((len(job_names), len(positions)), np.nan, dtype=np.float32)
+        for i, series in enumerate(rows):
+            if series is not None:
+                matrix[i, [positions[x] for x in series.index]] = series.values
+        arrays[element_type] = matrix
+        arrays[element_type + _NAMES_SUFFIX] = np.array(list(positions), dtype=str)
+
+    _write_file_atomically(
+        os.path.join(feeder_dir, ELEMENT_LOADINGS_FILENAME),
+        lambda filename: _save_npz(filename, arrays),
+    )
+    for filename in parts.values():
+        os.remove(filename)
+    logger.debug("Merged element loadings of %s jobs for feeder=%s", len(parts), feeder)
+
+
+def merge_all_element_loadings(directory):
+    """Merge the element loadings of every feeder in directory.
+
+    Parameters
+    ----------
+    directory : str
+
+    """
+    with os.scandir(directory) as entries:
+        feeders = [x.name for x in entries if x.is_dir()]
+    for feeder in feeders:
+        merge_element_loadings(directory, feeder)
+
+
+def read_element_loadings(directory, feeder, job_name):
+    """Read the max loading of each element for one job.
+
+    Parameters
+    ----------
+    directory : str
+    feeder : str
+    job_name : str
+
+    Returns
+    -------
+    dict
+        element type : pd.Series of max loading indexed by element name. Once
+        merged, the Series covers all elements of the feeder; elements not in
+        the job are NaN.
+
+    """
+    feeder_dir = os.path.join(directory, feeder)
+    filename = os.path.join(feeder_dir, f"{job_name}.npz")
+    if os.path.exists(filename):
+        return _read_element_loadings_part(filename)
+
+    jobs = _read_merged_element_loadings(feeder_dir)
+    if job_name not in jobs:
+        raise AnalysisRunException(f"no element loadings for job={job_name} feeder={feeder}")
+    return jobs[job_name]
+
+
+def _list_element_loadings_parts(feeder_dir):
+    if not os.path.isdir(feeder_dir):
+        return {}
+
+    return {
+        x[:-len(".npz")]: os.path.join(feeder_dir, x)
+        for x in sorted(os.listdir(feeder_dir))
+        if x.endswith(".npz") and x != ELEMENT_LOADINGS_FILENAME
+    }
+
+
+def _read_element_loadings_part(filename):
+    loadings = {}
+    with np.load(filename, allow_pickle=False) as data:
+        for element_type in data.files:
+            if not element_type.endswith(_NAMES_SUFFIX):
+                loadings[element_type] = pd.Series(
+                    data[element_type], index=data[element_type + _NAMES_SUFFIX],
+                    name=element_type,
+                )
+    return loadings
+
+
+def _read_merged_element_loadings(feeder_dir):
+    filename = os.path.join(feeder_dir, ELEMENT_LOADINGS_FILENAME)
+    if not os.path.exists(filename):
+        return {}
+
+    jobs = {}
+    with np.load(filename, allow_pickle=False) as data:
+        element_types = [
+            x for x in data.files if x != "job_names" and not x.endswith(_NAMES_SUFFIX)
+        ]
+        matrices = {x: data[x] for x in element_types}
+        names = {x: data[x + _NAMES_SUFFIX] for x in element_types}
+        for i, job_name in enumerate(data["job_names"]):
+            jobs[str(job_name)] = {
+                x: pd.Series(matrices[x][i], index=names[x], name=x) for x in element_types
+            }
+    return jobs
+
+
+def _read_results_dataset(directory, feeder):
+    frames = []
+    filename = _get_results_dataset_filename(directory, feeder)
+    if os.path.exists(filename):
+        frames.append(pd.read_feather(filename))
+
+    feeder_dir = os.path.join(directory, feeder)
+    parts = []
+    if os.path.isdir(feeder_dir):
+        parts = [
+            os.path.join(feeder_dir, x) for x in sorted(os.listdir(feeder_dir))
+            if x.endswith(".feather")
+        ]
+        frames.extend(pd.read_feather(x) for x in parts)
+
+    if not frames:
+        raise AnalysisRunException(f"no results for feeder={feeder} in {directory}")
+
+    df = pd.concat(frames, ignore_index=True)
+    # A rerun job's part replaces its merged row.
+    df.drop_duplicates("name", keep="last", inplace=True, ignore_index=True)
+    return df, parts
+
+
+def _save_npz(filename, arrays):
+    with open(filename, "wb") as f_out:
+        np.savez(f_out, **arrays)
+
+
+def _write_file_atomically(filename, write_func):
+    # Readers never see a partial file, and the temp name is never mistaken
+    # for a part.
+    fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(filename), suffix=".tmp")
+    os.close(fd)
+    try:
+        write_func(tmp_filename)
+        os.replace(tmp_filename, filename)
+    except Exception:
+        os.remove(tmp_filename)
+        raise
+
+
+def _get_results_dataset_filename(directory, feeder):
+    return os.path.join(directory, f"{feeder}.feather")
+
+
+def _make_typed_results_dataframe(records):
+    df = DataFrame.from_records(records)
+    for column in df.columns:
+        if column.endswith("_flag"):
+            df[column] = df[column].astype("boolean")
+        elif column.endswith("_count"):
+            df[column] = df[column].astype("Int64")
+        elif column in ("name", "feeder", "deployment", "placement", "feeder_head_info"):
+            df[column] = df[column].astype("string")
+        elif column in _FLOAT_RESULT_COLUMNS:
+            df[column] = df[column].astype(float)
+    return df
+
+
 def _get_total_pv_kw(pvsystems_df):
     return sum(pvsystems_df['kW'])
 
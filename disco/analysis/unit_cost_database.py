@@ -0,0 +1,238 @@
+"""Loads the unit-cost database used by UpgradeCostAnalysis."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the parsed layout changes so that stale caches are ignored.
+_CACHE_VERSION = 2
+_CACHE_METADATA_FILENAME = "metadata.json"
+# Sheets indexed by type. Feather stores only default indexes.
+_INDEXED_SHEETS = ("control_changes", "voltage_regulators")
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Parsed databases loaded by this process, keyed by path, mtime and size.
+_databases = {}
+
+
+class UnitCostDatabase:
+    """Parsed unit costs for lines, transformers, voltage regulators and
+    control changes.
+
+    """
+
+    SHEETS = ("lines", "transformers", "control_changes", "voltage_regulators")
+
+    def __init__(self, lines, transformers, control_changes, voltage_regulators):
+        self._lines = lines
+        self._transformers = transformers
+        self._control_changes = control_changes
+        self._voltage_regulators = voltage_regulators
+
+    @classmethod
+    def from_excel(cls, filename):
+        """Parse the database from the Excel workbook.
+
+        Parameters
+        ----------
+        filename : str
+
+        Returns
+        -------
+        UnitCostDatabase
+
+        """
+        sheets = pd.read_excel(filename, sheet_name=list(cls.SHEETS))
+        transformers = sheets["transformers"]
+        transformers["rated_kva"] = transformers["rated_kva"].astype(float)
+        return cls(
+            lines=sheets["lines"],
+            transformers=transformers,
+            control_changes=sheets["control_changes"].set_index("type"),
+            voltage_regulators=sheets["voltage_regulators"].set_index("type"),
+        )
+
+    @property
+    def lines(self):
+        """Return the line unit costs.
+
+        Returns
+        -------
+        pd.DataFrame
+
+        """
+        return self._lines
+
+    @property
+    def transformers(self):
+        """Return the transformer unit costs. rated_kva is float.
+
+        Returns
+        -------
+        pd.DataFrame
+
+        """
+        return self._transformers
+
+    @property
+    def control_changes(self):
+        """Return the control-change unit costs, indexed by type.
+
+        Returns
+        -------
+        pd.DataFrame
+
+        """
+        return self._control_changes
+
+    @property
+    def voltage_regulators(self):
+        """Return the voltage regulator unit costs, indexed by type.
+
+        Returns
+        -------
+        pd.DataFrame
+
+        """
+        return self._voltage_regulators
+
+    def get_control_change_cost(self, change_type):
+        """Return the total cost of one control change.
+
+        Parameters
+        ----------
+        change_type : str
+
+        Returns
+        -------
+        float
+
+        """
+        return self._control_changes.loc[change_type].total_cost
+
+
+def load_unit_cost_database(filename, cache_dir=None):
+    """Load the unit-cost database, parsing the workbook only when needed.
+
+    The parsed database is kept in memory for the life of the process. If
+    cache_dir is set, it is also persisted there as Feather files keyed by the
+    SHA-256 of the workbook, so later processes skip parsing the workbook.
+    Writing a new entry removes older entries for the same workbook.
+
+    Parameters
+    ----------
+    filename : str
+        Path to the unit-cost Excel workbook
+    cache_dir : str | None
+        Directory for the persistent cache, such as a directory in the job
+        outputs. The cache is not persisted if None.
+
+    Returns
+    -------
+    UnitCostDatabase
+
+    """
+    filename = os.path.abspath(filename)
+    stat = os.stat(filename)
+    key = (filename, stat.st_mtime_ns, stat.st_size)
+    database = _databases.get(key)
+    if database is not None:
+        return database
+
+    if cache_dir is None:
+        database = UnitCostDatabase.from_excel(filename)
+    else:
+        digest = _hash_file(filename)
+        prefix = f"{os.path.basename(filename)}.v"
+        cache_entry = os.path.join(cache_dir, f"{prefix}{_CACHE_VERSION}.{digest[:16]}")
+        database = _read_cache(cache_entry, digest)
+        if database is None:
+            database = UnitCostDatabase.from_excel(filename)
+            if _write_cache(cache_entry, digest, database):
+                _remove_stale_cache_entries(cache_entry, prefix)
+
+    _databases[key] = database
+    return database
+
+
+def _hash_file(filename):
+    sha = hashlib.sha256()
+    with open(filename, "rb") as f_in:
+        for chunk in iter(lambda: f_in.read(_HASH_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def _read_cache(cache_entry, digest):
+    metadata_file = os.path.join(cache_entry, _CACHE_METADATA_FILENAME)
+    if not os.path.exists(metadata_file):
+        return None
+
+    try:
+        with open(metadata_file) as f_in:
+            metadata = json.load(f_in)
+        if metadata.get("sha256") != digest:
+            return None
+        sheets = {
+            x: pd.read_feather(os.path.join(cache_entry, f"{x}.feather"))
+            for x in UnitCostDatabase.SHEETS
+        }
+    except Exception:
+        logger.warning("Ignoring unreadable unit-cost cache %s", cache_entry)
+        return None
+
+    for name in _INDEXED_SHEETS:
+        sheets[name] = sheets[name].set_index("type")
+
+    logger.debug("Loaded unit-cost database from cache %s", cache_entry)
+    return UnitCostDatabase(**sheets)
+
+
+def _write_cache(cache_entry, digest, database):
+    cache_dir = os.path.dirname(cache_entry)
+    # Write to a temp directory and rename it so that concurrent jobs never
+    # read a partial entry. The cache is optional; failures only skip it.
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".tmp")
+        try:
+            for name in UnitCostDatabase.SHEETS:
+                df = getattr(database, name)
+                if name in _INDEXED_SHEETS:
+                    df = df.reset_index()
+                df.to_feather(os.path.join(tmp_dir, f"{name}.feather"))
+            with open(os.path.join(tmp_dir, _CACHE_METADATA_FILENAME), "w") as f_out:
+                json.dump({"sha256": digest}, f_out)
+            try:
+                os.rename(tmp_dir, cache_entry)
+            except OSError:
+                if not os.path.isdir(cache_entry):
+                    raise
+                # Another process wrote the same entry.
+                shutil.rmtree(tmp_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    except Exception:
+        logger.warning("Failed to write unit-cost cache %s", cache_entry, exc_info=True)
+        return False
+
+    logger.debug("Wrote unit-cost database cache %s", cache_entry)
+    return True
+
+
+def _remove_stale_cache_entries(cache_entry, prefix):
+    # Entries for earlier contents of the same workbook are never read again.
+    cache_dir, name = os.path.split(cache_entry)
+    for entry in os.listdir(cache_dir):
+        if entry.startswith(prefix) and entry != name:
+            shutil.rmtree(os.path.join(cache_dir, entry), ignore_errors=True)
+            logger.debug("Removed stale unit-cost cache %s", entry)
@@ -1,18 +1,30 @@
 import logging
 import os
+import shutil
 
+import numpy as np
 import pandas as pd
 
-from jade.utils.utils import load_data
+from jade.exceptions import InvalidParameter
 
 from disco.analysis import Analysis, Input
+from disco.analysis.unit_cost_database import load_unit_cost_database
+from disco.analysis.upgrade_results import UpgradeResults
 from disco.exceptions import AnalysisRunException
 from disco.utils.custom_type import CustomType
-from disco.utils.dss_utils import extract_upgrade_results
+from disco.utils.dss_utils import read_upgrade_results
 
 
 logger = logging.getLogger(__name__)
 
+POST_PROCESS_DIRNAME = "post_process"
+SUMMARY_COSTS_FILENAME = "summary_of_upgrade_costs.csv"
+DETAILED_LINE_COSTS_FILENAME = "detailed_line_upgrade_costs.csv"
+DETAILED_TRANSFORMER_COSTS_FILENAME = "detailed_transformer_costs.csv"
+UPGRADE_COSTS_DATASET_DIRNAME = "upgrade-costs"
+UPGRADE_COSTS_TABLES = ("summary", "components")
+UNIT_COST_CACHE_DIRNAME = "unit-cost-cache"
+
 
 class UpgradeCostAnalysis(Analysis):
 
@@ -23,39 +35,44 @@ class UpgradeCostAnalysis(Analysis):
     def run(self, output, *args, **kwargs):
         # unit_cost_data_file
         unit_cost_data_file = self.get_input("unit_cost_data_file").current_value
+        # Jobs in the same output directory share the parsed workbook.
+        unit_costs = load_unit_cost_database(
+            unit_cost_data_file, cache_dir=os.path.join(output, UNIT_COST_CACHE_DIRNAME)
+        )
 
         # relative job paths
         job_output = os.path.join(output, self._job_name)
 
         # output_path
-        post_process_output = os.path.join(job_output, "post_process")
+        post_process_output = os.path.join(job_output, POST_PROCESS_DIRNAME)
         os.makedirs(post_process_output, exist_ok=True)
 
         # upgrade files
         project_path = os.path.join(job_output, "pydss_project")
-        upgrade_files = extract_upgrade_results(project_path, file_ext=".json")
-        thermal_upgrade_file = upgrade_files["thermal"]
-        voltage_upgrade_file = upgrade_files["voltage"]
+        # Read in memory from project.zip. Each file is parsed once and shared
+        # by all cost functions.
+        upgrade_results = read_upgrade_results(project_path)
+        thermal_upgrades = UpgradeResults(upgrade_results["thermal"])
+        voltage_upgrades = UpgradeResults(upgrade_results["voltage"])
         try:
+
             # Cost calculation
             thermal_df = self.get_thermal_costs(
-                thermal_upgrade_file, unit_cost_data_file, post_process_output
+                thermal_upgrades, unit_costs, post_process_output
             )
-
-            metadata = load_data(voltage_upgrade_file)
             vreg_df = self.get_vreg_costs(
-                voltage_upgrade_file,
-                unit_cost_data_file,
-                metadata["feederhead_basekV"],
+                voltage_upgrades,
+                unit_costs,
+                voltage_upgrades.data["feederhead_basekV"],
             )
-            cap_df = self.get_cap_costs(voltage_upgrade_file, unit_cost_data_file)
+            cap_df = self.get_cap_costs(voltage_upgrades, unit_costs)
 
             # Cost summary
             total_costs_df = self.get_total_costs(thermal_df, vreg_df, cap_df)
 
             # Output CSV file
             summary_of_upgrade_costs_file = os.path.join(
-                post_process_output, "summary_of_upgrade_costs.csv"
+                post_process_output, SUMMARY_COSTS_FILENAME
             )
             total_costs_df.to_csv(summary_of_upgrade_costs_file, index=False)
             # total_costs_df.to_feather(output_path + 'summary_of_upgrade_costs.feather')
@@ -68,235 +85,107 @@ class UpgradeCostAnalysis(Analysis):
             logger.exception("Unexcepted UpgradeCostAnalysis Error.")
             raise
 
-        finally:
-            if os.path.exists(thermal_upgrade_file):
-                os.remove(thermal_upgrade_file)
-            if os.path.exists(voltage_upgrade_file):
-                os.remove(voltage_upgrade_file)
-
-    def indiv_line_cost(self, upgrade_df, unit_cost_lines):
+    def indiv_line_cost(self, upgrades, unit_cost_lines):
         """Function to calculate costs of upgrading each individual line that is overloaded.
         Returns a dataframe with columns containing the line ID's and cost to upgrade.
         """
-        # Dictionary used to convert between different length units and meters, which are used for all the calculations.
-        # OpenDSS can output results in any of these lengths.
-        len_unit_mult = {
-            "mi": 1609.34,
-            "kft": 0.00328084,
-            "km": 0.001,
-            "ft": 3.28084,
-            "in": 39.3701,
-            "cm": 100,
-        }
-
-        line_costs_df = pd.DataFrame()
-        for k in upgrade_df.keys():
-            # print(k)
-            if "Line." in k:
-                new_line_len = upgrade_df[k]["new"][1][
-                    "length"
-                ]  # upgraded lines and new lines run along exisiting circuit, so length is the same for both
-
-                if upgrade_df[k]["new"][0] > 0:
-                    # print(k)
-                    new_line_len_unit = upgrade_df[k]["new"][1]["length_unit"]
-                    if new_line_len_unit == "m":
-                        new_line_len_m = new_line_len
-                    else:
-                        new_line_len_m = new_line_len / len_unit_mult[new_line_len_unit]
-                    # print('line length is ',new_line_len, new_line_len_unit, 'or', new_line_len_m, 'm')
-
-                    line_count = upgrade_df[k]["new"][
-                        0
-                    ]  # count of new lines added to address overload. Often 1, but could be > 1 with severe overloads
-                    new_line_cost_per_line = new_line_len_m * float(
-                        unit_cost_lines[
-                            unit_cost_lines["description"] == "new_line"
-                        ].cost_per_m
-                    )
-                    new_line_cost = line_count * new_line_cost_per_line
-
-                elif upgrade_df[k]["new"][0] == 0:
-                    new_line_cost = 0
-                    new_line_cost_per_line = 0
-
-                elif upgrade_df[k]["new"][0] < 0:
-                    logger.error(
-                        "Error: number of new lines is negative: %s",
-                        upgrade_df[k]["new"][0],
-                    )
-                    raise AnalysisRunException(
-                        "Error: number of new lines is negative: {}".format(
-                            upgrade_df[k]["new"][0]
-                        )
-                    )
-
-                upgraded_line_count = upgrade_df[k]["upgrade"][0]
-                upgraded_line_cost = (
-                    new_line_cost_per_line * upgraded_line_count
-                )  # TODO: update to take ampacities as an option. X data currently does not have sufficient resolution
-                dict_k = {
-                    "id": [k],
-                    "new_equip_cost": [new_line_cost],
-                    "upgraded_equip_cost": [upgraded_line_cost],
-                }
-
-                df_k = pd.DataFrame.from_dict(dict_k)
-                line_costs_df = line_costs_df.append(df_k)
-
-        return line_costs_df
+        lines = upgrades.get_elements("Line.")
+        names = list(lines)
+        new = [x["new"] for x in lines.values()]
+        new_counts = np.array([x[0] for x in new], dtype=float)
+        upgrade_counts = np.array(
+            [x["upgrade"][0] for x in lines.values()], dtype=float
+        )
+        _check_counts(names, new_counts, "new lines")
+
+        # upgraded lines and new lines run along exisiting circuit, so length is the same for both
+        lengths_m = np.array(
+            [
+                x[1]["length"] / _LENGTH_UNIT_DIVISORS[x[1]["length_unit"]]
+                if x[0] > 0 else 0.0
+                for x in new
+            ],
+            dtype=float,
+        )
+        cost_per_m = 0.0
+        if names:
+            cost_per_m = float(
+                unit_cost_lines.loc[
+                    unit_cost_lines["description"] == "new_line", "cost_per_m"
+                ].iloc[0]
+            )
+        new_line_cost_per_line = np.where(new_counts > 0, lengths_m * cost_per_m, 0.0)
+
+        # TODO: update upgraded cost to take ampacities as an option.
+        # X data currently does not have sufficient resolution
+        return pd.DataFrame(
+            {
+                "id": names,
+                "new_equip_cost": new_counts * new_line_cost_per_line,
+                "upgraded_equip_cost": upgrade_counts * new_line_cost_per_line,
+            }
+        )
 
     def get_xfmr_unit_costs(self, kva, unit_cost_xfmrs):
         unit_cost = unit_cost_xfmrs[unit_cost_xfmrs["rated_kva"] == kva].total_cost
 
         return unit_cost
 
-    def indiv_xfmr_costs(self, upgrade_df, unit_cost_xfmrs):
+    def indiv_xfmr_costs(self, upgrades, unit_cost_xfmrs):
         """Function to calculate costs of upgrading each individual transformers that is overloaded.
         Returns a dataframe with columns containing the transformer ID's and cost to upgrade.
         """
+        xfmrs = upgrades.get_elements("Transformer.")
+        names = list(xfmrs)
+        new = [x["new"] for x in xfmrs.values()]
+        upgrade = [x["upgrade"] for x in xfmrs.values()]
+        new_counts = np.array([x[0] for x in new], dtype=float)
+        upgrade_counts = np.array([x[0] for x in upgrade], dtype=float)
+        _check_counts(names, new_counts, "new transformers")
+        _check_counts(names, upgrade_counts, "upgraded transformers")
+
+        # TODO: decide how to handle oh vs ug for LA100
+        # NaN marks transformers that need no unit cost.
+        new_kvas = np.array(
+            [x[1]["wdg_kvas"][0] if x[0] > 0 else np.nan for x in new], dtype=float
+        )
+        upgrade_kvas = np.array(
+            [float(x[1][0]["kva"][0]) if x[0] > 0 else np.nan for x in upgrade],
+            dtype=float,
+        )
+        index = _TransformerCostIndex(unit_cost_xfmrs)
+        new_install, _ = index.get_unit_costs(new_kvas)
+        upgrade_install, upgrade_remove = index.get_unit_costs(upgrade_kvas)
+
+        new_xfmr_cost = np.where(new_counts > 0, new_install * new_counts, 0.0)
+        upgrade_xfmr_cost = np.where(
+            upgrade_counts > 0,
+            (upgrade_install + upgrade_remove) * upgrade_counts,
+            0.0,
+        )
+        invalid = np.isnan(upgrade_counts)
+        if invalid.any():
+            logger.warning(
+                "Warning: unintentified error. Assigning upgrade_xfmr_cost to None: %s",
+                [name for name, x in zip(names, invalid) if x],
+            )
+            upgrade_xfmr_cost[invalid] = np.nan
 
-        xfmr_costs_df = pd.DataFrame()
-
-        rated_kva_list = [float(x) for x in unit_cost_xfmrs["rated_kva"]]
-
-        for k in upgrade_df.keys():
-            if "Transformer." in k:
-                if (
-                    upgrade_df[k]["new"][0] > 0
-                ):  # TODO: make functions for getting new equipment and upgraded equipment costs to make cleaner
-                    # print(k)
-                    new_xfmr_kva = upgrade_df[k]["new"][1]["wdg_kvas"][
-                        0
-                    ]  # TODO: decide how to handle oh vs ug for LA100
-                    new_xfmr_count = upgrade_df[k]["new"][
-                        0
-                    ]  # count of new transformers added to address overload.
-
-                    if new_xfmr_kva > 5000:  # TODO: update later?
-                        new_unit_cost = unit_cost_xfmrs[
-                            unit_cost_xfmrs["system"] == "substation"
-                        ].install_cost
-                    elif not (new_xfmr_kva in rated_kva_list):
-                        closest_kva = min(
-                            unit_cost_xfmrs["rated_kva"],
-                            key=lambda x: abs(x - new_xfmr_kva),
-                        )
-                        new_unit_cost = unit_cost_xfmrs[
-                            unit_cost_xfmrs["rated_kva"] == closest_kva
-                        ].install_cost
-                    else:
-                        new_unit_cost = unit_cost_xfmrs[
-                            unit_cost_xfmrs["rated_kva"] == new_xfmr_kva
-                        ].install_cost
-
-                    # print(k)
-                    # print('new unit cost is:', new_unit_cost)
-                    # print('new_xfmr_count is:', new_xfmr_count)
-                    # print('new_xfmr_kva is:',new_xfmr_kva)
-                    new_xfmr_cost = new_unit_cost * new_xfmr_count
-                    new_xfmr_cost = new_xfmr_cost.iloc[0]
-
-                elif upgrade_df[k]["new"][0] == 0:
-                    new_xfmr_cost = 0
-
-                elif upgrade_df[k]["new"][0] < 0:
-                    logger.exception(
-                        "Error: number of new transformers is negative: %s",
-                        upgrade_df[k]["new"][0],
-                    )
-                    raise AnalysisRunException(
-                        "Error: number of new transformers is negative: {}".format(
-                            upgrade_df[k]["new"][0]
-                        )
-                    )
-
-                if upgrade_df[k]["upgrade"][0] > 0:
-                    # print(upgrade_df[k]['upgrade'][1][0]['kva'][0])
-
-                    upgrade_xfmr_kva = float(upgrade_df[k]["upgrade"][1][0]["kva"][0])
-                    upgrade_xfmr_count = upgrade_df[k]["upgrade"][0]
-
-                    if upgrade_xfmr_kva > 5000:  # TODO: update later?
-                        upgrade_xfmr_unit_cost = (
-                            unit_cost_xfmrs[
-                                unit_cost_xfmrs["system"] == "substation"
-                            ].install_cost
-                            + unit_cost_xfmrs[
-                                unit_cost_xfmrs["system"] == "substation"
-                            ].remove_cost
-                        )
-                    elif not (upgrade_xfmr_kva in rated_kva_list):
-                        closest_kva = min(
-                            unit_cost_xfmrs["rated_kva"],
-                            key=lambda x: abs(x - upgrade_xfmr_kva),
-                        )
-                        upgrade_xfmr_unit_cost = (
-                            unit_cost_xfmrs[
-                                unit_cost_xfmrs["rated_kva"] == closest_kva
-                            ].install_cost
-                            + unit_cost_xfmrs[
-                                unit_cost_xfmrs["rated_kva"] == closest_kva
-                            ].remove_cost
-                        )
-                    else:
-                        upgrade_xfmr_unit_cost = (
-                            unit_cost_xfmrs[
-                                unit_cost_xfmrs["rated_kva"] == upgrade_xfmr_kva
-                            ].install_cost
-                            + unit_cost_xfmrs[
-                                unit_cost_xfmrs["rated_kva"] == upgrade_xfmr_kva
-                            ].remove_cost
-                        )
-                    upgrade_xfmr_cost = upgrade_xfmr_unit_cost * upgrade_xfmr_count
-                    upgrade_xfmr_cost = upgrade_xfmr_cost.iloc[0]
-
-                elif upgrade_df[k]["upgrade"][0] == 0:
-                    upgrade_xfmr_cost = 0
-
-                elif upgrade_df[k]["upgrade"][0] < 0:
-                    logger.error(
-                        "Error: number of upgraded transformers is negative: %s",
-                        upgrade_df[k]["upgrade"][0],
-                    )
-                    raise AnalysisRunException(
-                        "Error: number of upgraded transformers is negative: {}".format(
-                            upgrade_df[k]["upgrade"][0]
-                        )
-                    )
-
-                else:
-                    upgrade_xfmr_cost = None
-                    logger.warning(
-                        "Warning: unintentified error. Assigning upgrade_xfmr_cost to None"
-                    )
-
-                # print(k)
-
-                dict_k = {
-                    "id": [k],
-                    "new_equip_cost": [new_xfmr_cost],
-                    "upgraded_equip_cost": [upgrade_xfmr_cost],
-                }
-                df_k = pd.DataFrame.from_dict(dict_k)
-                xfmr_costs_df = xfmr_costs_df.append(df_k)
-
-        return xfmr_costs_df
-
-    def get_cap_costs(self, upgrade_file, unit_cost_data_file):
+        return pd.DataFrame(
+            {
+                "id": names,
+                "new_equip_cost": new_xfmr_cost,
+                "upgraded_equip_cost": upgrade_xfmr_cost,
+            }
+        )
+
+    def get_cap_costs(self, upgrades, unit_costs):
         """
         note we currently are never adding new capacitors to integrate PV. We may want these to
         accomodate new load or EVs. Right now only cap changes are new controllers or control
         setting changes
         """
-        # pd.read_json() works if the data looks like {'a': [1,2], 'b': [3,4]}, as the values are indexed.
-        # But would fail if just scalar value, like {'a':1, 'b':2}, in this case use typ="series".
-        try:
-            upgrade_df = pd.read_json(upgrade_file)
-        except ValueError:
-            upgrade_df = pd.read_json(upgrade_file, typ="series").to_frame("Value")
-
-        if upgrade_df.empty:
+        if upgrades.is_empty() or not upgrades.get_elements("Capacitor"):
             cap_dict = {
                 "type": ["new capacitor controller", "capacitor setting changes"],
                 "count": [0, 0],
@@ -305,32 +194,19 @@ class UpgradeCostAnalysis(Analysis):
             cap_cost_df = pd.DataFrame.from_dict(cap_dict)
             return cap_cost_df
 
-        cap_cols = upgrade_df.columns.str.contains("Capacitor")
-        cap_df = upgrade_df[upgrade_df.columns[cap_cols]]
-
-        if cap_df.empty:
-            cap_dict = {
-                "type": ["new capacitor controller", "capacitor setting changes"],
-                "count": [0, 0],
-                "total_cost_usd": [0, 0],
-            }
-            cap_cost_df = pd.DataFrame.from_dict(cap_dict)
-            return cap_cost_df
-
-        count_new_cap_controllers = cap_df.loc["New controller added"].sum()
-        count_changed_settings = cap_df.loc["Controller settings modified"].sum()
-
-        unit_costs_controls = pd.read_excel(
-            unit_cost_data_file, sheet_name="control_changes"
+        count_new_cap_controllers = upgrades.sum_property(
+            "Capacitor", "New controller added"
+        )
+        count_changed_settings = upgrades.sum_property(
+            "Capacitor", "Controller settings modified"
         )
-        unit_costs_controls.set_index("type", inplace=True)
 
-        new_controller_unit_cost = unit_costs_controls.loc[
+        new_controller_unit_cost = unit_costs.get_control_change_cost(
             "replace capacitor controller"
-        ].total_cost
-        new_setting_unit_cost = unit_costs_controls.loc[
+        )
+        new_setting_unit_cost = unit_costs.get_control_change_cost(
             "voltage regulator or capacitor setting change"
-        ].total_cost
+        )
 
         total_new_controller_cost = new_controller_unit_cost * count_new_cap_controllers
         total_new_setting_cost = new_setting_unit_cost * count_changed_settings
@@ -345,13 +221,8 @@ class UpgradeCostAnalysis(Analysis):
 
         return cap_cost_df
 
-    def get_vreg_costs(self, upgrade_file, unit_cost_data_file, voltage_class):
-        try:
-            upgrade_df = pd.read_json(upgrade_file)
-        except ValueError:
-            upgrade_df = pd.read_json(upgrade_file, typ="series").to_frame("Value")
-
-        if upgrade_df.empty:
+    def get_vreg_costs(self, upgrades, unit_costs, voltage_class):
+        if upgrades.is_empty() or not upgrades.get_elements("Regctrl"):
             vreg_dict = {
                 "type": [
                     "new substation LTC",
@@ -366,81 +237,64 @@ class UpgradeCostAnalysis(Analysis):
             vreg_cost_df = pd.DataFrame.from_dict(vreg_dict)
             return vreg_cost_df
 
-        vreg_cols = upgrade_df.columns.str.contains("Regctrl")
-        vreg_df = upgrade_df[upgrade_df.columns[vreg_cols]]
-
-        if vreg_df.empty:
-            vreg_dict = {
-                "type": [
-                    "new substation LTC",
-                    "substation LTC setting change",
-                    "new line regulators",
-                    "replace line regulator controller",
-                    "line regulator control setting change",
-                ],
-                "count": [0, 0, 0, 0, 0],
-                "total_cost_usd": [0, 0, 0, 0, 0],
-            }
-            vreg_cost_df = pd.DataFrame.from_dict(vreg_dict)
-            return vreg_cost_df
-
-        count_new_sub_LTCs = (
-            (vreg_df.loc["New transformer added"] == 1)
-            & (vreg_df.loc["Substation LTC"] == 1)
-        ).sum()
+        count_new_sub_LTCs = upgrades.count_elements(
+            "Regctrl",
+            {"New transformer added": 1, "Substation LTC": 1},
+        )
 
-        count_sub_LTC_setting_change = (
-            (vreg_df.loc["Controller settings modified"] == 1)
-            & (vreg_df.loc["New controller added"] == 0)
-            & (vreg_df.loc["Substation LTC"] == 1)
-        ).sum()
+        count_sub_LTC_setting_change = upgrades.count_elements(
+            "Regctrl",
+            {
+                "Controller settings modified": 1,
+                "New controller added": 0,
+                "Substation LTC": 1,
+            },
+        )
         # TODO: Check this is correct. I'm assuming all substations have transformers, and this condition
         # just means that a new LTC is added to the substation transformer, not that the whole
         # transformer is replaced.
 
-        count_new_line_regs = (
-            (vreg_df.loc["New transformer added"] == 1)
-            & (vreg_df.loc["Substation LTC"] == 0)
-        ).sum()
-
-        count_new_line_reg_controllers = (
-            (vreg_df.loc["New transformer added"] == 0)
-            & (vreg_df.loc["New controller added"] == 1)
-            & (vreg_df.loc["Substation LTC"] == 0)
-        ).sum()
-
-        count_line_reg_setting_changes = (
-            (vreg_df.loc["Controller settings modified"] == 1)
-            & (vreg_df.loc["New controller added"] == 0)
-            & (vreg_df.loc["Substation LTC"] == 0)
-        ).sum()
+        count_new_line_regs = upgrades.count_elements(
+            "Regctrl",
+            {"New transformer added": 1, "Substation LTC": 0},
+        )
 
-        unit_costs_controls = pd.read_excel(
-            unit_cost_data_file, sheet_name="control_changes"
+        count_new_line_reg_controllers = upgrades.count_elements(
+            "Regctrl",
+            {
+                "New transformer added": 0,
+                "New controller added": 1,
+                "Substation LTC": 0,
+            },
         )
-        unit_costs_vreg = pd.read_excel(
-            unit_cost_data_file, sheet_name="voltage_regulators"
+
+        count_line_reg_setting_changes = upgrades.count_elements(
+            "Regctrl",
+            {
+                "Controller settings modified": 1,
+                "New controller added": 0,
+                "Substation LTC": 0,
+            },
         )
-        unit_costs_controls.set_index("type", inplace=True)
-        unit_costs_vreg.set_index("type", inplace=True)
 
-        new_sub_LTC_unit_cost = unit_costs_controls.loc[
+        unit_costs_vreg = unit_costs.voltage_regulators
+        new_sub_LTC_unit_cost = unit_costs.get_control_change_cost(
             "LTC control replacement"
-        ].total_cost
-        sub_LTC_settings_change_unit_cost = unit_costs_controls.loc[
+        )
+        sub_LTC_settings_change_unit_cost = unit_costs.get_control_change_cost(
             "LTC setpoint change"
-        ].total_cost
+        )
         new_line_reg_unit_cost = (
             unit_costs_vreg[unit_costs_vreg.voltage_class_kV == voltage_class]
             .loc["new voltage regulator"]
             .total_cost
         )
-        new_controller_unit_cost = unit_costs_controls.loc[
+        new_controller_unit_cost = unit_costs.get_control_change_cost(
             "replace voltage regulator controller"
-        ].total_cost
-        line_reg_new_setting_unit_cost = unit_costs_controls.loc[
+        )
+        line_reg_new_setting_unit_cost = unit_costs.get_control_change_cost(
             "voltage regulator or capacitor setting change"
-        ].total_cost
+        )
 
         total_new_sub_LTC_costs = count_new_sub_LTCs * new_sub_LTC_unit_cost
         total_sub_LTC_setting_change_costs = (
@@ -497,22 +351,13 @@ class UpgradeCostAnalysis(Analysis):
         return total_cost
 
     def get_thermal_costs(
-        self, upgrade_file, unit_cost_data_file, output_path
-    ):  # Is for one penetration level/on upgrade file at a time. Upgrade_file is a json file.
-        unit_cost_lines = pd.read_excel(
-            unit_cost_data_file, sheet_name="lines"
-        )  # may want to update path to the unit cost database
-        unit_cost_xfmrs = pd.read_excel(
-            unit_cost_data_file, sheet_name="transformers"
-        )  # may want to update path to the unit cost database
+        self, upgrades, unit_costs, output_path
+    ):  # Is for one penetration level/on upgrade file at a time.
+        unit_cost_lines = unit_costs.lines
+        unit_cost_xfmrs = unit_costs.transformers
         # no circuit conversion included for now
 
-        try:
-            upgrade_df = pd.read_json(upgrade_file)  # merge in two upgrade files
-        except ValueError:
-            upgrade_df = pd.read_json(upgrade_file, typ="series").to_frame("Value")
-
-        if upgrade_df.empty:
+        if upgrades.is_empty():
             total_upgrade_dict = {
                 "type": ["lines", "transformers"],
                 "count": [0, 0],
@@ -521,13 +366,13 @@ class UpgradeCostAnalysis(Analysis):
             thermal_df = pd.DataFrame.from_dict(total_upgrade_dict)
             return thermal_df
 
-        line_costs_df = self.indiv_line_cost(upgrade_df, unit_cost_lines)
+        line_costs_df = self.indiv_line_cost(upgrades, unit_cost_lines)
         line_costs_df.reset_index(inplace=True, drop=True)
         # output the detailed data on line costs
 
         # Output CSV file
         detailed_line_upgrade_costs_file = os.path.join(
-            output_path, "detailed_line_upgrade_costs.csv"
+            output_path, DETAILED_LINE_COSTS_FILENAME
         )
         line_costs_df.to_csv(detailed_line_upgrade_costs_file)
         # line_costs_df.to_feather(output_path + 'detailed_line_upgrade_costs.feather')
@@ -535,12 +380,12 @@ class UpgradeCostAnalysis(Analysis):
             "detailed_line_upgrade_costs", detailed_line_upgrade_costs_file
         )
 
-        xfmr_costs_df = self.indiv_xfmr_costs(upgrade_df, unit_cost_xfmrs)
+        xfmr_costs_df = self.indiv_xfmr_costs(upgrades, unit_cost_xfmrs)
         xfmr_costs_df.reset_index(inplace=True, drop=True)
 
         # Output the detailed data on transformer costs
         detailed_transformer_costs_file = os.path.join(
-            output_path, "detailed_transformer_costs.csv"
+            output_path, DETAILED_TRANSFORMER_COSTS_FILENAME
         )
         xfmr_costs_df.to_csv(detailed_transformer_costs_file)
         # xfmr_costs_df.to_feather(output_path + 'detailed_transformer_costs.feather')
@@ -579,6 +424,275 @@ class UpgradeCostAnalysis(Analysis):
             [["total", all_upgrade_count, all_upgrade_costs]],
             columns=["type", "count", "total_cost_usd"],
         )
-        total_costs_df = total_costs_df.append(totals_row_df)
+        total_costs_df = pd.concat([total_costs_df, totals_row_df])
 
         return total_costs_df
+
+
+def read_job_upgrade_costs(job_output):
+    """Read the costs written by UpgradeCostAnalysis for one job.
+
+    Parameters
+    ----------
+    job_output : str
+        The job's output directory
+
+    Returns
+    -------
+    tuple
+        (summary, components) as DataFrames. components has columns id,
+        new_equip_cost, upgraded_equip_cost and type (line or transformer); it
+        is empty if the job had no thermal upgrades.
+
+    """
+    post_process_output = os.path.join(job_output, POST_PROCESS_DIRNAME)
+    summary = pd.read_csv(os.path.join(post_process_output, SUMMARY_COSTS_FILENAME))
+    return summary, read_job_component_costs(job_output)
+
+
+def read_job_component_costs(job_output):
+    """Read the line and transformer costs written by UpgradeCostAnalysis for
+    one job. Unlike read_job_upgrade_costs, this does not need the summary file.
+
+    Parameters
+    ----------
+    job_output : str
+        The job's output directory
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns id, new_equip_cost, upgraded_equip_cost and type (line or
+        transformer); empty if the job had no thermal upgrades.
+
+    """
+    post_process_output = os.path.join(job_output, POST_PROCESS_DIRNAME)
+    components = []
+    for filename, component_type in (
+        (DETAILED_LINE_COSTS_FILENAME, "line"),
+        (DETAILED_TRANSFORMER_COSTS_FILENAME, "transformer"),
+    ):
+        path = os.path.join(post_process_output, filename)
+        # These are not written when the job had no thermal upgrades.
+        if os.path.exists(path):
+            df = pd.read_csv(path, index_col=0)
+            if not df.empty:
+                df["type"] = component_type
+                components.append(df)
+
+    if components:
+        return pd.concat(components, ignore_index=True)
+    return pd.DataFrame(columns=["id", "new_equip_cost", "upgraded_equip_cost", "type"])
+
+
+def get_upgrade_cost_totals(summary):
+    """Return the total upgrade costs per feeder and penetration.
+
+    Parameters
+    ----------
+    summary : pd.DataFrame
+        Summary costs for many jobs; must include feeder, penetration and name
+
+    Returns
+    -------
+    pd.DataFrame
+
+    """
+    totals = summary[summary["type"] == "total"]
+    return (
+        totals.groupby(["feeder", "penetration"], dropna=False)
+        .agg(
+            num_jobs=("name", "count"),
+            count=("count", "sum"),
+            total_cost_usd=("total_cost_usd", "sum"),
+            mean_cost_usd=("total_cost_usd", "mean"),
+            min_cost_usd=("total_cost_usd", "min"),
+            max_cost_usd=("total_cost_usd", "max"),
+        )
+        .reset_index()
+    )
+
+
+def write_upgrade_costs_dataset(directory, summary, components):
+    """Write upgrade costs for many jobs to a dataset partitioned by feeder.
+
+    Each table has one Feather file per feeder. totals.feather holds the
+    output of get_upgrade_cost_totals. Any existing dataset is replaced.
+
+    Parameters
+    ----------
+    directory : str
+    summary : pd.DataFrame
+    components : pd.DataFrame
+        Both must include feeder and name columns.
+
+    """
+    for table, df in zip(UPGRADE_COSTS_TABLES, (summary, components)):
+        table_dir = os.path.join(directory, table)
+        if os.path.exists(table_dir):
+            shutil.rmtree(table_dir)
+        os.makedirs(table_dir)
+        for feeder, feeder_df in df.groupby("feeder", sort=False):
+            filename = _get_upgrade_costs_dataset_filename(directory, table, feeder)
+            feeder_df.reset_index(drop=True).to_feather(filename)
+
+    get_upgrade_cost_totals(summary).to_feather(os.path.join(directory, "totals.feather"))
+
+
+def list_upgrade_costs_dataset_feeders(directory):
+    """Return the feeders stored in an upgrade costs dataset.
+
+    Parameters
+    ----------
+    directory : str
+
+    Returns
+    -------
+    list
+
+    """
+    return sorted(
+        x[:-len(".feather")]
+        for x in os.listdir(os.path.join(directory, UPGRADE_COSTS_TABLES[0]))
+        if x.endswith(".feather")
+    )
+
+
+def read_upgrade_costs_dataset(directory, feeder, table="summary"):
+    """Return one feeder's upgrade costs from an upgrade costs dataset.
+
+    Parameters
+    ----------
+    directory : str
+    feeder : str
+    table : str
+        summary or components
+
+    Returns
+    -------
+    pd.DataFrame
+
+    """
+    if table not in UPGRADE_COSTS_TABLES:
+        raise InvalidParameter(f"table must be one of {UPGRADE_COSTS_TABLES}: {table}")
+    filename = _get_upgrade_costs_dataset_filename(directory, table, feeder)
+    if not os.path.exists(filename):
+        # The feeder's jobs had no thermal upgrades.
+        return pd.DataFrame()
+    return pd.read_feather(filename)
+
+
+def _get_upgrade_costs_dataset_filename(directory, table, feeder):
+    return os.path.join(directory, table, f"{feeder}.feather")
+
+
+# OpenDSS can output line lengths in any of these units. Dividing a length by
+# its unit's value converts it to meters, which are used for all the calculations.
+_LENGTH_UNIT_DIVISORS = {
+    "m": 1.0,
+    "mi": 1609.34,
+    "kft": 0.00328084,
+    "km": 0.001,
+    "ft": 3.28084,
+    "in": 39.3701,
+    "cm": 100,
+}
+
+# Transformers rated above this kVA are costed as substation transformers.
+_SUBSTATION_KVA_THRESHOLD = 5000  # TODO: update later?
+
+
+def _check_counts(names, counts, description):
+    """Raise AnalysisRunException if any equipment count is negative."""
+    negative = np.flatnonzero(counts < 0)
+    if negative.size > 0:
+        i = negative[0]
+        logger.error(
+            "Error: number of %s is negative: %s name=%s", description, counts[i], names[i]
+        )
+        raise AnalysisRunException(
+            "Error: number of {} is negative: {}".format(description, counts[i])
+        )
+
+
+class _TransformerCostIndex:
+    """Looks up transformer unit costs by the nearest rated kVA."""
+
+    def __init__(self, unit_cost_xfmrs):
+        # Keep the first row for each rating, as the row filters in the
+        # per-element lookup did.
+        table = unit_cost_xfmrs.drop_duplicates("rated_kva").sort_values("rated_kva")
+        self._kvas = table["rated_kva"].to_numpy(dtype=float)
+        self._install_costs = table["install_cost"].to_numpy(dtype=float)
+        self._remove_costs = table["remove_cost"].to_numpy(dtype=float)
+        substation = unit_cost_xfmrs[unit_cost_xfmrs["system"] == "substation"]
+        if substation.empty:
+            self._substation_costs = None
+        else:
+            self._substation_costs = (
+                float(substation["install_cost"].iloc[0]),
+                float(substation["remove_cost"].iloc[0]),
+            )
+
+    def get_unit_costs(self, kvas):
+        """Return the install and remove unit costs for each kVA.
+
+        Parameters
+        ----------
+        kvas : np.ndarray
+            NaN for elements that need no unit cost
+
+        Returns
+        -------
+        tuple
+            (install_costs, remove_costs) as arrays; NaN where kvas is NaN
+
+        Raises
+        ------
+        IndexError
+            Raised if a kVA needs the substation row and the table has none.
+        ValueError
+            Raised if a kVA needs a rating row and the table has none.
+
+        """
+        install_costs = np.full(kvas.size, np.nan)
+        remove_costs = np.full(kvas.size, np.nan)
+        # NaN is in neither group.
+        is_substation = kvas > _SUBSTATION_KVA_THRESHOLD
+        is_rated = kvas <= _SUBSTATION_KVA_THRESHOLD
+
+        if is_substation.any():
+            if self._substation_costs is None:
+                logger.error("No substation transformer unit cost for kVA=%s",
+                             kvas[is_substation][0])
+                raise IndexError(
+                    "unit-cost database has no substation transformer row for "
+                    f"kVA={kvas[is_substation][0]}"
+                )
+            install_costs[is_substation] = self._substation_costs[0]
+            remove_costs[is_substation] = self._substation_costs[1]
+
+        if is_rated.any():
+            if self._kvas.size == 0:
+                logger.error("No transformer unit costs for kVA=%s", kvas[is_rated][0])
+                raise ValueError(
+                    f"unit-cost database has no transformer ratings for kVA={kvas[is_rated][0]}"
+                )
+            indexes = self._find_nearest(kvas[is_rated])
+            install_costs[is_rated] = self._install_costs[indexes]
+            remove_costs[is_rated] = self._remove_costs[indexes]
+
+        return install_costs, remove_costs
+
+    def _find_nearest(self, kvas):
+        """Return the index of the nearest rating for each kVA. Ties go to the
+        smaller rating.
+
+        """
+        if self._kvas.size == 1:
+            return np.zeros(kvas.size, dtype=int)
+
+        upper = np.clip(np.searchsorted(self._kvas, kvas), 1, self._kvas.size - 1)
+        lower = upper - 1
+        use_lower = kvas - self._kvas[lower] <= self._kvas[upper] - kvas
+        return np.where(use_lower, lower, upper)
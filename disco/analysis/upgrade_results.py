@@ -0,0 +1,101 @@
+"""Parsed upgrade results consumed by UpgradeCostAnalysis."""
+
+
+class UpgradeResults:
+    """Upgrade results from one processed PyDSS upgrades file.
+
+    The file maps element names to dicts of upgrade properties. It may also
+    contain scalar values such as feederhead_basekV.
+
+    """
+
+    def __init__(self, data):
+        """Constructs UpgradeResults.
+
+        Parameters
+        ----------
+        data : dict
+            Contents of a Processed_upgrades.json or
+            Processed_voltage_upgrades.json file
+
+        """
+        self._data = data
+        self._elements = {k: v for k, v in data.items() if isinstance(v, dict)}
+
+    @property
+    def data(self):
+        """Return the raw upgrade data.
+
+        Returns
+        -------
+        dict
+
+        """
+        return self._data
+
+    def is_empty(self):
+        """Return True if the results contain no upgrade properties or values.
+
+        Returns
+        -------
+        bool
+
+        """
+        return not any(
+            not isinstance(v, dict) or v for v in self._data.values()
+        )
+
+    def get_elements(self, pattern):
+        """Return the elements whose names contain pattern, in file order.
+
+        Parameters
+        ----------
+        pattern : str
+            For example, "Line." or "Regctrl"
+
+        Returns
+        -------
+        dict
+            Maps element name to its upgrade properties.
+
+        """
+        return {k: v for k, v in self._elements.items() if pattern in k}
+
+    def count_elements(self, pattern, conditions):
+        """Count the elements matching pattern whose properties equal all
+        conditions. A missing property never matches.
+
+        Parameters
+        ----------
+        pattern : str
+        conditions : dict
+            Maps property name to required value.
+
+        Returns
+        -------
+        int
+
+        """
+        return sum(
+            all(props.get(name) == value for name, value in conditions.items())
+            for props in self.get_elements(pattern).values()
+        )
+
+    def sum_property(self, pattern, name):
+        """Sum one property over the elements matching pattern. Elements
+        without the property are skipped.
+
+        Parameters
+        ----------
+        pattern : str
+        name : str
+
+        Returns
+        -------
+        int | float
+
+        """
+        return sum(
+            props[name] for props in self.get_elements(pattern).values()
+            if props.get(name) is not None
+        )
@@ -1,16 +1,28 @@
 """Collects upgraded component information from PyDssSimulation jobs."""
 
 import json
-import os
 
 import pandas as pd
 
+from disco.analysis.upgrade_cost_analysis import read_job_component_costs
+
 
 class UpgradedComponentCollector:
     """Collects upgraded component information from a PyDssSimulation job."""
 
     UPGRADES_FILE = "Scenarios/ThermalUpgrade/PostProcess/Processed_upgrades.json"
 
+    # Maps the columns of read_job_component_costs to the names reported here.
+    _COST_COLUMNS = {
+        "id": "name",
+        "new_equip_cost": "new_equipment_cost",
+        "upgraded_equip_cost": "upgraded_equipment_cost",
+        "type": "type",
+    }
+    _COMPONENT_CATEGORIES = (
+        "upgraded_transformers", "new_transformers", "upgraded_lines", "new_lines"
+    )
+
     def __init__(self, job, job_dir, pydss_results):
         """Constructs UpgradeAnalysis.
 
@@ -42,39 +54,7 @@ class UpgradedComponentCollector:
                   'type': 'transformer'}]
 
         """
-        components = []
-        line_costs_file = os.path.join(
-            self._job_dir,
-            "post_process",
-            "detailed_line_upgrade_costs.csv",
-        )
-        t_costs_file = os.path.join(
-            self._job_dir,
-            "post_process",
-            "detailed_transformer_costs.csv",
-        )
-
-        components += self._get_component_costs(line_costs_file, "line")
-        components += self._get_component_costs(t_costs_file, "transformer")
-        return components
-
-    @staticmethod
-    def _get_component_costs(filename, component_type):
-        components = []
-        components_df = pd.read_csv(filename)
-        if components_df.empty:
-            return components
-
-        components_df.drop("Unnamed: 0", axis=1, inplace=True)
-        components_df.columns = [
-            "name", "new_equipment_cost", "upgraded_equipment_cost"
-        ]
-        for _, row in components_df.iterrows():
-            data = row.to_dict()
-            data["type"] = component_type
-            components.append(data)
-
-        return components
+        return self._read_component_costs(self._job_dir).to_dict("records")
 
     def get_new_and_upgraded_components(self):
         """Get information on new and upgraded lines and transformers.
@@ -95,93 +75,115 @@ class UpgradedComponentCollector:
 
         """
         data = json.loads(self._pydss_results.read_file(self.UPGRADES_FILE))
+        return self._classify_components(data)
+
+    @classmethod
+    def collect_component_costs(cls, job_dirs):
+        """Get the new and upgrade line and transformer costs of many jobs.
+
+        Parameters
+        ----------
+        job_dirs : dict
+            Maps job name to job output directory.
+
+        Returns
+        -------
+        pd.DataFrame
+            Columns are job plus the keys returned by get_component_costs.
+
+        """
+        dfs = []
+        for job_name, job_dir in job_dirs.items():
+            df = cls._read_component_costs(job_dir)
+            df.insert(0, "job", job_name)
+            dfs.append(df)
+
+        if not dfs:
+            return pd.DataFrame(columns=["job"] + list(cls._COST_COLUMNS.values()))
+        return pd.concat(dfs, ignore_index=True)
+
+    @classmethod
+    def collect_new_and_upgraded_components(cls, pydss_results_by_job):
+        """Get information on new and upgraded lines and transformers of many
+        jobs.
+
+        Parameters
+        ----------
+        pydss_results_by_job : dict
+            Maps job name to the PyDssResults object for the job's project.
+
+        Returns
+        -------
+        dict
+            Has the keys returned by get_new_and_upgraded_components. Each
+            value is a DataFrame with a job column.
+
+        """
+        records = {x: [] for x in cls._COMPONENT_CATEGORIES}
+        for job_name, pydss_results in pydss_results_by_job.items():
+            data = json.loads(pydss_results.read_file(cls.UPGRADES_FILE))
+            for category, items in cls._classify_components(data).items():
+                for item in items:
+                    item["job"] = job_name
+                records[category] += items
 
         return {
-            "upgraded_transformers": self._get_upgraded_transformers(data),
-            "new_transformers": self._get_new_transformers(data),
-            "upgraded_lines": self._get_upgraded_lines(data),
-            "new_lines": self._get_new_lines(data),
+            category: pd.DataFrame.from_records(items)
+            for category, items in records.items()
         }
 
-    @staticmethod
-    def _get_upgraded_transformers(data):
-        upgraded_transformers = []
-        for transformer, t_data in data.items():
-            if not transformer.startswith("Transformer"):
-                continue
-            info = t_data.get("upgrade")
-            if info and len(info) >= 2 and info[0] > 0:
-                new_kva = info[1][0]["kva"][0]
-                orig_kva = t_data["new"][1]["wdg_kvas"][0]
-                upgraded_transformers.append(
-                    {
-                        "transformer": transformer,
-                        "original_kva": orig_kva,
-                        "new_kva": new_kva,
-                    }
-                )
-
-        return upgraded_transformers
-
-    @staticmethod
-    def _get_new_transformers(data):
-        new_transformers = []
-        for transformer, t_data in data.items():
-            if not transformer.startswith("Transformer"):
-                continue
-            info = t_data.get("new")
-            new_transformer_count = info[0]
-            if new_transformer_count > 0:
-                new_transformers.append(
-                    {
-                        "transformer": transformer,
-                        "new_transformer_count": new_transformer_count,
-                        "kva": info[1]["wdg_kvs"][0],
-                    }
-                )
-
-        return new_transformers
-
-    @staticmethod
-    def _get_upgraded_lines(data):
-        upgraded_lines = []
-        for line, l_data in data.items():
-            if not line.startswith("Line"):
-                continue
-            info = l_data.get("upgrade")
-            if info and len(info) >= 2 and info[0] > 0:
-                new_ampacity = info[1]["ampacity"]
-                # TODO: how to get original ampacity? This is a guess.
-                # Need  data to confirm.
-                orig_ampacity = l_data["new"][1]["Ampacity"]
-                upgraded_lines.append(
-                    {
-                        "line": line,
-                        "original_ampacity": orig_ampacity,
-                        "new_ampacity": new_ampacity,
-                    }
-                )
-
-        return upgraded_lines
-
-    @staticmethod
-    def _get_new_lines(data):
-        new_lines = []
-        for line, l_data in data.items():
-            if not line.startswith("Line"):
-                continue
-            info = l_data.get("new")
-            new_line_count = info[0]
-            if new_line_count > 0:
-                new_lines.append(
-                    {
-                        "line": line,
-                        "new_line_count": new_line_count,
-                        "ampacity": info[1]["Ampacity"],
-                    }
-                )
-
-        return new_lines
+    @classmethod
+    def _read_component_costs(cls, job_dir):
+        components = read_job_component_costs(job_dir)
+        return components[list(cls._COST_COLUMNS)].rename(columns=cls._COST_COLUMNS)
+
+    @classmethod
+    def _classify_components(cls, data):
+        """Classify the lines and transformers in one pass over the upgrades."""
+        components = {x: [] for x in cls._COMPONENT_CATEGORIES}
+        for name, values in data.items():
+            if name.startswith("Transformer"):
+                new_info = values.get("new")
+                upgrade_info = values.get("upgrade")
+                if upgrade_info and len(upgrade_info) >= 2 and upgrade_info[0] > 0:
+                    components["upgraded_transformers"].append(
+                        {
+                            "transformer": name,
+                            "original_kva": new_info[1]["wdg_kvas"][0],
+                            "new_kva": upgrade_info[1][0]["kva"][0],
+                        }
+                    )
+                if new_info[0] > 0:
+                    components["new_transformers"].append(
+                        {
+                            "transformer": name,
+                            "new_transformer_count": new_info[0],
+                            "kva": new_info[1]["wdg_kvs"][0],
+                        }
+                    )
+            elif name.startswith("Line"):
+                new_info = values.get("new")
+                upgrade_info = values.get("upgrade")
+                if upgrade_info and len(upgrade_info) >= 2 and upgrade_info[0] > 0:
+                    # TODO: how to get original ampacity? This is a guess.
+                    # Need  data to confirm.
+                    components["upgraded_lines"].append(
+                        {
+                            "line": name,
+                            "original_ampacity": new_info[1]["Ampacity"],
+                            "new_ampacity": upgrade_info[1]["ampacity"],
+                        }
+                    )
+                if new_info[0] > 0:
+                    components["new_lines"].append(
+                        {
+                            "line": name,
+                            "new_line_count": new_info[0],
+                            "ampacity": new_info[1]["Ampacity"],
+                        }
+                    )
+
+        return components
 
 
 """
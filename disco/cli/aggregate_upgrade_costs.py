@@ -0,0 +1,105 @@
+"""CLI command to aggregate upgrade costs across all jobs."""
+
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import pandas as pd
+
+from jade.common import CONFIG_FILE, JOBS_OUTPUT_DIR
+from jade.loggers import setup_logging
+from jade.result import ResultsSummary
+from jade.utils.utils import load_data
+
+from disco.analysis.upgrade_cost_analysis import (
+    UPGRADE_COSTS_DATASET_DIRNAME,
+    read_job_upgrade_costs,
+    write_upgrade_costs_dataset,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+@click.command()
+@click.argument("output", type=click.Path(exists=True))
+@click.option(
+    "-n", "--num-processes",
+    type=int,
+    default=None,
+    show_default=True,
+    help="Number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Enable debug logging",
+)
+def aggregate_upgrade_costs(output, num_processes, verbose):
+    """Aggregate the upgrade costs of all successful jobs in an output directory."""
+    level = logging.DEBUG if verbose else logging.INFO
+    setup_logging(__name__, None, console_level=level)
+
+    job_names = {x.name for x in ResultsSummary(output).get_successful_results()}
+    job_outputs = os.path.join(output, JOBS_OUTPUT_DIR)
+    jobs = [
+        (job_outputs, _get_job_info(job))
+        for job in load_data(os.path.join(output, CONFIG_FILE))["jobs"]
+        if job["name"] in job_names
+    ]
+
+    num_processes = num_processes or os.cpu_count()
+    chunksize = max(1, len(jobs) // (4 * num_processes))
+    summaries = []
+    components = []
+    with ProcessPoolExecutor(max_workers=num_processes) as executor:
+        for result in executor.map(_read_job, jobs, chunksize=chunksize):
+            if result is not None:
+                summaries.append(result[0])
+                components.append(result[1])
+
+    num_failed = len(jobs) - len(summaries)
+    if summaries:
+        directory = os.path.join(output, UPGRADE_COSTS_DATASET_DIRNAME)
+        write_upgrade_costs_dataset(
+            directory,
+            pd.concat(summaries, ignore_index=True),
+            pd.concat(components, ignore_index=True),
+        )
+        print(f"Wrote upgrade costs for {len(summaries)} jobs to {directory}")
+    if num_failed:
+        print(f"Failed to read upgrade costs for {num_failed} jobs")
+        sys.exit(1)
+
+
+def _get_job_info(job):
+    deployment = job["deployment"]
+    project_data = deployment.get("project_data") or {}
+    return {
+        "name": job["name"],
+        "feeder": deployment["feeder"],
+        "placement": project_data.get("placement_type"),
+        "sample": project_data.get("sample"),
+        "penetration": project_data.get("penetration"),
+    }
+
+
+def _read_job(args):
+    """Return one job's summary and component costs, or None on failure."""
+    job_outputs, job_info = args
+    try:
+        summary, components = read_job_upgrade_costs(
+            os.path.join(job_outputs, job_info["name"])
+        )
+    except Exception:
+        logger.exception("Failed to read upgrade costs for job=%s", job_info["name"])
+        return None
+
+    # Put the job columns first.
+    for df in (summary, components):
+        for i, (column, value) in enumerate(job_info.items()):
+            df.insert(i, column, value)
+    return summary, components
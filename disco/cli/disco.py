@@ -4,10 +4,13 @@ import logging
 
 import click
 
+from disco.cli.aggregate_upgrade_costs import aggregate_upgrade_costs
 from disco.cli.config import config
 from disco.cli.configure_analysis import generate_analysis
 from disco.cli.simulation_models import simulation_models
 from disco.cli.download_source import download_source
+from disco.cli.post_process_snapshot_impact_analysis import \
+    post_process_snapshot_impact_analysis
 from disco.cli.transform_model import generate_transform_model_config
 from disco.cli.transform_model import transform_model
 
@@ -26,3 +29,5 @@ cli.add_command(simulation_models)
 cli.add_command(download_source)
 cli.add_command(generate_transform_model_config)
 cli.add_command(transform_model)
+cli.add_command(post_process_snapshot_impact_analysis)
+cli.add_command(aggregate_upgrade_costs)
@@ -0,0 +1,134 @@
+"""CLI command to run snapshot impact analysis on all jobs in one batch."""
+
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+import pandas as pd
+
+from jade.common import CONFIG_FILE, JOBS_OUTPUT_DIR
+from jade.loggers import setup_logging
+from jade.result import ResultsSummary
+from jade.utils.utils import dump_data, load_data
+
+from disco.analysis import SnapshotImpactAnalysis
+from disco.analysis.snapshot_impact_analysis import ELEMENT_LOADINGS_DIRNAME, \
+    RESULTS_DATASET_DIRNAME, list_results_dataset_feeders, merge_all_element_loadings, \
+    merge_results_dataset
+from disco.extensions.pydss_simulation.pydss_configuration import PyDssConfiguration
+
+
+BATCH_RESULTS_FILENAME = "snapshot-impact-analysis-batch-post-process.feather"
+POST_PROCESS_RESULTS_FILENAME = "post-process-results.json"
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker.
+_config = None
+_job_outputs = None
+_overrides = None
+
+
+@click.command()
+@click.argument("output", type=click.Path(exists=True))
+@click.option(
+    "-n", "--num-processes",
+    type=int,
+    default=None,
+    show_default=True,
+    help="Number of worker processes. Defaults to the number of CPUs.",
+)
+@click.option(
+    "--verbose",
+    is_flag=True,
+    default=False,
+    help="Enable debug logging",
+)
+def post_process_snapshot_impact_analysis(output, num_processes, verbose):
+    """Run snapshot impact analysis on all successful jobs in an output directory."""
+    level = logging.DEBUG if verbose else logging.INFO
+    setup_logging(__name__, None, console_level=level)
+
+    config_file = os.path.join(output, CONFIG_FILE)
+    data = load_data(config_file)
+    overrides = (data.get("job_post_process_config") or {}).get("data") or {}
+    job_names = [x.name for x in ResultsSummary(output).get_successful_results()]
+    base_cases, other_jobs = _split_base_cases(data["jobs"], job_names)
+
+    num_processes = num_processes or os.cpu_count()
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=num_processes,
+        initializer=_init_worker,
+        initargs=(config_file, os.path.join(output, JOBS_OUTPUT_DIR), overrides),
+    ) as executor:
+        # Base cases write the voltage caches read by the other jobs on their feeders.
+        for names in (base_cases, other_jobs):
+            chunksize = max(1, len(names) // (4 * num_processes))
+            for result in executor.map(_run_job, names, chunksize=chunksize):
+                if result is not None:
+                    results.append(result)
+
+    dataset_path = os.path.join(output, JOBS_OUTPUT_DIR, RESULTS_DATASET_DIRNAME)
+    if os.path.isdir(dataset_path):
+        # output_format=feather: each job wrote one part.
+        for feeder in list_results_dataset_feeders(dataset_path):
+            merge_results_dataset(dataset_path, feeder)
+
+    loadings_path = os.path.join(output, JOBS_OUTPUT_DIR, ELEMENT_LOADINGS_DIRNAME)
+    if os.path.isdir(loadings_path):
+        merge_all_element_loadings(loadings_path)
+
+    num_failed = len(job_names) - len(results)
+    if results:
+        filename = os.path.join(output, BATCH_RESULTS_FILENAME)
+        pd.DataFrame.from_records(results).to_feather(filename)
+        print(f"Wrote results for {len(results)} jobs to {filename}")
+    if num_failed:
+        print(f"Post-process failed for {num_failed} jobs")
+        sys.exit(1)
+
+
+def _split_base_cases(jobs, job_names):
+    """Split job names into base cases and all other jobs, preserving order."""
+    names = set(job_names)
+    base_cases = [
+        x["name"] for x in jobs
+        if x["name"] in names and x.get("base_case") == x["name"]
+    ]
+    base_case_names = set(base_cases)
+    other_jobs = [x for x in job_names if x not in base_case_names]
+    return base_cases, other_jobs
+
+
+def _init_worker(config_file, job_outputs, overrides):
+    global _config, _job_outputs, _overrides
+    _config = PyDssConfiguration.deserialize_lazily(config_file)
+    _job_outputs = job_outputs
+    _overrides = overrides
+
+
+def _run_job(job_name):
+    """Run the analysis for one job and return its results, or None on failure."""
+    try:
+        analysis = SnapshotImpactAnalysis(overrides=_overrides, job_name=job_name)
+        analysis.run(_job_outputs, config=_config)
+    except Exception:
+        logger.exception("Snapshot impact analysis failed for job=%s", job_name)
+        return None
+
+    results = analysis.get_results()
+    # Same layout as the post-process results written by JADE.
+    dump_data(
+        {
+            "job": job_name,
+            "post-process": SnapshotImpactAnalysis.__name__,
+            "results": results,
+        },
+        os.path.join(_job_outputs, job_name, POST_PROCESS_RESULTS_FILENAME),
+    )
+    data = dict(results["outputs"][0]["data"])
+    data["name"] = job_name
+    return data
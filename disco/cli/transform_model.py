@@ -54,23 +54,46 @@ def generate_transform_model_config(input_path, analysis_type, config_file):
     default=False,
     show_default=True,
 )
-def transform_model(config_file, output, force):
+@click.option(
+    "-i", "--incremental",
+    help="update an existing output directory, only regenerating deployments "
+         "whose inputs changed",
+    is_flag=True,
+    default=False,
+    show_default=True,
+)
+@click.option(
+    "-n", "--num-processes",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of worker processes. Feeders are transformed in parallel.",
+)
+def transform_model(config_file, output, force, incremental, num_processes):
     """Transform input data into a DISCO model"""
-    if os.path.exists(output):
-        if force:
-            shutil.rmtree(output)
-            os.mkdir(output)
-        else:
-            raise InvalidParameter(f"output={output} exists. Set --force to overwrite")
-
     config = load_data(config_file)
     source_type = make_source_model(config["input_path"])
     if source_type.__name__ != config["source_type"]:
         raise InvalidConfiguration(
             f"type mismatch: {source_type.__name__} / config['source_type']"
         )
+    if incremental and force:
+        raise InvalidParameter("--force and --incremental are mutually exclusive")
+    if incremental and not source_type.SUPPORTS_INCREMENTAL_TRANSFORM:
+        raise InvalidParameter(f"{source_type.__name__} does not support --incremental")
+
+    if os.path.exists(output) and not incremental:
+        if force:
+            shutil.rmtree(output)
+            os.mkdir(output)
+        else:
+            raise InvalidParameter(
+                f"output={output} exists. Set --force to overwrite or --incremental to update"
+            )
 
     analysis_type = AnalysisType(config["analysis_type"])
     simulation_model = get_model_class_by_analysis_type(analysis_type)
-    source_type.transform(config, simulation_model, output)
+    source_type.transform(
+        config, simulation_model, output, num_processes=num_processes, incremental=incremental
+    )
     print(f"Transformed source data {config['input_path']} to {output}")
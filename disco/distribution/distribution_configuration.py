@@ -5,6 +5,7 @@ import logging
 from jade.jobs.job_configuration import JobConfiguration
 from jade.jobs.job_container_by_key import JobContainerByKey
 from jade.utils.utils import load_data
+from disco.distribution.lazy_job_container import LazyJobContainer
 
 
 logger = logging.getLogger(__name__)
@@ -24,10 +25,17 @@ class DistributionConfiguration(JobConfiguration):
         ----------
         inputs : str | JobInputsInterface
             path to inputs directory or JobInputsInterface object
+        serialized_jobs : list | None
+            If set, jobs are deserialized from this list on first access.
 
         """
+        serialized_jobs = kwargs.pop("serialized_jobs", None)
+        if serialized_jobs is None:
+            container = JobContainerByKey()
+        else:
+            container = LazyJobContainer(job_parameters_class, serialized_jobs)
         super(DistributionConfiguration, self).__init__(inputs,
-                                                        JobContainerByKey(),
+                                                        container,
                                                         job_parameters_class,
                                                         extension_name,
                                                         **kwargs)
@@ -42,6 +50,31 @@ class DistributionConfiguration(JobConfiguration):
         data["do_not_deserialize_jobs"] = do_not_deserialize_jobs
         return cls(inputs, **data)
 
+    @classmethod
+    def deserialize_lazily(cls, filename_or_data):
+        """Deserialize a configuration without deserializing all of its jobs.
+
+        Jobs are kept in their serialized form and each one is deserialized
+        the first time it is accessed. All job accessors behave as with
+        deserialize. Use this when only a few jobs are needed from a large
+        configuration.
+
+        Parameters
+        ----------
+        filename_or_data : str | dict
+
+        Returns
+        -------
+        DistributionConfiguration
+
+        """
+        if isinstance(filename_or_data, str):
+            data = load_data(filename_or_data)
+        else:
+            data = dict(filename_or_data)
+        data["serialized_jobs"] = data.pop("jobs", [])
+        return cls.deserialize(data)
+
     @property
     def base_directory(self):
         """Return the base directory for the inputs."""
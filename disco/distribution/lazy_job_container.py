@@ -0,0 +1,88 @@
+"""Implements a job container that deserializes jobs on first access."""
+
+from collections import OrderedDict
+import logging
+
+from jade.exceptions import InvalidParameter
+from jade.jobs.job_container_interface import JobContainerInterface
+
+
+logger = logging.getLogger(__name__)
+
+
+class LazyJobContainer(JobContainerInterface):
+    """Stores serialized jobs by name and deserializes each job the first
+    time it is accessed. Deserialized jobs are kept, so later accesses are
+    free.
+
+    """
+
+    def __init__(self, job_parameters_class, serialized_jobs):
+        """Constructs LazyJobContainer.
+
+        Parameters
+        ----------
+        job_parameters_class : class
+            Deserializes one job
+        serialized_jobs : list
+            Serialized jobs, such as the 'jobs' entry of config.json
+
+        """
+        self._job_parameters_class = job_parameters_class
+        # Job name: serialized dict or deserialized job
+        self._jobs = OrderedDict((x["name"], x) for x in serialized_jobs)
+
+    def __iter__(self):
+        for name in list(self._jobs):
+            yield self._get(name)
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def _get(self, name):
+        job = self._jobs[name]
+        if isinstance(job, dict):
+            job = self._job_parameters_class.deserialize(job)
+            self._jobs[name] = job
+        return job
+
+    def add_job(self, job, key=None):
+        if key is None:
+            key = job.name
+
+        if key in self._jobs:
+            raise InvalidParameter(f"key={key} is already stored")
+
+        self._jobs[key] = job
+        logger.debug("Added job %s", key)
+
+    def clear(self):
+        self._jobs.clear()
+        logger.debug("Cleared all jobs.")
+
+    def get_job(self, name):
+        if name not in self._jobs:
+            raise InvalidParameter(f"job {name} not found")
+
+        return self._get(name)
+
+    def get_job_by_key(self, key):
+        return self.get_job(key)
+
+    def get_jobs(self, sort=False):
+        names = list(self._jobs)
+        if sort:
+            names.sort()
+        return [self._get(x) for x in names]
+
+    def list_jobs(self):
+        return list(self)
+
+    def remove_job(self, job=None, key=None):
+        if key is None:
+            if job is None:
+                raise InvalidParameter("either key or job must be passed")
+            key = job.name
+
+        self._jobs.pop(key)
+        logger.info("Removed job with key=%s", key)
@@ -2,19 +2,25 @@
 
 Merge the pydss simulation results into one CSV file.
 """
+import csv
+import heapq
+import json
 import logging
+import math
 import os
+import tempfile
 from concurrent.futures import ProcessPoolExecutor
 import itertools
 
 import click
-import pandas as pd
 
 from jade.common import JOBS_OUTPUT_DIR
 from jade.result import ResultsSummary
 from jade.utils.utils import load_data
 
-from disco.extensions.pydss_simulation.pydss_configuration import PyDssConfiguration
+from disco.analysis.snapshot_impact_analysis import ELEMENT_LOADINGS_DIRNAME, \
+    RESULTS_DATASET_DIRNAME, list_results_dataset_feeders, merge_all_element_loadings, \
+    merge_results_dataset
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +33,25 @@ def cli():
 @cli.command()
 @click.argument('previous_stage_output')
 @click.argument('current_stage_output')
-def run(previous_stage_output, current_stage_output):
+@click.option(
+    "--batch-size",
+    type=int,
+    default=10000,
+    show_default=True,
+    help="Number of job results read by the process pool at a time.",
+)
+@click.option(
+    "--max-buffered-results",
+    type=int,
+    default=100000,
+    show_default=True,
+    help="Spill buffered job results to disk when this many are held in memory.",
+)
+def run(previous_stage_output, current_stage_output, batch_size, max_buffered_results):
     """Merge the pydss simulation results into one CSV file."""
     logger.info("Start batch post-processing...")
 
-    output_config_path = os.path.join(previous_stage_output, 'config.json')
-    config = PyDssConfiguration.deserialize(output_config_path)
     job_pp_path = os.path.join(previous_stage_output, JOBS_OUTPUT_DIR)
-    all_pp_results = {}
 
     # build list of only successful results
     stage1_results = ResultsSummary(previous_stage_output)
@@ -42,29 +59,193 @@ def run(previous_stage_output, current_stage_output):
     for job in stage1_results.get_successful_results():
         job_names.append(job.name)
 
-    # create list of single job path to pass to executor
-    job_paths = itertools.repeat(job_pp_path, len(job_names))
-    jobs_post_process_results = {}
+    loadings_path = os.path.join(job_pp_path, ELEMENT_LOADINGS_DIRNAME)
+    if os.path.isdir(loadings_path):
+        merge_all_element_loadings(loadings_path)
 
-    with ProcessPoolExecutor() as executor:
-        jobs_post_process_results = executor.map(_get_job_post_process_results,
-                                                 job_paths, job_names)
+    dataset_path = os.path.join(job_pp_path, RESULTS_DATASET_DIRNAME)
+    if os.path.isdir(dataset_path):
+        # The jobs wrote their results to a per-feeder columnar dataset.
+        _merge_results_dataset(dataset_path, job_names, current_stage_output)
+        return
 
-    for job in jobs_post_process_results:
-        job_config = config.get_job(job.get("name"))
-        if job_config.feeder not in all_pp_results:
-            all_pp_results.update({job_config.feeder: list()})
+    output_dir = os.path.join(current_stage_output, JOBS_OUTPUT_DIR)
 
-        all_pp_results[job_config.feeder].append(job)
+    with tempfile.TemporaryDirectory(dir=current_stage_output) as spill_dir:
+        merger = FeederResultsMerger(spill_dir, max_buffered_results)
+        with ProcessPoolExecutor() as executor:
+            chunksize = max(1, batch_size // (4 * (os.cpu_count() or 1)))
+            # Submit one batch at a time so that pending results stay bounded.
+            for i in range(0, len(job_names), batch_size):
+                batch = job_names[i:i + batch_size]
+                job_paths = itertools.repeat(job_pp_path, len(batch))
+                for job in executor.map(_get_job_post_process_results, job_paths, batch,
+                                        chunksize=chunksize):
+                    # SnapshotImpactAnalysis records the feeder in each job's results,
+                    # so the config does not need to be deserialized to group them.
+                    merger.add(job["feeder"], job)
 
-    for feeder in all_pp_results:
-        # output to csv
-        result_df = pd.DataFrame(all_pp_results[feeder],
-                                 columns=all_pp_results[feeder][0].keys())
+        for feeder in merger.list_feeders():
+            output_csv = f"{feeder}-snapshot-impact-analysis-batch-post-process.csv"
+            merger.write_feeder_results(feeder, os.path.join(output_dir, output_csv))
+            logger.info("Dumped aggregated results to %s", output_csv)
+
+
+class FeederResultsMerger:
+    """Groups job results by feeder and writes them sorted by penetration.
+
+    Results are buffered in memory. When the buffer is full, each feeder's
+    results are sorted and spilled to a run file. The runs are then merged
+    when the feeder's output is written.
+
+    The CSV files match the ones written from a DataFrame of each feeder's
+    results: values are formatted according to the dtype that pandas would
+    infer for the whole column.
+
+    """
+
+    def __init__(self, spill_dir, max_buffered_results):
+        self._spill_dir = spill_dir
+        self._max_buffered_results = max_buffered_results
+        self._buffers = {}
+        self._runs = {}
+        self._columns = {}
+        self._kinds = {}
+        self._num_buffered = 0
+
+    def add(self, feeder, result):
+        """Add one job's results.
+
+        Parameters
+        ----------
+        feeder : str
+        result : dict
+
+        """
+        if feeder not in self._columns:
+            # Same as a DataFrame built from the feeder's results: the first
+            # result defines the columns.
+            self._columns[feeder] = list(result.keys())
+            self._kinds[feeder] = {x: set() for x in result}
+            self._buffers[feeder] = []
+            self._runs[feeder] = []
+
+        for column, kinds in self._kinds[feeder].items():
+            kinds.add(_get_value_kind(result.get(column)))
+        self._buffers[feeder].append(result)
+        self._num_buffered += 1
+        if self._num_buffered >= self._max_buffered_results:
+            self._spill()
+
+    def list_feeders(self):
+        """Return the feeders with results.
+
+        Returns
+        -------
+        list
+
+        """
+        return list(self._columns)
+
+    def write_feeder_results(self, feeder, filename):
+        """Write a feeder's results to a CSV file, sorted by penetration.
+
+        Parameters
+        ----------
+        feeder : str
+        filename : str
+
+        """
+        self._spill_feeder(feeder)
+        columns = self._columns[feeder]
+        formatters = [_get_column_formatter(self._kinds[feeder][x]) for x in columns]
+        runs = [self._read_run(x) for x in self._runs[feeder]]
+        # Same dialect as DataFrame.to_csv.
+        with open(filename, "w", newline="") as f_out:
+            writer = csv.writer(f_out, lineterminator=os.linesep)
+            writer.writerow(columns)
+            for result in heapq.merge(*runs, key=_penetration_sort_key):
+                writer.writerow([f(result.get(x)) for f, x in zip(formatters, columns)])
+
+    def _spill(self):
+        for feeder in self._buffers:
+            self._spill_feeder(feeder)
+        self._num_buffered = 0
+
+    def _spill_feeder(self, feeder):
+        buffer = self._buffers[feeder]
+        if not buffer:
+            return
+
+        buffer.sort(key=_penetration_sort_key)
+        filename = os.path.join(self._spill_dir, f"{feeder}-{len(self._runs[feeder])}.jsonl")
+        with open(filename, "w") as f_out:
+            for result in buffer:
+                f_out.write(json.dumps(result) + "\n")
+        self._runs[feeder].append(filename)
+        self._num_buffered -= len(buffer)
+        self._buffers[feeder] = []
+
+    @staticmethod
+    def _read_run(filename):
+        with open(filename) as f_in:
+            for line in f_in:
+                yield json.loads(line)
+
+
+def _penetration_sort_key(result):
+    # Results without a penetration sort last, as with DataFrame.sort_values.
+    penetration = result.get("penetration")
+    if _is_missing(penetration):
+        return (True, 0)
+    return (False, penetration)
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _get_value_kind(value):
+    if _is_missing(value):
+        return "missing"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "object"
+
+
+def _get_column_formatter(kinds):
+    """Return a function that formats a column's values like DataFrame.to_csv.
+
+    pandas infers int64 for int-only columns, float64 for numbers mixed with
+    missing values, bool for bool-only columns, and object otherwise. float64
+    values are written as floats (12 becomes '12.0'), and missing values in
+    float64 and object columns are written as empty fields.
+
+    """
+    numeric = kinds & {"int", "float"}
+    if numeric and kinds <= {"int", "float", "missing"} and kinds != {"int"}:
+        return lambda x: "" if _is_missing(x) else repr(float(x))
+    return lambda x: "" if _is_missing(x) else str(x)
+
+
+def _merge_results_dataset(dataset_path, job_names, current_stage_output):
+    """Write the per-feeder CSV files from a snapshot results dataset."""
+    job_names = set(job_names)
+    for feeder in list_results_dataset_feeders(dataset_path):
+        # Concatenates the parts written by each job.
+        result_df = merge_results_dataset(dataset_path, feeder)
+        result_df = result_df[result_df["name"].isin(job_names)]
+        if result_df.empty:
+            continue
 
         output_csv = f"{feeder}-snapshot-impact-analysis-batch-post-process.csv"
         filename = os.path.join(current_stage_output, JOBS_OUTPUT_DIR, output_csv)
 
+        result_df = result_df.drop(columns=["feeder_head_info"], errors="ignore")
         result_df.sort_values("penetration", inplace=True)
         result_df.to_csv(filename, index=False)
         logger.info("Dumped aggregated results to %s", output_csv)
@@ -120,8 +120,11 @@ class PyDssConfiguration(PyDssConfigurationBase):
         PyDssJobException
 
         """
-        for job in self.get_feeder_jobs(feeder):
-            if job.name == deployment:
-                return job
+        try:
+            job = self.get_job(deployment)
+        except InvalidParameter:
+            job = None
+        if job is not None and job.feeder == feeder:
+            return job
 
         raise PyDssJobException(f"No Job with deployment name {deployment} in feeder {feeder}")
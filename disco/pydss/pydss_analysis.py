@@ -12,7 +12,7 @@ from jade.jobs.job_analysis import JobAnalysis
 from jade.utils.utils import load_data
 from PyDSS.pydss_results import PyDssResults
 from disco.sources.gem.make_element_bus_mapping import get_bus_to_element, \
-    REGION_BUS_MAPPING_FILENAME
+    get_binary_bus_mapping_directory, BinaryBusMapping, REGION_BUS_MAPPING_FILENAME
 
 
 logger = logging.getLogger(__name__)
@@ -201,24 +201,29 @@ class PyDssScenarioAnalysis:
 
         """
         input_directory = self._job.deployment.directory
-        bus_mapping_file = os.path.join(
-            input_directory, REGION_BUS_MAPPING_FILENAME
-        )
-        if not os.path.exists(bus_mapping_file):
-            raise InvalidConfiguration(f"{bus_mapping_file} does not exist")
-
-        summary = load_data(bus_mapping_file)
-        if self._feeder not in summary:
-            raise InvalidConfiguration(
-                f"{bus_mapping_file} does not contain feeder={self._feeder}"
-            )
-
-        feeder_file = summary[self._feeder]
-        feeder_mapping = load_data(feeder_file)
-
         bus_to_elems = {}
-        get_bus_to_element(bus_to_elems, feeder_mapping, "pv_systems")
-        get_bus_to_element(bus_to_elems, feeder_mapping, "loads")
+        binary_directory = get_binary_bus_mapping_directory(input_directory, self._feeder)
+        if os.path.isdir(binary_directory):
+            bus_mapping = BinaryBusMapping(binary_directory)
+            bus_mapping.get_bus_to_element(bus_to_elems, "pv_systems")
+            bus_mapping.get_bus_to_element(bus_to_elems, "loads")
+        else:
+            # Mappings made before the binary format existed.
+            bus_mapping_file = os.path.join(
+                input_directory, REGION_BUS_MAPPING_FILENAME
+            )
+            if not os.path.exists(bus_mapping_file):
+                raise InvalidConfiguration(f"{bus_mapping_file} does not exist")
+
+            summary = load_data(bus_mapping_file)
+            if self._feeder not in summary:
+                raise InvalidConfiguration(
+                    f"{bus_mapping_file} does not contain feeder={self._feeder}"
+                )
+
+            feeder_mapping = load_data(summary[self._feeder])
+            get_bus_to_element(bus_to_elems, feeder_mapping, "pv_systems")
+            get_bus_to_element(bus_to_elems, feeder_mapping, "loads")
 
         pv_systems = self._scenario.read_element_info_file("PVSystems")
         loads = self._scenario.read_element_info_file("Loads")
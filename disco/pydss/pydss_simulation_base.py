@@ -5,6 +5,7 @@ import copy
 import logging
 import os
 
+from PyDSS.pydss_fs_interface import STORE_FILENAME
 from PyDSS.pydss_project import update_pydss_controllers
 from PyDSS.pydss_project import PyDssProject, PyDssScenario
 
@@ -201,6 +202,11 @@ class PyDssSimulationBase(JobExecutionInterface):
             )
         return self._pydss_project.project_path
 
+    @property
+    def pydss_store_filename(self):
+        """Return the path to the PyDSS results store without loading the project."""
+        return os.path.join(self._run_dir, self._PYDSS_PROJECT_NAME, STORE_FILENAME)
+
     @property
     def results_directory(self):
         return self._results_dir
@@ -1,16 +1,41 @@
+import errno
 import fileinput
+import hashlib
+import itertools
+import json
 import logging
+import mmap
 import os
 import re
 import shutil
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 from jade.exceptions import InvalidParameter
+from jade.utils.utils import ExtendedJSONEncoder
 from disco.enums import AnalysisType, SimulationType
 from disco.models.base import OpenDssDeploymentModel
 
 
 SOURCE_CONFIGURATION_FILENAME = "configurations.json"
+TRANSFORM_MANIFEST_FILENAME = "transform-manifest.json"
+
+# model_params that select deployments rather than define their contents.
+_SELECTION_PARAMS = {
+    "substations", "feeders", "dcac_ratios", "dc_ac_ratios", "scales", "placements",
+    "deployments", "penetration_levels",
+}
+
+# Linux ioctl that clones a file with copy-on-write (btrfs, XFS).
+_FICLONE = 0x40049409
+# Errors from _link_file functions that apply to every file in the workspace.
+_UNSUPPORTED_LINK_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP}
+_REGEX_DATA_FILE = re.compile(r"file=([\.\w/\\-]+)")
 
 DEFAULT_SNAPSHOT_IMPACT_ANALYSIS_PARAMS = {
     "simulation_params": {
@@ -54,10 +79,18 @@ DEFAULT_SELECTIONS_BY_TYPE = {
 
 logger = logging.getLogger(__name__)
 
+# Set in each worker process by _init_transform_worker.
+_transform_func = None
+_transform_args = None
+
 
 class BaseSourceDataModel(ABC):
     """Base class for source data models"""
 
+    # Set to True if transform skips deployments recorded in a
+    # FeederTransformManifest whose inputs are unchanged.
+    SUPPORTS_INCREMENTAL_TRANSFORM = False
+
     @staticmethod
     def get_default_transformation_selections(analysis_type):
         """Return default selections for a transformation.
@@ -79,7 +112,8 @@ class BaseSourceDataModel(ABC):
 
     @classmethod
     @abstractmethod
-    def transform(cls, config, simulation_model, output_path):
+    def transform(cls, config, simulation_model, output_path, num_processes=1,
+                  incremental=False):
         """Transform the input data to a DISCO data model.
 
         Parameters
@@ -87,6 +121,11 @@ class BaseSourceDataModel(ABC):
         config : dict
         simulation_model : BaseAnalysisModel
         output_path : str
+        num_processes : int
+            Number of worker processes, if the source type supports it
+        incremental : bool
+            Update an existing output directory, if the source type supports
+            it. See SUPPORTS_INCREMENTAL_TRANSFORM.
 
         """
 
@@ -161,7 +200,9 @@ class BaseOpenDssModel(BaseSourceDataModel, ABC):
             src_dir=self.opendss_directory,
             dst_dir=workspace.opendss_directory,
         )
-        # This may overwrite a file copied above.
+        # This may overwrite a file linked above. Replace it rather than
+        # writing through the link into the source file.
+        _remove_file(workspace.master_file)
         shutil.copyfile(self.master_file, workspace.master_file)
         self._comment_out_solve(workspace.master_file)
         if self.loadshape_directory is not None:
@@ -217,6 +258,11 @@ class BaseOpenDssModel(BaseSourceDataModel, ABC):
     def _copy_files(src_dir, dst_dir, exclude=None):
         """Copy files from src to dst directory.
 
+        .dss and .txt files that reference data files are rewritten with
+        absolute paths. All other files are reflinked or hard-linked if the
+        filesystem allows it, so workspaces don't duplicate load shapes.
+        Replace destination files rather than modifying them in place.
+
         Parameters
         ----------
         src_dir : str
@@ -232,14 +278,19 @@ class BaseOpenDssModel(BaseSourceDataModel, ABC):
         if isinstance(exclude, str):
             exclude = [exclude]
 
-        for name in os.listdir(src_dir):
-            if name in exclude or os.path.isdir(os.path.join(src_dir, name)):
-                continue
-            src_file = os.path.join(src_dir, name)
-            dst_file = os.path.join(dst_dir, name)
-            shutil.copyfile(src_file, dst_file)
-            if os.path.splitext(dst_file)[1] in (".dss", ".txt"):
-                BaseOpenDssModel.fix_data_file_references(os.path.abspath(src_dir), dst_file)
+        src_dir = os.path.abspath(src_dir)
+        link_funcs = [_reflink_file, os.link]
+        with os.scandir(src_dir) as entries:
+            for entry in entries:
+                if entry.name in exclude or entry.is_dir():
+                    continue
+                dst_file = os.path.join(dst_dir, entry.name)
+                _remove_file(dst_file)
+                if os.path.splitext(entry.name)[1] in (".dss", ".txt") and \
+                        _has_data_file_references(entry.path):
+                    _write_fixed_data_file_references(src_dir, entry.path, dst_file)
+                else:
+                    _link_file(entry.path, dst_file, link_funcs)
 
     def _create_deployment_file(self, name, workspace, pv_profile=None):
         """Create deployment dss file.
@@ -291,18 +342,320 @@ class BaseOpenDssModel(BaseSourceDataModel, ABC):
         absolute path."""
         # Example line:
         # New Loadshape.Residential1234 npts=123456 minterval=5 mult=[file=../BuildingData/Dataset_12_34/Residential/RES1234/LoadProfiles/12345.csv]
-        regex = re.compile(r"file=([\.\w/\\-]+)")
-        def replace_func(match):
-            path = os.path.normpath(match.group(1).replace("\\", "/"))
-            new_path = "file=" + os.path.normpath(os.path.join(src_dir, path))
-            return new_path
-
         with fileinput.input(files=[filename], inplace=True) as f_in:
             for line in f_in:
-                line = re.sub(regex, replace_func, line)
+                line = _fix_data_file_references(src_dir, line)
                 print(line, end="")
                 logger.debug("line=%s", line)
 
+def transform_feeders(func, feeders, args, num_processes=1):
+    """Run func(feeder, *args) for each feeder and concatenate the returned
+    job lists in feeder order.
+
+    Feeder workspaces are independent, so feeders can run in separate
+    processes. func and args must be picklable if num_processes > 1. They are
+    sent to each worker process once rather than with every feeder.
+
+    Parameters
+    ----------
+    func : callable
+        Returns a list of job configs for one feeder.
+    feeders : list
+    args : tuple
+        Additional arguments passed to func
+    num_processes : int
+
+    Returns
+    -------
+    list
+
+    """
+    if num_processes > 1 and len(feeders) > 1:
+        with ProcessPoolExecutor(
+            max_workers=num_processes,
+            initializer=_init_transform_worker,
+            initargs=(func, args),
+        ) as executor:
+            results = list(executor.map(_run_transform_func, feeders))
+    else:
+        results = [func(feeder, *args) for feeder in feeders]
+
+    return list(itertools.chain.from_iterable(results))
+
+
+def _init_transform_worker(func, args):
+    global _transform_func, _transform_args
+    _transform_func = func
+    _transform_args = args
+
+
+def _run_transform_func(feeder):
+    return _transform_func(feeder, *_transform_args)
+
+
+def get_transform_config_digest(config, simulation_model):
+    """Return a digest of the parts of a transformation config that affect
+    each deployment. Deployments transformed with a different digest are
+    always regenerated.
+
+    The selections in model_params, such as feeders or penetration levels,
+    only choose which deployments are transformed, so they are excluded.
+    Selecting one more feeder doesn't regenerate the others.
+
+    Parameters
+    ----------
+    config : dict
+    simulation_model : BaseAnalysisModel
+
+    Returns
+    -------
+    str
+
+    """
+    config = dict(config)
+    config["model_params"] = {
+        k: v for k, v in config.get("model_params", {}).items()
+        if k not in _SELECTION_PARAMS
+    }
+    text = json.dumps(
+        {"config": config, "simulation_model": simulation_model.__name__},
+        sort_keys=True,
+        cls=ExtendedJSONEncoder,
+    )
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def write_source_configuration(output_path, config):
+    """Write the job configs to configurations.json in the output directory.
+
+    An existing file with identical contents is left untouched, so an
+    incremental transform that changed nothing does not modify it.
+
+    Parameters
+    ----------
+    output_path : str
+    config : list
+        Job configs of all feeders
+
+    Returns
+    -------
+    str
+        The filename
+
+    """
+    filename = os.path.join(output_path, SOURCE_CONFIGURATION_FILENAME)
+    text = json.dumps(config, indent=2, cls=ExtendedJSONEncoder)
+    if os.path.exists(filename):
+        with open(filename) as f_in:
+            if f_in.read() == text:
+                logger.info("Config in %s is unchanged", filename)
+                return filename
+
+    _write_text_atomically(filename, text)
+    logger.info("Wrote config to %s", filename)
+    return filename
+
+
+def remove_stale_feeder_workspaces(output_path, feeder_directories):
+    """Delete the feeder workspaces in the output directory that are not in
+    feeder_directories, such as those of feeders removed from the source data.
+    Parent directories left empty are deleted as well.
+
+    Parameters
+    ----------
+    output_path : str
+    feeder_directories : list
+        Workspaces of the feeders selected in this transform
+
+    """
+    keep = {os.path.abspath(x) for x in feeder_directories}
+    for dirpath, dirnames, _ in os.walk(output_path):
+        if not _is_feeder_workspace(dirpath, dirnames):
+            continue
+        dirnames.clear()
+        if os.path.abspath(dirpath) in keep:
+            continue
+        shutil.rmtree(dirpath)
+        logger.info("Removed stale feeder workspace %s", dirpath)
+        parent = os.path.dirname(dirpath)
+        while os.path.abspath(parent) != os.path.abspath(output_path) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+
+
+def _is_feeder_workspace(path, dirnames):
+    return (
+        os.path.exists(os.path.join(path, TRANSFORM_MANIFEST_FILENAME))
+        or {"OpenDSS", "PVDeployments"}.issubset(dirnames)
+    )
+
+
+def _write_text_atomically(filename, text):
+    # Only one process writes each file. Unlike mkstemp, open respects the
+    # umask for the permissions of the new file.
+    tmp_file = filename + ".tmp"
+    try:
+        with open(tmp_file, "w") as f_out:
+            f_out.write(text)
+        os.replace(tmp_file, filename)
+    except Exception:
+        os.remove(tmp_file)
+        raise
+
+
+class FeederTransformManifest:
+    """Records the deployments transformed into one feeder workspace so that
+    a later transform can skip deployments whose inputs are unchanged.
+
+    A deployment is unchanged if the transform config, the contents of its PV
+    deployment files and any extra inputs match the recorded digests. The
+    workspace's common files are recreated if the master file or the files in
+    the OpenDSS or load shape directories changed.
+
+    """
+
+    def __init__(self, feeder_directory, config_digest):
+        """Constructs FeederTransformManifest.
+
+        Parameters
+        ----------
+        feeder_directory : str
+            Feeder workspace in the output directory
+        config_digest : str
+            Return value of get_transform_config_digest
+
+        """
+        self._feeder_directory = feeder_directory
+        self._filename = os.path.join(feeder_directory, TRANSFORM_MANIFEST_FILENAME)
+        self._config_digest = config_digest
+        previous = self._read()
+        self._previous_jobs = previous.get("jobs", {})
+        self._previous_common_files = previous.get("common_files")
+        self._reuse_jobs = previous.get("config") == config_digest
+        self._common_files = None
+        self._digests = {}
+        self._jobs = {}
+        self._num_reused = 0
+
+    def get_unchanged_job(self, model, extra=None):
+        """Return the recorded job config of the model's deployment if its
+        inputs are unchanged. The first call recreates the workspace's common
+        files if they changed.
+
+        Parameters
+        ----------
+        model : BaseOpenDssModel
+        extra : object
+            JSON-serializable inputs of the deployment not contained in its
+            files, such as PV configs
+
+        Returns
+        -------
+        dict | None
+            None if the deployment must be created
+
+        """
+        if self._common_files is None:
+            self._refresh_common_files(model)
+
+        digest = self._get_deployment_digest(model, extra)
+        self._digests[model.name] = digest
+        entry = self._previous_jobs.get(model.name)
+        if (
+            not self._reuse_jobs
+            or entry is None
+            or entry["digest"] != digest
+            or not os.path.exists(entry["job"]["deployment"]["deployment_file"])
+        ):
+            return None
+
+        self._jobs[model.name] = entry
+        self._num_reused += 1
+        return entry["job"]
+
+    def add_job(self, name, job):
+        """Record a job created after get_unchanged_job returned None.
+
+        Parameters
+        ----------
+        name : str
+        job : dict
+
+        """
+        self._jobs[name] = {"digest": self._digests[name], "job": job}
+
+    def write(self):
+        """Write the manifest and delete the deployment files of recorded
+        deployments that were not transformed this time.
+
+        """
+        if not self._jobs and not self._previous_jobs:
+            return
+
+        for name, entry in self._previous_jobs.items():
+            if name not in self._jobs:
+                filename = entry["job"]["deployment"]["deployment_file"]
+                if os.path.exists(filename):
+                    os.remove(filename)
+
+        data = {
+            "config": self._config_digest,
+            "common_files": self._common_files,
+            "jobs": self._jobs,
+        }
+        _write_text_atomically(self._filename, json.dumps(data, cls=ExtendedJSONEncoder))
+
+        logger.info("Transformed %s: reused %s of %s deployments",
+                    self._feeder_directory, self._num_reused, len(self._jobs))
+
+    def _read(self):
+        if not os.path.exists(self._filename):
+            return {}
+
+        with open(self._filename) as f_in:
+            return json.load(f_in)
+
+    def _refresh_common_files(self, model):
+        self._common_files = _get_common_files_digest(model)
+        workspace = OpenDssFeederWorkspace(self._feeder_directory)
+        if (
+            self._common_files != self._previous_common_files
+            or not os.path.exists(workspace.master_file)
+        ):
+            model._create_common_files(workspace)
+
+    @staticmethod
+    def _get_deployment_digest(model, extra):
+        sha = hashlib.sha256()
+        for filename in model.pv_locations:
+            _update_file_digest(sha, filename)
+        sha.update(json.dumps(extra, sort_keys=True).encode("utf-8"))
+        return sha.hexdigest()
+
+
+def _get_common_files_digest(model):
+    """Hash the master file contents and the size and mtime of the other
+    common files. Reading every load shape would defeat the purpose."""
+    sha = hashlib.sha256()
+    _update_file_digest(sha, model.master_file)
+    for directory in (model.opendss_directory, model.loadshape_directory):
+        if directory is None:
+            continue
+        with os.scandir(directory) as entries:
+            for entry in sorted(entries, key=lambda x: x.name):
+                if not entry.is_dir():
+                    stat = entry.stat()
+                    sha.update(f"{entry.name} {stat.st_size} {stat.st_mtime_ns}\n".encode("utf-8"))
+    return sha.hexdigest()
+
+
+def _update_file_digest(sha, filename):
+    sha.update(filename.encode("utf-8"))
+    with open(filename, "rb") as f_in:
+        for chunk in iter(lambda: f_in.read(1024 * 1024), b""):
+            sha.update(chunk)
+
+
 class OpenDssFeederWorkspace:
     """Defines a feeder and all dependent OpenDSS files."""
     def __init__(self, feeder_directory):
@@ -335,3 +688,62 @@ class OpenDssFeederWorkspace:
     @property
     def master_file(self):
         return os.path.join(self.opendss_directory, "Master.dss")
+
+
+def _fix_data_file_references(src_dir, line):
+    def replace_func(match):
+        path = os.path.normpath(match.group(1).replace("\\", "/"))
+        return "file=" + os.path.normpath(os.path.join(src_dir, path))
+
+    return _REGEX_DATA_FILE.sub(replace_func, line)
+
+
+def _has_data_file_references(filename):
+    """Return True if the file contains "file=", without decoding it."""
+    if os.path.getsize(filename) == 0:
+        return False
+    with open(filename, "rb") as f_in, \
+            mmap.mmap(f_in.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return data.find(b"file=") != -1
+
+
+def _write_fixed_data_file_references(src_dir, src_file, dst_file):
+    with open(src_file) as f_in, open(dst_file, "w") as f_out:
+        for line in f_in:
+            f_out.write(_fix_data_file_references(src_dir, line))
+
+
+def _link_file(src_file, dst_file, link_funcs):
+    """Link dst_file to src_file with the first function in link_funcs that
+    works, falling back to a copy. Functions that fail because the filesystem
+    doesn't support them are removed from link_funcs so that later files skip
+    them. Other errors, such as too many links to one file, only affect this
+    file."""
+    for func in list(link_funcs):
+        try:
+            func(src_file, dst_file)
+            return
+        except OSError as exc:
+            logger.debug("%s failed for %s: %s", func.__name__, src_file, exc)
+            if exc.errno in _UNSUPPORTED_LINK_ERRNOS:
+                link_funcs.remove(func)
+
+    shutil.copyfile(src_file, dst_file)
+
+
+def _reflink_file(src_file, dst_file):
+    """Clone src_file to dst_file with copy-on-write."""
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported")
+
+    try:
+        with open(src_file, "rb") as f_in, open(dst_file, "wb") as f_out:
+            fcntl.ioctl(f_out.fileno(), _FICLONE, f_in.fileno())
+    except OSError:
+        _remove_file(dst_file)
+        raise
+
+
+def _remove_file(filename):
+    if os.path.lexists(filename):
+        os.remove(filename)
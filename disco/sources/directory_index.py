@@ -0,0 +1,180 @@
+"""Persistent cache of directory listings for source-tree discovery."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_default_index_filename(root):
+    """Return the default index file for root. Indexes are stored in the
+    user's cache directory, never in the indexed tree.
+
+    Parameters
+    ----------
+    root : str
+
+    Returns
+    -------
+    str
+
+    """
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    digest = hashlib.sha256(os.path.abspath(root).encode("utf-8")).hexdigest()
+    return os.path.join(cache_dir, "disco", "directory-index", f"{digest[:16]}.json")
+
+
+class DirectoryIndex:
+    """Caches directory listings on disk, keyed by directory mtime.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed, so a listing is reused as long as the directory's mtime matches
+    the recorded value. Only changed directories are scanned again.
+
+    """
+
+    _VERSION = 2
+
+    # Listings of directories modified this recently are not cached because a
+    # change within the same mtime tick would go unnoticed.
+    _MIN_MTIME_AGE_NS = 2 * 10**9
+
+    def __init__(self, root, filename=None):
+        """Constructs DirectoryIndex.
+
+        Parameters
+        ----------
+        root : str
+            All indexed directories must be under this directory.
+        filename : str | None
+            Path of the index file. Defaults to get_default_index_filename.
+
+        """
+        self._root = root
+        self._filename = filename or get_default_index_filename(root)
+        self._entries = self._read()
+        self._visited = {}
+        self._changed = False
+
+    @property
+    def filename(self):
+        """Return the path of the index file.
+
+        Returns
+        -------
+        str
+
+        """
+        return self._filename
+
+    def list_directories(self, path):
+        """Return the names of the subdirectories of path.
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        list
+
+        """
+        return list(self._get_listing(path)["dirs"])
+
+    def list_files(self, path):
+        """Return the names of the non-directory entries of path.
+
+        Parameters
+        ----------
+        path : str
+
+        Returns
+        -------
+        list
+
+        """
+        return list(self._get_listing(path)["files"])
+
+    def save(self):
+        """Write the index if any listing changed. Directories not visited
+        since construction are dropped.
+
+        """
+        if not self._changed and self._visited.keys() == self._entries.keys():
+            return
+
+        data = {
+            "version": self._VERSION,
+            "root": os.path.abspath(self._root),
+            "directories": self._visited,
+        }
+        # Write to a temp file and rename so that concurrent runs never read a
+        # partial index. The index is optional; an unwritable location is fine.
+        try:
+            directory = os.path.dirname(os.path.abspath(self._filename))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=directory)
+            try:
+                with os.fdopen(fd, "w") as f_out:
+                    json.dump(data, f_out)
+                os.replace(tmp_file, self._filename)
+            except Exception:
+                os.remove(tmp_file)
+                raise
+        except OSError:
+            logger.warning("Failed to write directory index %s", self._filename)
+            return
+
+        logger.debug("Wrote directory index %s with %s directories",
+                     self._filename, len(self._visited))
+
+    def _get_listing(self, path):
+        relpath = os.path.relpath(path, self._root)
+        mtime = os.stat(path).st_mtime_ns
+        listing = self._entries.get(relpath)
+        if listing is None or listing["mtime"] != mtime:
+            listing = self._scan(path)
+            self._changed = True
+            if time.time_ns() - mtime < self._MIN_MTIME_AGE_NS:
+                return listing
+            listing["mtime"] = mtime
+
+        # Each feeder is discovered by a separate thread, so keys don't collide.
+        self._visited[relpath] = listing
+        return listing
+
+    @staticmethod
+    def _scan(path):
+        dirs = []
+        files = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    dirs.append(entry.name)
+                else:
+                    files.append(entry.name)
+        return {"dirs": dirs, "files": files}
+
+    def _read(self):
+        if not os.path.exists(self._filename):
+            return {}
+
+        try:
+            with open(self._filename) as f_in:
+                data = json.load(f_in)
+        except Exception:
+            logger.warning("Ignoring unreadable directory index %s", self._filename)
+            return {}
+
+        if data.get("version") != self._VERSION or \
+                data.get("root") != os.path.abspath(self._root):
+            return {}
+
+        return data["directories"]
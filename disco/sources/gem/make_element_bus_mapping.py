@@ -4,16 +4,31 @@
 
 import json
 import logging
+import multiprocessing
 import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+
+import numpy as np
 
 from jade.loggers import setup_logging
 from jade.utils.utils import get_cli_string
 
 REGION_BUS_MAPPING_FILENAME = "bus_mapping_summary.json"
+# Holds one binary bus mapping directory per feeder.
+BINARY_BUS_MAPPINGS_DIRNAME = "bus_mappings"
+
+# Element types stored in the binary format. lines and transformers have two
+# buses per element; the rest have one.
+BINARY_ELEMENT_TYPES = ("capacitors", "lines", "loads", "pv_systems", "transformers")
+_TWO_BUS_ELEMENT_KEYS = {
+    "lines": ("from", "to"),
+    "transformers": ("primary", "secondary"),
+}
 
-logger = None
+logger = logging.getLogger("bus_mapping")
 
 
 class MissingBus(Exception):
@@ -24,31 +39,25 @@ class BadFormat(Exception):
     pass
 
 
-# This matches 1423_0_1409_0 and 242228 from
+# Element definitions look like these. The parser dispatches on the class in
+# the second token and only reads the bus and windings properties.
 # New Capacitor.1423_0_1409_0 Bus1=242228 phases=3 Kv=4.8 conn=delta Kvar=450.0
-REGEX_CAPACITOR = re.compile(r"New (?P<capacitor>Capacitor\.\w+).*Bus\w+=(?P<bus>\w+)", re.IGNORECASE)
-
-# This matches 1418_0_7958_0, 242223, and 242246 from
 # New Line.1418_0_7958_0 Units=km Length=0.15155920328177602 bus1=242223.1.2.3 bus2=242246.1.2.3 switch=n enabled=y phases=3 geometry=oh__314784__
-REGEX_LINE = re.compile(r"New (?P<line>Line\.\w+).*bus\w+=(?P<bus_from>\w+).*bus\w+=(?P<bus_to>\w+)", re.IGNORECASE)
-
-# This matches load_694781 and 242205_xfmr from
 # New Load.load_694781 conn=delta bus1=242205_xfmr.1.2.3 kV=0.48 model=1 kW=3.225882583335277 kvar=0.7400682202361257 Phases=3
-REGEX_LOAD = re.compile(r"New (?P<load>Load\.\w+).*bus\w+=(?P<bus>\w+)", re.IGNORECASE)
-
-# This matches pv_865744 and 242208_xfmr from
 # New PVSystem.pv_865744 bus1=242208_xfmr.1.2 phases=2 kV=0.20784609690826525 kVA=1.5829000000000002 Pmpp=1.439 conn=wye
-REGEX_PV_SYSTEM = re.compile(r"New (?P<pv_system>PVSystem\.[\w-]+) bus\w+=(?P<bus>\w+)", re.IGNORECASE)
 
-# This matches 1417_0_4346_0 and 3 from
-# New Transformer.1417_0_4346_0 phases=1 windings=3 wdg=1 conn=delta bus=242214.2.3 Kv=4.8 kva=15.0 EmergHKVA=22.5 %r=0.1 wdg=2 conn=wye bus=242214_xfmr.1.0 Kv=0.12 kva=15.0 EmergHKVA=22.5 %r=0.1 wdg=3 conn=wye bus=242214_xfmr.0.2 Kv=0.12 kva=15.0 EmergHKVA=22.5 %r=0.1 XHL=0.1 XLT=0.1 XHT=0.1
-REGEX_TRANSFORMER = re.compile(r"New (?P<transformer>Transformer\.\w+).*windings=(?P<windings>\d+).*bus=", re.IGNORECASE)
-# After the above string has been split by "wdg=" this matches each wdg number and bus.
-REGEX_TRANSFORMER_BUSES = re.compile(r"^(?P<winding>\d+).*conn=\w+.*bus=(?P<bus>\w+)", re.IGNORECASE)
+# Comments ('!' or '//' to the end of the line) are removed, so commented-out
+# definitions such as "! New Line.x ..." are skipped. Lines starting with '~'
+# continue the previous definition.
 
-# This matches an alternate transformer representation.
-# New Transformer.trans_242188_reg phases=3 windings=2 buses=(242188_src.1.2.3,242188_dummy.1.2.3) conns=(Delta, Wye) kvs=(4.8, 4.8) kvas=(100000.0, 100000.0) XHL=0.1
-REGEX_TRANSFORMER_ALT = re.compile(r"New (?P<transformer>Transformer\.\w+).*windings=(?P<windings>\d+).*buses=\((?P<buses>[\w\.,]+)\)", re.IGNORECASE)
+# This matches bus and windings properties in lines where values may be
+# enclosed in parentheses, brackets or quotes and contain spaces, as in
+# buses=(242188_src.1.2.3,242188_dummy.1.2.3) conns=(Delta, Wye)
+REGEX_BUS_PROPERTY = re.compile(
+    r"([Bb][Uu][Ss]\w*|[Ww][Ii][Nn][Dd][Ii][Nn][Gg][Ss])="
+    r"(\([^)]*\)|\[[^\]]*\]|\"[^\"]*\"|'[^']*'|\S+)"
+)
+_BUS_LIST_DELIMITERS = re.compile(r"[\s,]+")
 
 
 def _check_bus(feeder_mapping, bus, name):
@@ -88,29 +97,29 @@ def _check_bus_presence(feeder_mapping):
                 _check_bus(feeder_mapping, bus, element)
 
 
-def _handle_capacitor(feeder_mapping, line):
-    match = REGEX_CAPACITOR.search(line)
-    if not match:
-        raise BadFormat(f"unsupported capacitor format: {line}")
+def _get_bus(value):
+    """Return the bus name without node numbers, such as 242223 from 242223.1.2.3"""
+    return value.strip("\"'").split(".", 1)[0]
+
 
-    groupdict = match.groupdict()
-    capacitor = groupdict["capacitor"]
-    bus = groupdict["bus"]
+def _get_required_bus(properties, key, name, line):
+    for property_key, value in properties:
+        if property_key == key:
+            return _get_bus(value)
+    raise BadFormat(f"{name} does not define {key}: {line}")
+
+
+def _handle_capacitor(feeder_mapping, capacitor, properties, line):
+    bus = _get_required_bus(properties, "bus1", capacitor, line)
     if capacitor in feeder_mapping["capacitors"]:
         logger.warning("Detected duplicate capacitor=%s", capacitor)
         return
     feeder_mapping["capacitors"][capacitor] = bus
 
 
-def _handle_line(feeder_mapping, line):
-    match = REGEX_LINE.search(line)
-    if not match:
-        raise BadFormat(f"unsupported line format: {line}")
-
-    groupdict = match.groupdict()
-    line_elem = groupdict["line"]
-    bus_from = groupdict["bus_from"]
-    bus_to = groupdict["bus_to"]
+def _handle_line(feeder_mapping, line_elem, properties, line):
+    bus_from = _get_required_bus(properties, "bus1", line_elem, line)
+    bus_to = _get_required_bus(properties, "bus2", line_elem, line)
     if line_elem in feeder_mapping["lines"]:
         logger.warning("Detected duplicate line=%s", line_elem)
         return
@@ -120,88 +129,65 @@ def _handle_line(feeder_mapping, line):
     }
 
 
-def _handle_load(feeder_mapping, line):
-    match = REGEX_LOAD.search(line)
-    if not match:
-        raise BadFormat(f"unsupported load format: {line}")
-
-    groupdict = match.groupdict()
-    load = groupdict["load"]
-    bus = groupdict["bus"]
+def _handle_load(feeder_mapping, load, properties, line):
+    bus = _get_required_bus(properties, "bus1", load, line)
     if load in feeder_mapping["loads"]:
         logger.warning("Detected duplicate load=%s", load)
         return
     feeder_mapping["loads"][load] = bus
 
 
-def _handle_pv_system(feeder_mapping, line):
-    match = REGEX_PV_SYSTEM.search(line)
-    if not match:
-        raise BadFormat(f"unsupported pv_system format: {line}")
-
-    groupdict = match.groupdict()
-    pv_system = groupdict["pv_system"]
-    bus = groupdict["bus"]
+def _handle_pv_system(feeder_mapping, pv_system, properties, line):
+    bus = _get_required_bus(properties, "bus1", pv_system, line)
     if pv_system in feeder_mapping["pv_systems"]:
         assert bus == feeder_mapping["pv_systems"][pv_system]
     else:
         feeder_mapping["pv_systems"][pv_system] = bus
 
 
-def _handle_transformer(feeder_mapping, line):
-    match = REGEX_TRANSFORMER.search(line)
-    if match:
-        groupdict = match.groupdict()
-        transformer = groupdict["transformer"]
-        if transformer in feeder_mapping["transformers"]:
-            logger.warning("Detected duplicate transformer=%s", transformer)
-            return
-
-        sections = line.split("wdg=")
-        # First section does not contain wdg + bus.
-        assert len(sections) == int(groupdict["windings"]) + 1, line
-        buses = []
-        for i, section in enumerate(sections):
-            if i == 0:
-                continue
-            match = REGEX_TRANSFORMER_BUSES.search(section)
-            assert match
-            assert int(match.groupdict()["winding"]) == i
-            bus = match.groupdict()["bus"]
-            if bus not in buses:
-                buses.append(bus)
-
-        assert len(buses) >= 2
-        t_buses = {
-            "primary": buses[0],
-            "secondary": buses[1],
-        }
-        _check_transformer_buses(feeder_mapping, transformer, t_buses)
-        feeder_mapping["transformers"][transformer] = t_buses
-    else:
-        match = REGEX_TRANSFORMER_ALT.search(line)
-        if not match:
-            raise BadFormat(f"unsupported transformer format: {line}")
+def _handle_transformer(feeder_mapping, transformer, properties, line):
+    """Handle both of these transformer representations:
 
-        groupdict = match.groupdict()
-        transformer = groupdict["transformer"]
-        if transformer in feeder_mapping["transformers"]:
-            logger.warning("Detected duplicate transformer=%s", transformer)
-            return
+    New Transformer.1417_0_4346_0 phases=1 windings=3 wdg=1 conn=delta bus=242214.2.3 Kv=4.8 kva=15.0 EmergHKVA=22.5 %r=0.1 wdg=2 conn=wye bus=242214_xfmr.1.0 Kv=0.12 kva=15.0 EmergHKVA=22.5 %r=0.1 wdg=3 conn=wye bus=242214_xfmr.0.2 Kv=0.12 kva=15.0 EmergHKVA=22.5 %r=0.1 XHL=0.1 XLT=0.1 XHT=0.1
+    New Transformer.trans_242188_reg phases=3 windings=2 buses=(242188_src.1.2.3,242188_dummy.1.2.3) conns=(Delta, Wye) kvs=(4.8, 4.8) kvas=(100000.0, 100000.0) XHL=0.1
+
+    """
+    if transformer in feeder_mapping["transformers"]:
+        logger.warning("Detected duplicate transformer=%s", transformer)
+        return
 
-        buses = groupdict["buses"].split(",")
-        assert len(buses) >= 2, line
+    windings = None
+    winding_buses = []
+    buses = None
+    for key, value in properties:
+        if key == "windings":
+            windings = int(value)
+        elif key == "bus":
+            winding_buses.append(_get_bus(value))
+        elif key == "buses":
+            buses = [x for x in _BUS_LIST_DELIMITERS.split(value.strip("()[]\"'")) if x]
+
+    if winding_buses:
+        if windings is not None and len(winding_buses) != windings:
+            raise BadFormat(f"unsupported transformer format: {line}")
+        # Windings on the same bus count once.
+        buses = list(dict.fromkeys(winding_buses))
+    elif buses is not None:
         for i, bus in enumerate(buses):
-            index = bus.find(".")
-            if index == -1:
+            if "." not in bus:
                 raise BadFormat(f"unsupported bus format {bus}")
-            buses[i] = bus[:index]
-        t_buses = {
-            "primary": buses[0],
-            "secondary": buses[1],
-        }
-        _check_transformer_buses(feeder_mapping, transformer, t_buses)
-        feeder_mapping["transformers"][transformer] = t_buses
+            buses[i] = _get_bus(bus)
+    else:
+        raise BadFormat(f"unsupported transformer format: {line}")
+
+    if len(buses) < 2:
+        raise BadFormat(f"unsupported transformer format: {line}")
+    t_buses = {
+        "primary": buses[0],
+        "secondary": buses[1],
+    }
+    _check_transformer_buses(feeder_mapping, transformer, t_buses)
+    feeder_mapping["transformers"][transformer] = t_buses
 
 
 def _make_feeder_dict():
@@ -228,21 +214,80 @@ def _process_bus_coords_file(mapping, filename):
             mapping["bus_coords"][bus] = {"x": x, "y": y}
 
 
+# Maps lowercase element class to handler.
 ELEMENT_HANDLERS = {
-    "new capacitor.": _handle_capacitor,
-    "new line.": _handle_line,
-    "new load.": _handle_load,
-    "new pvsystem.": _handle_pv_system,
-    "new transformer.": _handle_transformer,
+    "capacitor": _handle_capacitor,
+    "line": _handle_line,
+    "load": _handle_load,
+    "pvsystem": _handle_pv_system,
+    "transformer": _handle_transformer,
 }
 
 
 def _process_element_file(mapping, filename):
     with open(filename) as f_in:
-        for line in f_in:
-            for substring, handler in ELEMENT_HANDLERS.items():
-                if substring in line.lower():
-                    handler(mapping, line)
+        for line in _iter_commands(f_in):
+            tokens = line.split()
+            if len(tokens) < 2 or tokens[0].lower() != "new":
+                continue
+            element_class, _, name = tokens[1].partition(".")
+            handler = ELEMENT_HANDLERS.get(element_class.lower())
+            if handler is None or not name:
+                continue
+            handler(mapping, tokens[1], _get_bus_properties(line, tokens), line)
+
+
+def _iter_commands(lines):
+    """Yield each command without comments and with its '~' continuation
+    lines appended.
+
+    """
+    command = None
+    for line in lines:
+        line = _strip_comment(line).strip()
+        if not line:
+            continue
+        if line[0] == "~":
+            if command is not None:
+                command += " " + line[1:]
+            continue
+        if command is not None:
+            yield command
+        command = line
+
+    if command is not None:
+        yield command
+
+
+def _strip_comment(line):
+    for marker in ("!", "//"):
+        index = line.find(marker)
+        if index != -1:
+            line = line[:index]
+    return line
+
+
+def _get_bus_properties(line, tokens):
+    """Return the bus and windings properties of an element definition as
+    (key, value) pairs with lowercase keys, in order.
+
+    """
+    if "(" in line or "[" in line or "\"" in line or "'" in line:
+        start = line.find(tokens[1]) + len(tokens[1])
+        return [
+            (key.lower(), value) for key, value in REGEX_BUS_PROPERTY.findall(line, start)
+        ]
+
+    properties = []
+    for token in tokens[2:]:
+        # Cheap check to skip most properties before splitting.
+        if token[0] in "bBwW":
+            key, sep, value = token.partition("=")
+            if sep:
+                key = key.lower()
+                if key.startswith("bus") or key == "windings":
+                    properties.append((key, value))
+    return properties
 
 
 def _get_bus_coords_files(directory):
@@ -363,13 +408,15 @@ def merge_feeder_mappings(mapping_master, mapping_new):
             mapping_master[element_type][element] = data
 
 
-def make_element_bus_mapping(path):
+def make_element_bus_mapping(path, num_processes=None):
     """Make a mapping of elements to attached buses in a model-inputs path.
 
     Parameters
     ----------
     path : str
         Path to model-inputs directory (created by generate-input-data)
+    num_processes : int | None
+        Number of worker processes. Defaults to the number of CPUs.
 
     Returns
     -------
@@ -383,33 +430,75 @@ def make_element_bus_mapping(path):
                      config_file, path)
         sys.exit(1)
 
-    feeders = [x for x in os.listdir(path) if os.path.isdir(os.path.join(path, x))]
+    feeders = sorted(
+        x for x in os.listdir(path)
+        if x != BINARY_BUS_MAPPINGS_DIRNAME and os.path.isdir(os.path.join(path, x))
+    )
+
+    # Each feeder only reads the files in its own directory, so the feeders
+    # are independent. Workers send their log records to this process, which
+    # passes them to the handlers configured here.
+    log_queue = multiprocessing.Queue()
+    listener = QueueListener(log_queue, _LogRecordForwarder())
+    listener.start()
+    try:
+        with ProcessPoolExecutor(
+            max_workers=num_processes,
+            initializer=_init_worker,
+            initargs=(log_queue, logger.getEffectiveLevel()),
+        ) as executor:
+            output_files = executor.map(
+                _make_feeder_bus_mapping, [path] * len(feeders), feeders
+            )
+            feeder_files = dict(zip(feeders, output_files))
+    finally:
+        listener.stop()
+
+    return feeder_files
+
+
+class _LogRecordForwarder(logging.Handler):
+    """Logs records received from worker processes with this process's
+    logger of the same name."""
 
-    feeder_files = {}
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+def _init_worker(log_queue, level):
+    # With the spawn start method the worker's logger is unconfigured; with
+    # fork it has copies of the parent's handlers. Either way, send the
+    # records to the parent.
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def _make_feeder_bus_mapping(path, feeder):
+    feeder_mapping = _make_feeder_dict()
+    feeder_path = os.path.join(path, feeder)
 
     # Get the bus coordinates first so that we can ensure that all element
     # buses are present.
-    for feeder in feeders:
-        feeder_mapping = _make_feeder_dict()
-        feeder_path = os.path.join(feeder, path)
-        for filename in _get_bus_coords_files(feeder_path):
-            _process_bus_coords_file(feeder_mapping, filename)
-
-        for filename in _get_dss_files(path):
-            _process_element_file(feeder_mapping, filename)
-
-        # Much of the data has missing bus coordinates for transformer
-        # secondary buses. The transformer processing code above implemented a
-        # workaround, and so now they have coordinates.  Now, we check buses
-        # connected to the rest of the elements.
-        _check_bus_presence(feeder_mapping)
-
-        output_file = os.path.join(path, f"bus_mapping_feeder__{feeder}.json")
-        write_element_bus_mapping(feeder_mapping, output_file)
-        feeder_files[feeder] = output_file
-        print(f"Wrote {output_file}")
+    for filename in _get_bus_coords_files(feeder_path):
+        _process_bus_coords_file(feeder_mapping, filename)
 
-    return feeder_files
+    for filename in _get_dss_files(feeder_path):
+        _process_element_file(feeder_mapping, filename)
+
+    # Much of the data has missing bus coordinates for transformer
+    # secondary buses. The transformer processing code above implemented a
+    # workaround, and so now they have coordinates.  Now, we check buses
+    # connected to the rest of the elements.
+    _check_bus_presence(feeder_mapping)
+
+    output_file = os.path.join(path, f"bus_mapping_feeder__{feeder}.json")
+    write_element_bus_mapping(feeder_mapping, output_file)
+    write_element_bus_mapping_binary(
+        feeder_mapping, get_binary_bus_mapping_directory(path, feeder)
+    )
+    print(f"Wrote {output_file}")
+    return output_file
 
 
 def write_element_bus_mapping(mapping, output_file):
@@ -419,20 +508,177 @@ def write_element_bus_mapping(mapping, output_file):
         logger.info("Wrote %s", output_file)
 
 
+def get_binary_bus_mapping_directory(path, feeder):
+    """Return the directory of a feeder's binary bus mapping.
+
+    Parameters
+    ----------
+    path : str
+        Path to model-inputs directory
+    feeder : str
+
+    Returns
+    -------
+    str
+
+    """
+    return os.path.join(path, BINARY_BUS_MAPPINGS_DIRNAME, feeder)
+
+
+def write_element_bus_mapping_binary(mapping, directory):
+    """Write the mapping to directory in a compact binary format.
+
+    Bus names are stored once in sorted order and elements refer to them by
+    integer ID. Element names are sorted so that lookups can use binary search
+    on memory-mapped arrays. Coordinates are float arrays; NaN means missing.
+    Use BinaryBusMapping to read it.
+
+    Parameters
+    ----------
+    mapping : dict
+        dictionary created by this module at a feeder level
+    directory : str
+
+    """
+    os.makedirs(directory, exist_ok=True)
+    buses = set(mapping["bus_coords"])
+    for element_type in BINARY_ELEMENT_TYPES:
+        keys = _TWO_BUS_ELEMENT_KEYS.get(element_type)
+        for value in mapping[element_type].values():
+            buses.update((value[x] for x in keys) if keys else (value,))
+
+    buses = np.array(sorted(buses), dtype=str)
+    bus_ids = {bus: i for i, bus in enumerate(buses.tolist())}
+    coordinates = np.full((len(buses), 2), np.nan)
+    for bus, coords in mapping["bus_coords"].items():
+        coordinates[bus_ids[bus]] = (float(coords["x"]), float(coords["y"]))
+    np.save(os.path.join(directory, "buses.npy"), buses)
+    np.save(os.path.join(directory, "bus_coords.npy"), coordinates)
+
+    for element_type in BINARY_ELEMENT_TYPES:
+        names = sorted(mapping[element_type])
+        keys = _TWO_BUS_ELEMENT_KEYS.get(element_type)
+        if keys:
+            ids = [[bus_ids[mapping[element_type][x][k]] for k in keys] for x in names]
+            ids = np.array(ids, dtype=np.int32).reshape(len(names), len(keys))
+        else:
+            ids = np.array([bus_ids[mapping[element_type][x]] for x in names], dtype=np.int32)
+        np.save(os.path.join(directory, f"{element_type}_names.npy"), np.array(names, dtype=str))
+        np.save(os.path.join(directory, f"{element_type}_bus_ids.npy"), ids)
+
+    logger.info("Wrote %s", directory)
+
+
+class BinaryBusMapping:
+    """Reads a feeder's binary bus mapping through memory-mapped arrays.
+
+    Only the arrays needed by a lookup are mapped, and only the pages they
+    touch are read.
+
+    """
+
+    def __init__(self, directory):
+        self._directory = directory
+        self._arrays = {}
+
+    def _get_array(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            array = np.load(os.path.join(self._directory, f"{name}.npy"), mmap_mode="r")
+            self._arrays[name] = array
+        return array
+
+    def _get_coordinates(self, bus_id):
+        x, y = self._get_array("bus_coords")[bus_id]
+        if np.isnan(x):
+            return None
+        return {"x": float(x), "y": float(y)}
+
+    def get_bus_to_element(self, bus_to_elems, element_type):
+        """Builds a dict that maps bus names to a list of attached elements.
+        Same as the module function get_bus_to_element.
+
+        Parameters
+        ----------
+        bus_to_elems : dict
+            Output dictionary to fill in.
+        element_type : str
+            Only consider this element type.
+
+        """
+        if element_type in _TWO_BUS_ELEMENT_KEYS:
+            raise Exception("not supported")
+        buses = self._get_array("buses")
+        names = self._get_array(f"{element_type}_names").tolist()
+        bus_ids = self._get_array(f"{element_type}_bus_ids")
+        for element, bus in zip(names, buses[bus_ids].tolist()):
+            item = {"type": element_type, "name": element}
+            if bus not in bus_to_elems:
+                bus_to_elems[bus] = [item]
+            else:
+                bus_to_elems[bus].append(item)
+
+    def get_element_coordinates(self, element_type, name):
+        """Return the coordinates of the bus to which the element is attached.
+        Same as the module function get_element_coordinates except that
+        coordinates are floats.
+
+        Parameters
+        ----------
+        element_type : str
+            capacitors, lines, loads, etc.
+        name : str
+            Element name
+
+        Returns
+        -------
+        dict | None
+            None is returned if no coordinates are stored.
+
+            Example output::
+
+            {'x': 34374.509, 'y': 206624.15}
+
+            If element_type == 'lines'
+            {'from': None, 'to': {'x': 34802.251, 'y': 206769.654}}
+
+        Raises
+        ------
+        KeyError
+            Raised if the element is not stored.
+
+        """
+        names = self._get_array(f"{element_type}_names")
+        index = np.searchsorted(names, name)
+        if index == len(names) or names[index] != name:
+            raise KeyError(f"{element_type} {name}")
+
+        bus_ids = self._get_array(f"{element_type}_bus_ids")[index]
+        if element_type == "lines":
+            return {
+                "from": self._get_coordinates(bus_ids[0]),
+                "to": self._get_coordinates(bus_ids[1]),
+            }
+        if element_type == "transformers":
+            return self._get_coordinates(bus_ids[0])
+        return self._get_coordinates(bus_ids)
+
+
 def main():
     global logger
-    if len(sys.argv) != 2:
-        print(f"Usage:  {sys.argv[0]} MODEL-INPUTS-DIRECTORY")
+    if len(sys.argv) not in (2, 3):
+        print(f"Usage:  {sys.argv[0]} MODEL-INPUTS-DIRECTORY [NUM-PROCESSES]")
         sys.exit(1)
 
     path = sys.argv[1]
+    num_processes = int(sys.argv[2]) if len(sys.argv) == 3 else None
     level = logging.INFO
     log_file = os.path.join(path, "bus_mapping.log")
     logger = setup_logging("bus_mapping", log_file, console_level=logging.ERROR, file_level=level)
     logger.info(get_cli_string())
 
     try:
-        feeder_files = make_element_bus_mapping(path)
+        feeder_files = make_element_bus_mapping(path, num_processes=num_processes)
         summary_file = os.path.join(path, REGION_BUS_MAPPING_FILENAME)
         with open(summary_file, "w") as f_out:
             json.dump(feeder_files, f_out, indent=2)
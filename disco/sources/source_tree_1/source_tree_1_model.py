@@ -2,15 +2,14 @@
 
 import copy
 import itertools
-import json
 import logging
 import os
 
-from jade.utils.utils import ExtendedJSONEncoder
 from disco.enums import Placement
 from disco.models.base import PyDSSControllerModel
 from disco.sources.base import BaseSourceDataModel, BaseOpenDssModel, \
-    SOURCE_CONFIGURATION_FILENAME
+    FeederTransformManifest, get_transform_config_digest, \
+    remove_stale_feeder_workspaces, transform_feeders, write_source_configuration
 from .source_tree_1_model_inputs import SourceTree1ModelInputs
 
 
@@ -29,6 +28,7 @@ class SourceTree1Model(BaseOpenDssModel):
         "master_file": "Master.dss",
     }
     DEPLOYMENT_FILE = "PVSystems.dss"
+    SUPPORTS_INCREMENTAL_TRANSFORM = True
 
     def __init__(self, data):
         data = copy.deepcopy(data)
@@ -93,13 +93,19 @@ class SourceTree1Model(BaseOpenDssModel):
         return self._pydss_controllers
 
     @classmethod
-    def transform(cls, config, simulation_model, output_path):
+    def transform(cls, config, simulation_model, output_path, num_processes=1,
+                  incremental=False):
         def get_val(name):
             val = config["model_params"][name]
             if val == ["all"]:
                 return "all"
             return val
 
+        # Full transforms start from an empty directory and don't record manifests.
+        if incremental:
+            config_digest = get_transform_config_digest(config, simulation_model)
+        else:
+            config_digest = None
         input_path = config["input_path"]
         substations = get_val("substations")
         feeders = get_val("feeders")
@@ -120,8 +126,36 @@ class SourceTree1Model(BaseOpenDssModel):
         elif not isinstance(placements[0], float):
             placements = [Placement(x) for x in placements]
 
+        substation_feeders = list(itertools.product(substations, feeders))
+        config = transform_feeders(
+            cls._transform_feeder,
+            substation_feeders,
+            (
+                inputs, placements, deployments, penetration_levels, master_file,
+                simulation_params, simulation_model, output_path, config_digest,
+            ),
+            num_processes=num_processes,
+        )
+
+        if incremental:
+            feeder_directories = [os.path.join(output_path, *x) for x in substation_feeders]
+            remove_stale_feeder_workspaces(output_path, feeder_directories)
+        write_source_configuration(output_path, config)
+
+    @classmethod
+    def _transform_feeder(cls, substation_feeder, inputs, placements, deployments,
+                          penetration_levels, master_file, simulation_params,
+                          simulation_model, output_path, config_digest):
+        """Transform one feeder and return its job configs."""
+        substation, feeder = substation_feeder
+        input_path = inputs.base_directory
+        path = os.path.join(output_path, substation, feeder)
+        if config_digest is None:
+            manifest = None
+        else:
+            manifest = FeederTransformManifest(path, config_digest)
         config = []
-        for substation, feeder, placement in itertools.product(substations, feeders, placements):
+        for placement in placements:
             key = inputs.create_key(substation, feeder, placement)
             if deployments == "all":
                 _deployments = inputs.list_deployments(key)
@@ -172,20 +206,25 @@ class SourceTree1Model(BaseOpenDssModel):
                     # TODO DT: add pv_profiles to models?
                     # TODO DT: change 'deployment' to 'sample', per Kwami
                     model = cls(data)
-                    path = os.path.join(output_path, substation, feeder)
-                    out_deployment = model.create_deployment(model.name, path, pv_profile=pv_profiles)
-                    item = {
-                        "deployment": out_deployment,
-                        "simulation": simulation_params,
-                        "name": model.name,
-                        "model_type": simulation_model.__name__,
-                    }
-                    config.append(simulation_model.validate(item).dict())
-
-        filename = os.path.join(output_path, SOURCE_CONFIGURATION_FILENAME)
-        with open(filename, "w") as f_out:
-            json.dump(config, f_out, indent=2, cls=ExtendedJSONEncoder)
-        logger.info("Wrote config to %s", filename)
+                    job = None
+                    if manifest is not None:
+                        job = manifest.get_unchanged_job(model, extra=pv_configs)
+                    if job is None:
+                        out_deployment = model.create_deployment(model.name, path, pv_profile=pv_profiles)
+                        item = {
+                            "deployment": out_deployment,
+                            "simulation": simulation_params,
+                            "name": model.name,
+                            "model_type": simulation_model.__name__,
+                        }
+                        job = simulation_model.validate(item).dict()
+                        if manifest is not None:
+                            manifest.add_job(model.name, job)
+                    config.append(job)
+
+        if manifest is not None:
+            manifest.write()
+        return config
 
     @staticmethod
     def make_name(substation, feeder, placement, deployment, penetration_level):
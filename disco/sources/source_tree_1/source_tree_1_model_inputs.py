@@ -2,6 +2,7 @@
 
 
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import enum
 import logging
 import os
@@ -11,6 +12,7 @@ from jade.jobs.job_inputs_interface import JobInputsInterface
 from jade.exceptions import InvalidParameter
 from jade.utils.utils import handle_file_not_found, handle_key_error, load_data
 from disco.enums import get_placement_from_value
+from disco.sources.directory_index import DirectoryIndex
 
 
 logger = logging.getLogger(__name__)
@@ -28,12 +30,15 @@ class SourceTree1ModelInputs(JobInputsInterface):
     _PV_CONFIG_FILENAME = "pv_config.json"
     SUBSTATION_DELIMITER = "--"
 
-    def __init__(self, base_directory):
+    def __init__(self, base_directory, index_file=None):
         """Constructs SourceTree1ModelInputs.
 
         Parameters
         ----------
         base_directory : str
+        index_file : str | None
+            Directory index file; see DirectoryIndex. Defaults to a file in
+            the user's cache directory.
 
         """
         self._base = base_directory
@@ -42,7 +47,12 @@ class SourceTree1ModelInputs(JobInputsInterface):
             raise InvalidParameter("inputs directory does not exist: {}"
                                    .format(self._base))
 
+        # Reuses listings of unchanged directories from previous runs.
+        self._index = DirectoryIndex(self._base, filename=index_file)
         self._parameters = self._parse_directories()
+        self._index.save()
+        # Listings are only needed for discovery. Don't pickle them to workers.
+        self._index = None
         logger.debug("Created %s at %s", self.__class__.__name__, self._base)
 
     @property
@@ -275,11 +285,9 @@ class SourceTree1ModelInputs(JobInputsInterface):
             self._PV_CONFIG_FILENAME,
         ))["pv_systems"]
 
-    @staticmethod
-    def _get_items_from_directory(path):
+    def _get_items_from_directory(self, path):
         """Strips out miscellaneous files"""
-        return [x for x in os.listdir(path)
-                if os.path.isdir(os.path.join(path, x))]
+        return self._index.list_directories(path)
 
     @staticmethod
     def _feeder_dirname(substation, feeder):
@@ -357,9 +365,7 @@ class SourceTree1ModelInputs(JobInputsInterface):
 
         levels = []
         regex = re.compile(r"^(\d+)$")
-        for item in os.listdir(penetration_path):
-            if not os.path.isdir(os.path.join(penetration_path, item)):
-                continue
+        for item in self._get_items_from_directory(penetration_path):
             match = regex.search(item)
             if match:
                 levels.append(int(match.group(1)))
@@ -368,15 +374,25 @@ class SourceTree1ModelInputs(JobInputsInterface):
         return levels
 
     def _parse_directories(self):
+        feeders = [
+            (substation, feeder)
+            for substation in self._list_substations()
+            for feeder in self._list_feeders(substation)
+        ]
+        # Each feeder is an independent subtree. Listing them concurrently
+        # overlaps the metadata round-trips on network filesystems.
         data = {}
-        for substation in self._list_substations():
-            self._parse_feeders(data, substation)
+        with ThreadPoolExecutor() as executor:
+            for feeder_data in executor.map(self._parse_feeder, feeders):
+                data.update(feeder_data)
 
         return data
 
-    def _parse_feeders(self, data, substation):
-        for feeder in self._list_feeders(substation):
-            self._parse_placements(data, substation, feeder)
+    def _parse_feeder(self, substation_feeder):
+        substation, feeder = substation_feeder
+        data = {}
+        self._parse_placements(data, substation, feeder)
+        return data
 
     def _parse_placements(self, data, substation, feeder):
         for placement in self._list_placements(substation, feeder):
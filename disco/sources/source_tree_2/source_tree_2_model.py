@@ -2,16 +2,15 @@
 
 import copy
 import itertools
-import json
 import logging
 import os
 
-from jade.utils.utils import ExtendedJSONEncoder
 from PyDSS.common import ControllerType
 from disco.enums import Placement, Scale
 from disco.models.base import PyDSSControllerModel
 from disco.sources.base import BaseSourceDataModel, BaseOpenDssModel, \
-    SOURCE_CONFIGURATION_FILENAME
+    FeederTransformManifest, get_transform_config_digest, \
+    remove_stale_feeder_workspaces, transform_feeders, write_source_configuration
 from .source_tree_2_model_inputs import SourceTree2ModelInputs
 
 
@@ -30,6 +29,8 @@ class SourceTree2Model(BaseOpenDssModel):
         "penetration_levels": ["all"],
         "master_file": "Master_noPV.dss",
     }
+    SUPPORTS_INCREMENTAL_TRANSFORM = True
+
     def __init__(self, data):
         data = copy.deepcopy(data)
         self._path = data.pop("path")
@@ -96,13 +97,19 @@ class SourceTree2Model(BaseOpenDssModel):
         )
 
     @classmethod
-    def transform(cls, config, simulation_model, output_path):
+    def transform(cls, config, simulation_model, output_path, num_processes=1,
+                  incremental=False):
         def get_val(name):
             val = config["model_params"][name]
             if val == ["all"]:
                 return "all"
             return val
 
+        # Full transforms start from an empty directory and don't record manifests.
+        if incremental:
+            config_digest = get_transform_config_digest(config, simulation_model)
+        else:
+            config_digest = None
         input_path = config["input_path"]
         feeders = get_val("feeders")
         dcac_ratios = get_val("dcac_ratios")
@@ -131,8 +138,35 @@ class SourceTree2Model(BaseOpenDssModel):
         elif not isinstance(placements[0], float):
             placements = [Placement(x) for x in placements]
 
+        config = transform_feeders(
+            cls._transform_feeder,
+            feeders,
+            (
+                inputs, dcac_ratios, scales, placements, deployments, penetration_levels,
+                master_file, pv_profile, simulation_params, simulation_model, output_path,
+                config_digest,
+            ),
+            num_processes=num_processes,
+        )
+
+        if incremental:
+            feeder_directories = [os.path.join(output_path, x) for x in feeders]
+            remove_stale_feeder_workspaces(output_path, feeder_directories)
+        write_source_configuration(output_path, config)
+
+    @classmethod
+    def _transform_feeder(cls, feeder, inputs, dcac_ratios, scales, placements, deployments,
+                          penetration_levels, master_file, pv_profile, simulation_params,
+                          simulation_model, output_path, config_digest):
+        """Transform one feeder and return its job configs."""
+        input_path = inputs.base_directory
+        path = os.path.join(output_path, feeder)
+        if config_digest is None:
+            manifest = None
+        else:
+            manifest = FeederTransformManifest(path, config_digest)
         config = []
-        for feeder, dcac, scale, placement in itertools.product(feeders, dcac_ratios, scales, placements):
+        for dcac, scale, placement in itertools.product(dcac_ratios, scales, placements):
             key = inputs.create_key(feeder, dcac, scale, placement)
             if deployments == "all":
                 _deployments = inputs.list_deployments(key)
@@ -160,20 +194,25 @@ class SourceTree2Model(BaseOpenDssModel):
                         "pv_locations": [deployment_file],
                     }
                     model = cls(data)
-                    path = os.path.join(output_path, feeder)
-                    out_deployment = model.create_deployment(model.name, path, pv_profile=pv_profile)
-                    item = {
-                        "deployment": out_deployment,
-                        "simulation": simulation_params,
-                        "name": model.name,
-                        "model_type": simulation_model.__name__,
-                    }
-                    config.append(simulation_model.validate(item).dict())
-
-        filename = os.path.join(output_path, SOURCE_CONFIGURATION_FILENAME)
-        with open(filename, "w") as f_out:
-            json.dump(config, f_out, indent=2, cls=ExtendedJSONEncoder)
-        logger.info("Wrote config to %s", filename)
+                    job = None
+                    if manifest is not None:
+                        job = manifest.get_unchanged_job(model)
+                    if job is None:
+                        out_deployment = model.create_deployment(model.name, path, pv_profile=pv_profile)
+                        item = {
+                            "deployment": out_deployment,
+                            "simulation": simulation_params,
+                            "name": model.name,
+                            "model_type": simulation_model.__name__,
+                        }
+                        job = simulation_model.validate(item).dict()
+                        if manifest is not None:
+                            manifest.add_job(model.name, job)
+                    config.append(job)
+
+        if manifest is not None:
+            manifest.write()
+        return config
 
     @staticmethod
     def make_name(feeder, dcac, scale, placement, deployment, penetration_level):
@@ -2,6 +2,7 @@
 
 
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 import enum
 import logging
 import os
@@ -12,6 +13,7 @@ from jade.exceptions import InvalidParameter
 from jade.utils.utils import handle_file_not_found, handle_key_error
 from disco.enums import get_placement_from_value, get_scale_from_value, \
     SCALE_MAPPING
+from disco.sources.directory_index import DirectoryIndex
 
 
 logger = logging.getLogger(__name__)
@@ -26,12 +28,15 @@ class SourceTree2ModelInputs(JobInputsInterface):
         "SourceTree2Keys", "feeder, dcac_ratio, scale, placement"
     )
 
-    def __init__(self, base_directory):
+    def __init__(self, base_directory, index_file=None):
         """Constructs SourceTree2ModelInputs.
 
         Parameters
         ----------
         base_directory : str
+        index_file : str | None
+            Directory index file; see DirectoryIndex. Defaults to a file in
+            the user's cache directory.
 
         """
         self._base = base_directory
@@ -42,7 +47,12 @@ class SourceTree2ModelInputs(JobInputsInterface):
                                    .format(self._base))
 
 
+        # Reuses listings of unchanged directories from previous runs.
+        self._index = DirectoryIndex(self._base, filename=index_file)
         self._parameters = self._parse_directories()
+        self._index.save()
+        # Listings are only needed for discovery. Don't pickle them to workers.
+        self._index = None
 
         logger.debug("Created %s at %s", self.__class__.__name__,
                      self._base)
@@ -294,11 +304,9 @@ class SourceTree2ModelInputs(JobInputsInterface):
 
         return levels
 
-    @staticmethod
-    def _get_items_from_directory(path):
+    def _get_items_from_directory(self, path):
         """Basically just strips out files like README.md."""
-        return [x for x in os.listdir(path)
-                if os.path.isdir(os.path.join(path, x))]
+        return self._index.list_directories(path)
 
     def _get_dcac_ratios_from_directory(self, path):
         ratios = []
@@ -401,7 +409,7 @@ class SourceTree2ModelInputs(JobInputsInterface):
 
         levels = []
         regex = re.compile(r"PV_Gen_{}_(\d+)\.txt".format(deployment))
-        for filename in os.listdir(penetration_path):
+        for filename in self._index.list_files(penetration_path):
             match = regex.search(filename)
             if match:
                 levels.append(int(match.group(1)))
@@ -409,10 +417,19 @@ class SourceTree2ModelInputs(JobInputsInterface):
         return sorted(levels)
 
     def _parse_directories(self):
+        # Each feeder is an independent subtree. Listing them concurrently
+        # overlaps the metadata round-trips on network filesystems.
         data = {}
-        for feeder in self._list_feeders():
-            self._parse_dcacs(data, feeder)
+        with ThreadPoolExecutor() as executor:
+            for feeder_data in executor.map(self._parse_feeder,
+                                            self._list_feeders()):
+                data.update(feeder_data)
+
+        return data
 
+    def _parse_feeder(self, feeder):
+        data = {}
+        self._parse_dcacs(data, feeder)
         return data
 
     def _parse_dcacs(self, data, feeder):
@@ -1,5 +1,6 @@
 """Contains OpenDSS utility functions."""
 
+import json
 import logging
 import os
 import re
@@ -12,6 +13,11 @@ from disco.pydss.common import UpgradeType
 
 logger = logging.getLogger(__name__)
 
+_UPGRADE_JSON_FILES = {
+    "thermal": (UpgradeType.ThermalUpgrade, "Processed_upgrades.json"),
+    "voltage": (UpgradeType.VoltageUpgrade, "Processed_voltage_upgrades.json"),
+}
+
 
 def read_capacitor_changes(event_log):
     """Read the capacitor state changes from an OpenDSS event log.
@@ -96,6 +102,37 @@ def extract_upgrade_results(project_path, file_ext=".dss"):
     return upgrades_result
 
 
+def read_upgrade_results(project_path):
+    """Read the processed .json upgrade results from a pydss_project.
+
+    The files are read in memory from project.zip (or the project directory);
+    nothing is written to disk.
+
+    Parameters
+    ----------
+    project_path : str
+        The path to the pydss_project path.
+
+    Returns
+    -------
+    dict
+        Maps "thermal" and "voltage" to the parsed upgrade results.
+
+    """
+    upgrade_results = {}
+    fs_interface = PyDssProject.load_project(project_path).fs_interface
+    for key, (upgrade_type, filename) in _UPGRADE_JSON_FILES.items():
+        text = fs_interface.read_file(_get_upgrade_results_path(upgrade_type, filename))
+        upgrade_results[key] = json.loads(text)
+
+    return upgrade_results
+
+
+def _get_upgrade_results_path(upgrade_type, filename):
+    """Return the path of an upgrade results file within the pydss_project."""
+    return os.path.join("Scenarios", upgrade_type.value, "PostProcess", filename)
+
+
 def _extract_upgrade_dss_files(project_path):
     """Extract .dss upgrades files from pydss_project."""
     upgrade_results = {}
@@ -145,30 +182,12 @@ def _extract_upgrade_dss_files(project_path):
 def _extract_upgrade_json_files(project_path):
     """Extract .json upgrades files from pydss_project."""
     upgrade_results = {}
-    thermal_upgrade_file = os.path.join(project_path, "Processed_upgrades.json")
-    voltage_upgrade_file = os.path.join(project_path, "Processed_voltage_upgrades.json")
-
-    pydss_project = PyDssProject.load_project(project_path)
-    if "thermal" not in upgrade_results:
-        text = pydss_project.fs_interface.read_file(os.path.join(
-            "Scenarios",
-            UpgradeType.ThermalUpgrade.value,
-            "PostProcess",
-            "Processed_upgrades.json"
-        ))
-        with open(thermal_upgrade_file, "w") as f:
-            f.write(text)
-        upgrade_results["thermal"] = thermal_upgrade_file
-
-    if "voltage" not in upgrade_results:
-        text = pydss_project.fs_interface.read_file(os.path.join(
-            "Scenarios",
-            UpgradeType.VoltageUpgrade.value,
-            "PostProcess",
-            "Processed_voltage_upgrades.json"
-        ))
-        with open(voltage_upgrade_file, "w") as f:
+    fs_interface = PyDssProject.load_project(project_path).fs_interface
+    for key, (upgrade_type, filename) in _UPGRADE_JSON_FILES.items():
+        text = fs_interface.read_file(_get_upgrade_results_path(upgrade_type, filename))
+        upgrade_file = os.path.join(project_path, filename)
+        with open(upgrade_file, "w") as f:
             f.write(text)
-        upgrade_results["voltage"] = voltage_upgrade_file
+        upgrade_results[key] = upgrade_file
 
     return upgrade_results
@@ -0,0 +1,50 @@
+"""Tests for the base case voltage cache of snapshot impact analysis."""
+
+import os
+
+import pandas as pd
+import pytest
+
+from disco.analysis import snapshot_impact_analysis
+from disco.analysis.snapshot_impact_analysis import (
+    BASE_CASE_VOLTAGES_FILENAME,
+    _read_base_case_voltages,
+    _write_base_case_voltages,
+)
+
+
+VOLTAGES = pd.DataFrame({
+    "Name": ["bus1", "bus2"],
+    "PhaseTerminal": ["A1", "B1"],
+    "Value": [1.01, 0.98],
+})
+
+
+def test_round_trip(tmp_path):
+    filename = str(tmp_path / BASE_CASE_VOLTAGES_FILENAME)
+    _write_base_case_voltages(filename, "base", 1234.5, VOLTAGES)
+    pd.testing.assert_frame_equal(
+        _read_base_case_voltages(filename, "base", 1234.5), VOLTAGES
+    )
+    assert os.listdir(tmp_path) == [BASE_CASE_VOLTAGES_FILENAME]
+
+
+def test_stale_cache(tmp_path):
+    filename = str(tmp_path / BASE_CASE_VOLTAGES_FILENAME)
+    assert _read_base_case_voltages(filename, "base", 1234.5) is None
+
+    _write_base_case_voltages(filename, "base", 1234.5, VOLTAGES)
+    # The PyDSS store was rewritten after the cache.
+    assert _read_base_case_voltages(filename, "base", 1240.0) is None
+    assert _read_base_case_voltages(filename, "other_base", 1234.5) is None
+
+
+def test_failed_write_removes_tmp_file(tmp_path, monkeypatch):
+    def savez(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(snapshot_impact_analysis.np, "savez", savez)
+    filename = str(tmp_path / BASE_CASE_VOLTAGES_FILENAME)
+    with pytest.raises(OSError):
+        _write_base_case_voltages(filename, "base", 1234.5, VOLTAGES)
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,86 @@
+"""Tests for DirectoryIndex."""
+
+import os
+
+import pytest
+
+from disco.sources.directory_index import DirectoryIndex, get_default_index_filename
+
+
+@pytest.fixture
+def tree(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    root = tmp_path / "inputs"
+    for feeder in ("f1", "f2"):
+        (root / feeder / "deployments").mkdir(parents=True)
+        (root / feeder / "Master.dss").write_text("")
+    # Listings of recently modified directories are not cached.
+    for dirpath, _, _ in os.walk(root):
+        os.utime(dirpath, (1000, 1000))
+    return str(root)
+
+
+def _list_all(index, root):
+    return {
+        x: (sorted(index.list_directories(os.path.join(root, x))),
+            sorted(index.list_files(os.path.join(root, x))))
+        for x in sorted(index.list_directories(root))
+    }
+
+
+def test_index_is_stored_outside_the_tree(tree):
+    index = DirectoryIndex(tree)
+    listings = _list_all(index, tree)
+    index.save()
+
+    assert index.filename == get_default_index_filename(tree)
+    assert not index.filename.startswith(tree)
+    assert os.path.exists(index.filename)
+    for dirpath, _, filenames in os.walk(tree):
+        assert filenames in ([], ["Master.dss"])
+    assert listings == {"f1": (["deployments"], ["Master.dss"]),
+                        "f2": (["deployments"], ["Master.dss"])}
+
+
+def test_unchanged_directories_are_not_scanned(tree, monkeypatch):
+    index = DirectoryIndex(tree)
+    expected = _list_all(index, tree)
+    index.save()
+
+    scanned = []
+    scan = DirectoryIndex._scan
+    monkeypatch.setattr(DirectoryIndex, "_scan",
+                        staticmethod(lambda path: scanned.append(path) or scan(path)))
+    index = DirectoryIndex(tree)
+    assert _list_all(index, tree) == expected
+    assert scanned == []
+
+    # A new feeder changes only the root's mtime.
+    os.mkdir(os.path.join(tree, "f3"))
+    os.utime(os.path.join(tree, "f3"), (1000, 1000))
+    os.utime(tree, (2000, 2000))
+    index = DirectoryIndex(tree)
+    assert _list_all(index, tree) == {**expected, "f3": ([], [])}
+    assert sorted(set(scanned)) == [tree, os.path.join(tree, "f3")]
+
+
+def test_unwritable_index_location(tmp_path, tree):
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    index = DirectoryIndex(tree, filename=str(blocker / "index.json"))
+    expected = _list_all(index, tree)
+    index.save()
+    assert _list_all(DirectoryIndex(tree, filename=str(blocker / "index.json")), tree) == expected
+
+
+def test_index_of_another_root_is_ignored(tmp_path, tree):
+    filename = str(tmp_path / "index.json")
+    index = DirectoryIndex(tree, filename=filename)
+    _list_all(index, tree)
+    index.save()
+
+    other = tmp_path / "other"
+    (other / "f1").mkdir(parents=True)
+    os.utime(other / "f1", (1000, 1000))
+    index = DirectoryIndex(str(other), filename=filename)
+    assert index.list_directories(str(other / "f1")) == []
@@ -0,0 +1,96 @@
+"""Compares FeederResultsMerger with the DataFrame-based merge it replaced."""
+
+import random
+
+import pandas as pd
+import pytest
+
+from disco.extensions.pydss_simulation.merge_feeders_results import FeederResultsMerger
+
+
+def _make_results(feeder, num_jobs, seed, penetrations=None):
+    rng = random.Random(seed)
+    if penetrations is None:
+        penetrations = rng.sample(range(0, 100, 5), num_jobs)
+    results = []
+    for i in range(num_jobs):
+        results.append({
+            "feeder": feeder,
+            "name": f"{feeder}__{i}",
+            "penetration": penetrations[i],
+            "pv_kw": rng.choice([12.0, 0.1 + 0.2, 1e-05, 1e16, 250]),
+            "max_voltage": rng.uniform(0.9, 1.1),
+            "overvoltage_A_flag": rng.choice([True, False]),
+            "overvoltage_A_count": rng.randint(0, 5),
+            "voltage_deviation": rng.choice([None, 0.01]),
+            "base_case": rng.choice([None, "base"]),
+            "always_missing": None,
+            "mixed_flag": rng.choice([None, True]),
+            "max_line_loading": rng.choice([1, 2, 3.5]),
+        })
+    return results
+
+
+def _write_old(results, filename, kind="quicksort"):
+    result_df = pd.DataFrame(results, columns=results[0].keys())
+    result_df.sort_values("penetration", inplace=True, kind=kind)
+    result_df.to_csv(filename, index=False)
+
+
+@pytest.mark.parametrize("max_buffered_results", [1, 3, 1000])
+def test_csv_matches_dataframe_output(tmp_path, max_buffered_results):
+    feeders = {
+        "f1": _make_results("f1", 12, 1),
+        "f2": _make_results("f2", 7, 2),
+        "f3": _make_results("f3", 1, 3),
+    }
+    # Without missing values the column stays int64 in this feeder.
+    for result in feeders["f3"]:
+        result["voltage_deviation"] = 0.5
+
+    spill_dir = tmp_path / "spill"
+    spill_dir.mkdir()
+    merger = FeederResultsMerger(str(spill_dir), max_buffered_results)
+    for i in range(12):
+        for results in feeders.values():
+            if i < len(results):
+                merger.add(results[i]["feeder"], results[i])
+
+    assert merger.list_feeders() == ["f1", "f2", "f3"]
+    for feeder, results in feeders.items():
+        expected = tmp_path / f"{feeder}-old.csv"
+        actual = tmp_path / f"{feeder}-new.csv"
+        _write_old(results, expected)
+        merger.write_feeder_results(feeder, str(actual))
+        assert actual.read_bytes() == expected.read_bytes()
+
+
+def test_missing_penetration_sorts_last(tmp_path):
+    results = [
+        {"name": "a", "penetration": None, "value": 1},
+        {"name": "b", "penetration": 10, "value": None},
+        {"name": "c", "penetration": 5, "value": 2.5},
+    ]
+    merger = FeederResultsMerger(str(tmp_path), 2)
+    for result in results:
+        merger.add("f1", result)
+
+    expected = tmp_path / "old.csv"
+    actual = tmp_path / "new.csv"
+    _write_old(results, expected)
+    merger.write_feeder_results("f1", str(actual))
+    assert actual.read_bytes() == expected.read_bytes()
+
+
+def test_equal_penetrations_keep_job_order(tmp_path):
+    # The old quicksort left the order of ties unspecified.
+    results = _make_results("f1", 12, 4, penetrations=[10, 5, 10, 0, 5, 10] * 2)
+    merger = FeederResultsMerger(str(tmp_path), 5)
+    for result in results:
+        merger.add("f1", result)
+
+    expected = tmp_path / "old.csv"
+    actual = tmp_path / "new.csv"
+    _write_old(results, expected, kind="stable")
+    merger.write_feeder_results("f1", str(actual))
+    assert actual.read_bytes() == expected.read_bytes()
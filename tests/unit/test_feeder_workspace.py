@@ -0,0 +1,130 @@
+"""Tests for building OpenDSS feeder workspaces from source files."""
+
+import errno
+import os
+from pathlib import Path
+
+import pytest
+
+from disco.sources import base
+from disco.sources.base import BaseOpenDssModel, OpenDssFeederWorkspace, _link_file
+from disco.sources.source_tree_2.source_tree_2_model import SourceTree2Model
+
+
+MASTER_DSS = """\
+Clear
+New Circuit.test basekv=12.47
+Redirect Lines.dss
+Redirect LoadShapes.dss
+Solve
+"""
+
+LINES_DSS = "New Line.l1 bus1=b1.1 bus2=b2.1 length=0.1\n"
+
+LOADSHAPES_DSS = """\
+New Loadshape.res npts=1 mult=[file=../LoadShapes/res.csv]
+New Loadshape.com npts=1 mult=(file=..\\LoadShapes\\com.csv)
+"""
+
+
+@pytest.fixture
+def opendss_directory(tmp_path):
+    path = tmp_path / "source" / "OpenDSS"
+    path.mkdir(parents=True)
+    (path / "Master.dss").write_text(MASTER_DSS)
+    (path / "Lines.dss").write_text(LINES_DSS)
+    (path / "LoadShapes.dss").write_text(LOADSHAPES_DSS)
+    return str(path)
+
+
+@pytest.fixture
+def no_reflink(monkeypatch):
+    def reflink_file(src_file, dst_file):
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported")
+
+    monkeypatch.setattr(base, "_reflink_file", reflink_file)
+
+
+def _can_hard_link(path):
+    src_file = os.path.join(path, "link-test")
+    with open(src_file, "w"):
+        pass
+    try:
+        os.link(src_file, src_file + "2")
+        return True
+    except OSError:
+        return False
+
+
+def test_copy_files(tmp_path, opendss_directory, no_reflink):
+    dst_dir = tmp_path / "workspace"
+    dst_dir.mkdir()
+    source_bytes = Path(os.path.join(opendss_directory, "LoadShapes.dss")).read_bytes()
+    BaseOpenDssModel._copy_files(opendss_directory, str(dst_dir))
+
+    src_lines = os.path.join(opendss_directory, "Lines.dss")
+    dst_lines = str(dst_dir / "Lines.dss")
+    assert Path(dst_lines).read_text() == LINES_DSS
+    if _can_hard_link(str(tmp_path)):
+        assert os.path.samefile(src_lines, dst_lines)
+
+    # Data file references are made absolute in a new file.
+    src_loadshapes = os.path.join(opendss_directory, "LoadShapes.dss")
+    dst_loadshapes = str(dst_dir / "LoadShapes.dss")
+    assert not os.path.samefile(src_loadshapes, dst_loadshapes)
+    loadshapes_dir = os.path.join(os.path.dirname(opendss_directory), "LoadShapes")
+    assert Path(dst_loadshapes).read_text().splitlines() == [
+        f"New Loadshape.res npts=1 mult=[file={loadshapes_dir}/res.csv]",
+        f"New Loadshape.com npts=1 mult=(file={loadshapes_dir}/com.csv)",
+    ]
+    assert Path(src_loadshapes).read_bytes() == source_bytes
+
+
+def test_create_common_files(tmp_path, opendss_directory, no_reflink):
+    model = SourceTree2Model({
+        "path": str(tmp_path / "source"),
+        "feeder": "feeder1",
+        "master": "Master.dss",
+        "dcac": 1.15,
+        "scale": "small",
+        "placement": "random",
+        "deployment": 1,
+        "penetration_level": 5,
+        "deployment_file": None,
+        "loadshape_directory": None,
+        "opendss_directory": opendss_directory,
+        "pv_locations": [],
+    })
+    workspace = OpenDssFeederWorkspace(str(tmp_path / "workspace"))
+    model._create_common_files(workspace)
+
+    assert Path(workspace.master_file).read_text() == MASTER_DSS.replace("Solve", "!Solve")
+    assert Path(model.master_file).read_text() == MASTER_DSS
+    assert not os.path.samefile(workspace.master_file, model.master_file)
+
+
+def _failing_link(code):
+    def link(src_file, dst_file):
+        raise OSError(code, os.strerror(code))
+
+    return link
+
+
+def test_link_file_keeps_functions_after_per_file_errors(tmp_path):
+    src_file = tmp_path / "src.dss"
+    src_file.write_text(LINES_DSS)
+    too_many_links = _failing_link(errno.EMLINK)
+    link_funcs = [too_many_links]
+    _link_file(str(src_file), str(tmp_path / "dst1.dss"), link_funcs)
+    assert link_funcs == [too_many_links]
+    assert (tmp_path / "dst1.dss").read_text() == LINES_DSS
+
+
+def test_link_file_drops_unsupported_functions(tmp_path):
+    src_file = tmp_path / "src.dss"
+    src_file.write_text(LINES_DSS)
+    cross_device = _failing_link(errno.EXDEV)
+    link_funcs = [cross_device, os.link]
+    _link_file(str(src_file), str(tmp_path / "dst1.dss"), link_funcs)
+    assert link_funcs == [os.link]
+    assert (tmp_path / "dst1.dss").read_text() == LINES_DSS
@@ -0,0 +1,226 @@
+"""Tests for transform-model --incremental with Source Tree 2 inputs."""
+
+import json
+import os
+import shutil
+
+import pytest
+from click.testing import CliRunner
+
+from jade.exceptions import InvalidParameter
+from jade.utils.utils import dump_data
+from disco.cli.transform_model import transform_model
+from disco.models.snapshot_impact_analysis_model import SnapshotImpactAnalysisModel
+from disco.sources.base import (
+    DEFAULT_SNAPSHOT_IMPACT_ANALYSIS_PARAMS,
+    SOURCE_CONFIGURATION_FILENAME,
+    TRANSFORM_MANIFEST_FILENAME,
+)
+from disco.sources.source_tree_2.source_tree_2_model import SourceTree2Model
+
+
+MASTER_DSS = """\
+Clear
+New Circuit.test basekv=12.47
+Redirect LoadShapes.dss
+Solve
+"""
+
+LOADSHAPES_DSS = "New Loadshape.res npts=1 mult=[file=../LoadShapes/res.csv]\n"
+
+PV_SYSTEMS = "New PVSystem.pv_{level} bus1=b1.1 kVA={level} Pmpp={level}\n"
+
+
+def _make_source(path, feeders):
+    os.makedirs(path)
+    with open(os.path.join(path, "format.toml"), "w") as f_out:
+        f_out.write('type = "SourceTree2Model"\n')
+    for feeder in feeders:
+        feeder_path = os.path.join(path, "inputs", feeder)
+        os.makedirs(os.path.join(feeder_path, "OpenDSS"))
+        os.makedirs(os.path.join(feeder_path, "LoadShapes"))
+        with open(os.path.join(feeder_path, "OpenDSS", "Master_noPV.dss"), "w") as f_out:
+            f_out.write(MASTER_DSS)
+        with open(os.path.join(feeder_path, "OpenDSS", "LoadShapes.dss"), "w") as f_out:
+            f_out.write(LOADSHAPES_DSS)
+        with open(os.path.join(feeder_path, "LoadShapes", "res.csv"), "w") as f_out:
+            f_out.write("0.5\n")
+        for deployment in (1, 2):
+            deployment_path = _get_deployment_path(path, feeder, deployment)
+            os.makedirs(deployment_path)
+            for level in (5, 10):
+                _write_pv_systems(deployment_path, deployment, level)
+
+
+def _get_deployment_path(path, feeder, deployment):
+    return os.path.join(
+        path, "inputs", feeder, "PVDeployments", "new", "DCAC1.15", "SmallScale",
+        "random", str(deployment),
+    )
+
+
+def _write_pv_systems(deployment_path, deployment, level, text=None):
+    filename = os.path.join(deployment_path, f"PV_Gen_{deployment}_{level}.txt")
+    with open(filename, "w") as f_out:
+        f_out.write(text or PV_SYSTEMS.format(level=level))
+
+
+def _make_config(input_path):
+    config = {
+        "source_type": SourceTree2Model.__name__,
+        "analysis_type": "SnapshotImpactAnalysis",
+        "input_path": input_path,
+        "model_params": {
+            "feeders": ["all"],
+            "dcac_ratios": ["all"],
+            "scales": ["all"],
+            "placements": ["all"],
+            "deployments": ["all"],
+            "penetration_levels": ["all"],
+            "master_file": "Master_noPV.dss",
+        },
+    }
+    config.update(DEFAULT_SNAPSHOT_IMPACT_ANALYSIS_PARAMS)
+    return config
+
+
+def _transform(config, output, incremental):
+    SourceTree2Model.transform(
+        config, SnapshotImpactAnalysisModel, output, incremental=incremental
+    )
+
+
+def _read_output(output):
+    """Return the contents of all files in output with output replaced by a
+    placeholder, excluding manifests."""
+    contents = {}
+    for dirpath, _, filenames in os.walk(output):
+        for filename in filenames:
+            if filename == TRANSFORM_MANIFEST_FILENAME:
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path) as f_in:
+                text = f_in.read()
+            contents[os.path.relpath(path, output)] = text.replace(output, "<output>")
+    return contents
+
+
+def _age_deployment_files(output):
+    """Set old mtimes on all deployment files and return their inodes and
+    mtimes. Files regenerated later get a new mtime even within the
+    filesystem's timestamp resolution."""
+    stats = {}
+    for feeder in os.listdir(output):
+        path = os.path.join(output, feeder, "PVDeployments")
+        if not os.path.isdir(path):
+            continue
+        for filename in os.listdir(path):
+            deployment_file = os.path.join(path, filename)
+            os.utime(deployment_file, (1000, 1000))
+            stat = os.stat(deployment_file)
+            stats[filename] = (stat.st_ino, stat.st_mtime_ns)
+    return stats
+
+
+def _get_deployment_stat(output, name):
+    feeder = name.split("__")[0]
+    stat = os.stat(os.path.join(output, feeder, "PVDeployments", name))
+    return stat.st_ino, stat.st_mtime_ns
+
+
+@pytest.fixture
+def source(tmp_path, monkeypatch):
+    # Relative output paths keep deployment files within the models' length limits.
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    path = str(tmp_path / "source")
+    _make_source(path, ["feeder1", "feeder2", "feeder3"])
+    return path
+
+
+def test_incremental_matches_full_transform(source):
+    config = _make_config(source)
+    incremental_output = "incremental-models"
+    _transform(config, incremental_output, True)
+    assert os.path.exists(
+        os.path.join(incremental_output, "feeder1", TRANSFORM_MANIFEST_FILENAME)
+    )
+
+    # Change one feeder and remove another from the source data.
+    _write_pv_systems(
+        _get_deployment_path(source, "feeder1", 2), 2, 10,
+        text="New PVSystem.pv_changed bus1=b1.1 kVA=12 Pmpp=12\n",
+    )
+    shutil.rmtree(os.path.join(source, "inputs", "feeder3"))
+    stats = _age_deployment_files(incremental_output)
+    _transform(config, incremental_output, True)
+
+    changed = "feeder1__1.15__small__random__2__10.dss"
+    for name, stat in stats.items():
+        if name.startswith("feeder3"):
+            continue
+        if name == changed:
+            assert _get_deployment_stat(incremental_output, name) != stat
+        else:
+            assert _get_deployment_stat(incremental_output, name) == stat, name
+    assert len(stats) == 12
+
+    full_output = "full-models"
+    _transform(config, full_output, False)
+    assert not os.path.exists(
+        os.path.join(full_output, "feeder1", TRANSFORM_MANIFEST_FILENAME)
+    )
+
+    assert sorted(os.listdir(incremental_output)) == \
+        [SOURCE_CONFIGURATION_FILENAME, "feeder1", "feeder2"]
+    full = _read_output(full_output)
+    incremental = _read_output(incremental_output)
+    assert "pv_changed" in full[os.path.join("feeder1", "PVDeployments", changed)]
+    assert incremental == full
+
+
+def test_selecting_more_deployments_keeps_the_others(source):
+    config = _make_config(source)
+    config["model_params"]["feeders"] = ["feeder1"]
+    config["model_params"]["penetration_levels"] = [5]
+    output = "disco-models"
+    _transform(config, output, True)
+    stats = _age_deployment_files(output)
+    assert sorted(stats) == [
+        "feeder1__1.15__small__random__1__5.dss",
+        "feeder1__1.15__small__random__2__5.dss",
+    ]
+
+    config["model_params"]["feeders"] = ["feeder1", "feeder2"]
+    config["model_params"]["penetration_levels"] = ["all"]
+    _transform(config, output, True)
+    for name, stat in stats.items():
+        assert _get_deployment_stat(output, name) == stat, name
+    with open(os.path.join(output, SOURCE_CONFIGURATION_FILENAME)) as f_in:
+        assert len(json.load(f_in)) == 8
+
+
+def test_unchanged_configurations_are_not_rewritten(source):
+    config = _make_config(source)
+    output = "disco-models"
+    _transform(config, output, True)
+    filename = os.path.join(output, SOURCE_CONFIGURATION_FILENAME)
+    mtime = os.stat(filename).st_mtime_ns
+    with open(filename) as f_in:
+        jobs = json.load(f_in)
+    assert len(jobs) == 12
+
+    _transform(config, output, True)
+    assert os.stat(filename).st_mtime_ns == mtime
+
+
+def test_force_and_incremental_are_exclusive(tmp_path, source):
+    config_file = str(tmp_path / "transform_config.json")
+    dump_data(_make_config(source), config_file)
+    output = tmp_path / "output"
+    output.mkdir()
+    result = CliRunner().invoke(
+        transform_model, [config_file, "-o", str(output), "--force", "--incremental"]
+    )
+    assert isinstance(result.exception, InvalidParameter)
+    assert list(output.iterdir()) == []
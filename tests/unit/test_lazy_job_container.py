@@ -0,0 +1,86 @@
+"""Tests for LazyJobContainer."""
+
+import pytest
+
+from jade.exceptions import InvalidParameter
+
+from disco.distribution.lazy_job_container import LazyJobContainer
+
+
+class FakeJob:
+
+    num_deserialized = 0
+
+    def __init__(self, name):
+        self.name = name
+
+    @classmethod
+    def deserialize(cls, data):
+        cls.num_deserialized += 1
+        return cls(data["name"])
+
+    def serialize(self):
+        return {"name": self.name}
+
+
+@pytest.fixture
+def container():
+    FakeJob.num_deserialized = 0
+    return LazyJobContainer(FakeJob, [{"name": x} for x in ("c", "a", "b")])
+
+
+def test_len_does_not_deserialize(container):
+    assert len(container) == 3
+    assert FakeJob.num_deserialized == 0
+
+
+def test_get_job_deserializes_once(container):
+    job = container.get_job("a")
+    assert job.name == "a"
+    assert container.get_job("a") is job
+    assert container.get_job_by_key("a") is job
+    assert FakeJob.num_deserialized == 1
+
+
+def test_get_job_missing(container):
+    with pytest.raises(InvalidParameter):
+        container.get_job("d")
+
+
+def test_iter_preserves_order(container):
+    assert [x.name for x in container] == ["c", "a", "b"]
+    assert [x.name for x in container.list_jobs()] == ["c", "a", "b"]
+    assert FakeJob.num_deserialized == 3
+    list(container)
+    assert FakeJob.num_deserialized == 3
+
+
+def test_get_jobs(container):
+    assert [x.name for x in container.get_jobs()] == ["c", "a", "b"]
+    assert [x.name for x in container.get_jobs(sort=True)] == ["a", "b", "c"]
+
+
+def test_serialize_round_trip(container):
+    container.get_job("b")
+    assert [x.serialize() for x in container] == [{"name": x} for x in ("c", "a", "b")]
+
+
+def test_add_job(container):
+    container.add_job(FakeJob("d"))
+    assert len(container) == 4
+    assert container.get_job("d").name == "d"
+    with pytest.raises(InvalidParameter):
+        container.add_job(FakeJob("a"))
+
+
+def test_remove_job(container):
+    container.remove_job(container.get_job("a"))
+    container.remove_job(key="c")
+    assert [x.name for x in container] == ["b"]
+    assert FakeJob.num_deserialized == 2
+
+
+def test_clear(container):
+    container.clear()
+    assert len(container) == 0
+    assert not list(container)
@@ -0,0 +1,129 @@
+"""Tests for the element-bus mapping of model-inputs directories."""
+
+import json
+import logging
+import os
+
+import pytest
+
+from disco.sources.gem.make_element_bus_mapping import (
+    BINARY_BUS_MAPPINGS_DIRNAME,
+    BinaryBusMapping,
+    _make_feeder_dict,
+    _process_element_file,
+    get_binary_bus_mapping_directory,
+    make_element_bus_mapping,
+)
+
+
+FEEDER_DSS = """\
+New Line.l1 Units=km Length=0.15 bus1=b1.1.2.3 bus2=b2.1.2.3 phases=3
+New Load.load1 conn=wye bus1=b2.1 kV=0.12 kW=3.2
+New Load.load2 conn=wye bus1=missing_bus.1 kV=0.12 kW=3.2
+"""
+
+BUS_COORDS = """\
+b1 1.0 2.0
+b2 3.0 4.0
+"""
+
+
+def _make_model_inputs(path, feeders):
+    os.makedirs(path)
+    with open(os.path.join(path, "configurations.json"), "w") as f_out:
+        json.dump({}, f_out)
+    for feeder, text in feeders.items():
+        feeder_path = os.path.join(path, feeder)
+        os.makedirs(feeder_path)
+        with open(os.path.join(feeder_path, "Master.dss"), "w") as f_out:
+            f_out.write(text)
+        with open(os.path.join(feeder_path, "BusCoords.dss"), "w") as f_out:
+            f_out.write(BUS_COORDS)
+
+
+class _RecordingHandler(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.fixture
+def recorded_messages():
+    handler = _RecordingHandler()
+    logger = logging.getLogger("bus_mapping")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    yield handler.messages
+    logger.removeHandler(handler)
+
+
+def test_worker_warnings_reach_parent(tmp_path, recorded_messages):
+    path = str(tmp_path / "model-inputs")
+    _make_model_inputs(path, {"feeder1": FEEDER_DSS, "feeder2": FEEDER_DSS})
+    feeder_files = make_element_bus_mapping(path, num_processes=2)
+
+    assert sorted(feeder_files) == ["feeder1", "feeder2"]
+    warnings = [x for x in recorded_messages if "missing_bus" in x]
+    assert len(warnings) == 2
+
+
+ELEMENTS_DSS = """\
+! New Line.commented bus1=c1.1 bus2=c2.1
+// New Load.commented bus1=c1.1
+New Line.l1 Units=km Length=0.15 bus1=b1.1.2.3 ! bus1=ignored.1
+~ bus2=b2.1.2.3 phases=3
+New Load.load1 conn=wye
+
+~ bus1=b2.1 kV=0.12 kW=3.2 // trailing comment
+New Load.load2 bus1="b3.1" kW=1.0
+New Capacitor.cap1 Bus1=b1 phases=3 Kv=4.8
+New PVSystem.pv1 bus1=b3.1.2 phases=2
+New Transformer.t1 phases=3 windings=2 buses=(b1.1.2.3, b2.1.2.3) conns=(Delta, Wye)
+New Transformer.t2 phases=3 windings=2 buses="b2.1.2.3 b3.1.2.3" kvs=[4.8 0.48]
+New Transformer.t3 phases=3 windings=2 buses=[b3.1.2.3, b1.1.2.3]
+New Transformer.t4 phases=1 windings=2
+~ wdg=1 bus=b1.1 kv=4.8
+~ wdg=2 bus=b2.1 kv=0.12
+"""
+
+
+def test_element_file_syntax(tmp_path):
+    filename = tmp_path / "Master.dss"
+    filename.write_text(ELEMENTS_DSS)
+    mapping = _make_feeder_dict()
+    mapping["bus_coords"] = {x: {"x": "0", "y": "0"} for x in ("b1", "b2", "b3")}
+    _process_element_file(mapping, str(filename))
+
+    assert mapping["lines"] == {"Line.l1": {"from": "b1", "to": "b2"}}
+    assert mapping["loads"] == {"Load.load1": "b2", "Load.load2": "b3"}
+    assert mapping["capacitors"] == {"Capacitor.cap1": "b1"}
+    assert mapping["pv_systems"] == {"PVSystem.pv1": "b3"}
+    assert mapping["transformers"] == {
+        "Transformer.t1": {"primary": "b1", "secondary": "b2"},
+        "Transformer.t2": {"primary": "b2", "secondary": "b3"},
+        "Transformer.t3": {"primary": "b3", "secondary": "b1"},
+        "Transformer.t4": {"primary": "b1", "secondary": "b2"},
+    }
+
+
+def test_run_twice(tmp_path):
+    path = str(tmp_path / "model-inputs")
+    _make_model_inputs(path, {"feeder1": FEEDER_DSS, "feeder2": FEEDER_DSS})
+    first = make_element_bus_mapping(path)
+    contents = sorted(os.listdir(path))
+    second = make_element_bus_mapping(path)
+
+    assert first == second
+    assert sorted(second) == ["feeder1", "feeder2"]
+    assert sorted(os.listdir(path)) == contents
+    assert sorted(os.listdir(os.path.join(path, BINARY_BUS_MAPPINGS_DIRNAME))) == [
+        "feeder1", "feeder2"
+    ]
+
+    mapping = BinaryBusMapping(get_binary_bus_mapping_directory(path, "feeder1"))
+    assert mapping.get_element_coordinates("loads", "Load.load1") == {"x": 3.0, "y": 4.0}
+    assert mapping.get_element_coordinates("loads", "Load.load2") is None
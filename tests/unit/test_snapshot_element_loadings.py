@@ -0,0 +1,84 @@
+"""Tests for the per-element loading outputs of snapshot impact analysis."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from disco.analysis.snapshot_impact_analysis import (
+    ELEMENT_LOADINGS_FILENAME,
+    merge_all_element_loadings,
+    merge_element_loadings,
+    read_element_loadings,
+    write_element_loadings,
+)
+
+
+LOADINGS = {
+    "job1": {
+        "lines": {"l1": 0.5, "l2": 1.25},
+        "transformers": {"t1": 0.75},
+    },
+    "job2": {
+        "lines": {"l3": 2.0, "l1": 0.25},
+    },
+    "job3": {
+        "lines": {},
+        "transformers": {"t2": 1.5, "t1": 0.5},
+    },
+}
+
+
+def _write_all(directory):
+    for job_name, loadings in LOADINGS.items():
+        write_element_loadings(directory, "f1", job_name, loadings)
+
+
+def _check_loadings(directory, job_name, expected):
+    actual = read_element_loadings(directory, "f1", job_name)
+    assert set(actual) <= set(expected) | {"lines", "transformers"}
+    for element_type, values in expected.items():
+        series = actual[element_type].dropna()
+        assert series.dtype == np.float32
+        assert series.to_dict() == values
+
+
+def test_read_parts(tmp_path):
+    directory = str(tmp_path)
+    _write_all(directory)
+    assert not os.path.exists(os.path.join(directory, "f1", ELEMENT_LOADINGS_FILENAME))
+    for job_name, loadings in LOADINGS.items():
+        _check_loadings(directory, job_name, loadings)
+
+
+def test_merge(tmp_path):
+    directory = str(tmp_path)
+    _write_all(directory)
+    merge_all_element_loadings(directory)
+    assert os.listdir(os.path.join(directory, "f1")) == [ELEMENT_LOADINGS_FILENAME]
+    for job_name, loadings in LOADINGS.items():
+        _check_loadings(directory, job_name, loadings)
+
+    # All jobs share one name index per element type.
+    lines = read_element_loadings(directory, "f1", "job2")["lines"]
+    assert list(lines.index) == ["l1", "l2", "l3"]
+    assert np.isnan(lines["l2"])
+
+
+def test_merge_after_rerun(tmp_path):
+    directory = str(tmp_path)
+    _write_all(directory)
+    merge_element_loadings(directory, "f1")
+
+    write_element_loadings(directory, "f1", "job2", {"lines": {"l4": 3.0}})
+    write_element_loadings(directory, "f1", "job4", {"lines": {"l1": 1.0}})
+    _check_loadings(directory, "job2", {"lines": {"l4": 3.0}})
+    merge_element_loadings(directory, "f1")
+
+    _check_loadings(directory, "job1", LOADINGS["job1"])
+    _check_loadings(directory, "job2", {"lines": {"l4": 3.0}})
+    _check_loadings(directory, "job4", {"lines": {"l1": 1.0}})
+    lines = read_element_loadings(directory, "f1", "job4")["lines"]
+    assert isinstance(lines, pd.Series)
+    # l3 was only in the replaced row of job2.
+    assert list(lines.index) == ["l1", "l2", "l4"]
@@ -0,0 +1,205 @@
+"""Compares the vectorized snapshot impact analysis helpers with the
+per-element loops they replaced."""
+
+import math
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from disco.analysis.snapshot_impact_analysis import (
+    _count_voltage_violations,
+    _get_line_loading,
+    _get_transformer_loading,
+    _make_transformer_index,
+    _read_element_values,
+)
+
+
+class FakeScenario:
+    """Serves one time point of element values the way PyDSS does."""
+
+    def __init__(self, data):
+        # data maps (class_name, property_name) to {column: value}
+        self._data = data
+
+    def get_full_dataframe(self, class_name, property_name, phase_terminal=None, **kwargs):
+        columns = {
+            k: [v] for k, v in self._data[(class_name, property_name)].items()
+            if phase_terminal is None or phase_terminal.search(k.split("__")[1])
+        }
+        return pd.DataFrame(columns)
+
+    def list_element_names(self, class_name, property_name):
+        names = []
+        for column in self._data[(class_name, property_name)]:
+            name = column.split("__")[0]
+            if name not in names:
+                names.append(name)
+        return names
+
+    def get_dataframe(self, class_name, property_name, element, phase_terminal=None, **kwargs):
+        df = self.get_full_dataframe(class_name, property_name, phase_terminal=phase_terminal)
+        return df[[x for x in df.columns if x.split("__")[0] == element]]
+
+
+def _old_normalize_dataframe_values(scenario, class_name, property_name, terminal=None,
+                                    convert=False, **kwargs):
+    results_list = list()
+    phase_terminal = None
+    if terminal is not None:
+        phase_terminal = re.compile(rf"[ABCN]{terminal}")
+
+    for element in scenario.list_element_names(class_name, property_name):
+        dataframe = scenario.get_dataframe(class_name, property_name, element,
+                                           phase_terminal=phase_terminal, **kwargs)
+        for column in dataframe.columns:
+            value = dataframe[column].values.item()
+            result = {'Name': element, 'PhaseTerminal': column, 'Value': value}
+            if convert:
+                complex_number = complex(value)
+                result['Value'] = math.sqrt(complex_number.real**2 + complex_number.imag**2)
+            results_list.append(result)
+
+    return pd.DataFrame(results_list, columns=['Name', 'PhaseTerminal', 'Value'])
+
+
+def _old_check_voltage_violations(bus_voltages, ub1=1.05, lb1=0.95, ub2=1.05833, lb2=0.91667):
+    vmax = max(bus_voltages)
+    vmin = min(bus_voltages)
+    uv_count1 = len([v for v in bus_voltages if v < lb1])
+    ov_count1 = len([v for v in bus_voltages if v > ub1])
+    uv_count2 = len([v for v in bus_voltages if v < lb2])
+    ov_count2 = len([v for v in bus_voltages if v > ub2])
+    return (vmin, vmax, vmin < lb1, vmax > ub1, uv_count1, ov_count1,
+            vmin < lb2, vmax > ub2, uv_count2, ov_count2)
+
+
+def _old_get_loading(currents_df, normalamps_df, ub1, ub2):
+    loadings = {}
+    count1 = 0
+    count2 = 0
+    for name in currents_df.Name.unique():
+        current_mag = []
+        for _, magnitude in currents_df.query(f"Name == '{name}'").iterrows():
+            current_mag.append(magnitude['Value'] / normalamps_df.iloc[0][f"{name}__NormalAmps"])
+        loadings[name] = max(current_mag)
+        if max(current_mag) > ub1:
+            count1 += 1
+        if max(current_mag) > ub2:
+            count2 += 1
+
+    max_loading = max(list(loadings.values()))
+    return loadings, max_loading, max_loading > ub1, count1, max_loading > ub2, count2
+
+
+@pytest.fixture
+def line_scenario():
+    # l1 has two terminals and a neutral; l2 is single phase.
+    return FakeScenario({
+        ("Lines", "Currents"): {
+            "Line.l1__A1": complex(300, 40),
+            "Line.l1__B1": complex(120, -10),
+            "Line.l1__C1": complex(-80, 60),
+            "Line.l1__N1": complex(5, 1),
+            "Line.l1__A2": complex(900, 0),
+            "Line.l1__B2": complex(10, 0),
+            "Line.l1__C2": complex(10, 0),
+            "Line.l1__N2": complex(0, 0),
+            "Line.l2__A1 [Amps]": complex(0, 95),
+            "Line.l2__N1 [Amps]": complex(0, 200),
+            "Line.l3__A1": complex(50, 0),
+            "Line.l3__B1": complex(40, 0),
+        },
+        ("Lines", "NormalAmps"): {
+            "Line.l1__NormalAmps": 200.0,
+            "Line.l2__NormalAmps": 100.0,
+            "Line.l3__NormalAmps": 400.0,
+        },
+        ("Transformers", "Currents"): {
+            "Transformer.t1__A1": complex(30, 4),
+            "Transformer.t1__B1": complex(12, 1),
+            "Transformer.t1__C1": complex(8, 6),
+            "Transformer.t1__N1": complex(1, 1),
+            "Transformer.t1__A2": complex(300, 0),
+            "Transformer.t2__A1": complex(16, 0),
+            "Transformer.t2__N1": complex(0, 2),
+        },
+        ("Transformers", "NormalAmps"): {
+            "Transformer.t1__NormalAmps": 25.0,
+            "Transformer.t2__NormalAmps": 10.0,
+        },
+    })
+
+
+def _read_normal_amps(scenario, class_name):
+    return scenario.get_full_dataframe(class_name, "NormalAmps")
+
+
+def test_read_element_values(line_scenario):
+    for class_name in ("Lines", "Transformers"):
+        expected = _old_normalize_dataframe_values(line_scenario, class_name, "Currents", 1,
+                                                   convert=True)
+        actual = _read_element_values(line_scenario, class_name, "Currents", 1, convert=True)
+        assert list(actual["Name"]) == list(expected["Name"])
+        assert list(actual["PhaseTerminal"]) == list(expected["PhaseTerminal"])
+        np.testing.assert_allclose(actual["Value"].values, expected["Value"].values)
+
+
+def test_get_line_loading(line_scenario):
+    currents = _old_normalize_dataframe_values(line_scenario, "Lines", "Currents", 1, convert=True)
+    normal_amps = _read_normal_amps(line_scenario, "Lines")
+    for ub1, ub2 in ((1.0, 1.5), (0.1, 2.0), (5.0, 6.0)):
+        expected = _old_get_loading(currents, normal_amps, ub1, ub2)
+        actual = _get_line_loading(currents, normal_amps, "job", ub1, ub2)
+        assert actual[0].keys() == expected[0].keys()
+        for name, value in expected[0].items():
+            assert actual[0][name] == pytest.approx(value)
+        assert actual[1] == pytest.approx(expected[1])
+        assert tuple(actual[2:]) == tuple(expected[2:])
+
+
+def test_get_transformer_loading(line_scenario):
+    currents = _old_normalize_dataframe_values(line_scenario, "Transformers", "Currents", 1,
+                                               convert=True)
+    normal_amps = _read_normal_amps(line_scenario, "Transformers")
+    index = _make_transformer_index(
+        pd.DataFrame({"Name": ["t1", "t2"], "NumWindings": [2, 2]}),
+        pd.DataFrame({
+            "Transformer": ["Transformer.t1", "Transformer.t2"],
+            "HighSideConnection": ["wye", "delta"],
+            "NumPhases": [3, 1],
+        }),
+    )
+    expected = _old_get_loading(currents, normal_amps, 1.0, 1.5)
+    actual = _get_transformer_loading(index, currents, normal_amps, 1.0, 1.5)
+    assert actual[0].keys() == expected[0].keys()
+    for name, value in expected[0].items():
+        assert actual[0][name] == pytest.approx(value)
+    assert actual[1] == pytest.approx(expected[1])
+    assert tuple(actual[2:]) == tuple(expected[2:])
+
+
+def test_count_voltage_violations():
+    voltages = np.array([1.0, 0.94, 0.95, 1.05, 1.06, 0.9, 1.2, 1.05833, 0.91667, 1.0])
+    bands = [(0.95, 1.05), (0.91667, 1.05833)]
+    vmin, vmax, violations = _count_voltage_violations(voltages, bands)
+    expected = _old_check_voltage_violations(list(voltages))
+    assert (vmin, vmax) == expected[:2]
+    assert tuple(violations[0]) == expected[2:6]
+    assert tuple(violations[1]) == expected[6:]
+
+
+def test_empty_inputs():
+    currents = pd.DataFrame({"Name": [], "PhaseTerminal": [], "Value": []})
+    normal_amps = pd.DataFrame({"Line.l1__NormalAmps": [1.0]})
+    with pytest.raises(ValueError):
+        _old_get_loading(currents, normal_amps, 1.0, 1.5)
+    with pytest.raises(ValueError):
+        _get_line_loading(currents, normal_amps, "job")
+
+    with pytest.raises(ValueError):
+        _old_check_voltage_violations([])
+    with pytest.raises(ValueError):
+        _count_voltage_violations(np.array([]), [(0.95, 1.05)])
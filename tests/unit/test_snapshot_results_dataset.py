@@ -0,0 +1,71 @@
+"""Tests for the per-job snapshot results dataset."""
+
+import os
+
+import pandas as pd
+
+from disco.analysis.snapshot_impact_analysis import (
+    list_results_dataset_feeders,
+    merge_results_dataset,
+    read_results_dataset,
+    write_results_dataset_part,
+)
+
+
+def _make_results(feeder, name, penetration, max_voltage=1.0):
+    return {
+        "feeder": feeder,
+        "name": name,
+        "deployment": "deployment1",
+        "placement": "random",
+        "penetration": penetration,
+        "max_voltage": max_voltage,
+        "overvoltage_A_flag": max_voltage > 1.05,
+        "overvoltage_A_count": 0,
+    }
+
+
+def test_parts_are_read_and_merged(tmp_path):
+    directory = str(tmp_path)
+    for i in range(3):
+        write_results_dataset_part(directory, _make_results("f1", f"f1__{i}", i * 10))
+    write_results_dataset_part(directory, _make_results("f2", "f2__0", 5))
+
+    assert list_results_dataset_feeders(directory) == ["f1", "f2"]
+    df = read_results_dataset(directory, "f1")
+    assert sorted(df["name"]) == ["f1__0", "f1__1", "f1__2"]
+    assert df["overvoltage_A_count"].dtype == "Int64"
+    assert df["overvoltage_A_flag"].dtype == "boolean"
+
+    merged = merge_results_dataset(directory, "f1")
+    assert os.listdir(os.path.join(directory, "f1")) == []
+    assert os.path.exists(os.path.join(directory, "f1.feather"))
+    assert list_results_dataset_feeders(directory) == ["f1", "f2"]
+    pd.testing.assert_frame_equal(read_results_dataset(directory, "f1"), merged)
+    pd.testing.assert_frame_equal(merged, df)
+
+
+def test_rerun_job_replaces_row(tmp_path):
+    directory = str(tmp_path)
+    write_results_dataset_part(directory, _make_results("f1", "f1__0", 0, 1.0))
+    write_results_dataset_part(directory, _make_results("f1", "f1__1", 10, 1.0))
+    merge_results_dataset(directory, "f1")
+
+    write_results_dataset_part(directory, _make_results("f1", "f1__1", 10, 1.1))
+    df = read_results_dataset(directory, "f1")
+    assert len(df) == 2
+    assert df.set_index("name").loc["f1__1", "max_voltage"] == 1.1
+
+    merge_results_dataset(directory, "f1")
+    df = read_results_dataset(directory, "f1")
+    assert len(df) == 2
+    assert df.set_index("name").loc["f1__1", "max_voltage"] == 1.1
+
+
+def test_merge_without_parts_is_noop(tmp_path):
+    directory = str(tmp_path)
+    write_results_dataset_part(directory, _make_results("f1", "f1__0", 0))
+    merge_results_dataset(directory, "f1")
+    mtime = os.path.getmtime(os.path.join(directory, "f1.feather"))
+    merge_results_dataset(directory, "f1")
+    assert os.path.getmtime(os.path.join(directory, "f1.feather")) == mtime
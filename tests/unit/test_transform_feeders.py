@@ -0,0 +1,37 @@
+"""Tests for transforming feeders in a process pool."""
+
+import os
+
+import pytest
+
+from disco.sources.base import transform_feeders
+
+
+class CountedArg:
+    """Counts how many times it is pickled in this process."""
+
+    num_pickled = 0
+
+    def __init__(self, value):
+        self.value = value
+
+    def __getstate__(self):
+        CountedArg.num_pickled += 1
+        return self.__dict__
+
+
+def _transform_feeder(feeder, arg, suffix):
+    return [f"{feeder}-{arg.value}{suffix}", os.getpid()]
+
+
+@pytest.mark.parametrize("num_processes", [1, 2])
+def test_transform_feeders(num_processes):
+    CountedArg.num_pickled = 0
+    feeders = [f"feeder{i}" for i in range(20)]
+    results = transform_feeders(
+        _transform_feeder, feeders, (CountedArg("x"), "!"), num_processes=num_processes
+    )
+
+    assert results[::2] == [f"{x}-x!" for x in feeders]
+    # Sent to each worker at most once, not with every feeder.
+    assert CountedArg.num_pickled <= num_processes
@@ -0,0 +1,62 @@
+"""Compares _TransformerCostIndex with the per-transformer lookups it replaced."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from disco.analysis.upgrade_cost_analysis import _TransformerCostIndex
+
+
+UNIT_COSTS = pd.DataFrame({
+    "system": ["pole", "pole", "pole", "pad", "substation"],
+    "rated_kva": [25.0, 50.0, 50.0, 100.0, 10000.0],
+    "install_cost": [1000.0, 2000.0, 2100.0, 3000.0, 500000.0],
+    "remove_cost": [100.0, 200.0, 210.0, 300.0, 50000.0],
+})
+
+
+def _old_unit_costs(kva, unit_cost_xfmrs):
+    rated_kva_list = [float(x) for x in unit_cost_xfmrs["rated_kva"]]
+    if kva > 5000:
+        rows = unit_cost_xfmrs[unit_cost_xfmrs["system"] == "substation"]
+    elif kva not in rated_kva_list:
+        closest_kva = min(unit_cost_xfmrs["rated_kva"], key=lambda x: abs(x - kva))
+        rows = unit_cost_xfmrs[unit_cost_xfmrs["rated_kva"] == closest_kva]
+    else:
+        rows = unit_cost_xfmrs[unit_cost_xfmrs["rated_kva"] == kva]
+    return rows.install_cost.iloc[0], rows.remove_cost.iloc[0]
+
+
+def test_matches_old_lookup():
+    kvas = np.array([10.0, 25.0, 37.5, 40.0, 50.0, 75.0, 100.0, 4000.0, 6000.0])
+    install, remove = _TransformerCostIndex(UNIT_COSTS).get_unit_costs(kvas)
+    for kva, install_cost, remove_cost in zip(kvas, install, remove):
+        assert (install_cost, remove_cost) == _old_unit_costs(kva, UNIT_COSTS)
+
+
+def test_nan_kvas_are_skipped():
+    kvas = np.array([np.nan, 50.0, np.nan])
+    install, remove = _TransformerCostIndex(UNIT_COSTS.iloc[:0]).get_unit_costs(kvas[[0, 2]])
+    assert np.isnan(install).all() and np.isnan(remove).all()
+
+    install, _ = _TransformerCostIndex(UNIT_COSTS).get_unit_costs(kvas)
+    assert np.isnan(install[0]) and install[1] == 2000.0 and np.isnan(install[2])
+
+
+def test_missing_substation_row():
+    unit_costs = UNIT_COSTS[UNIT_COSTS["system"] != "substation"]
+    with pytest.raises(IndexError):
+        _old_unit_costs(6000.0, unit_costs)
+    with pytest.raises(IndexError):
+        _TransformerCostIndex(unit_costs).get_unit_costs(np.array([50.0, 6000.0]))
+
+    install, _ = _TransformerCostIndex(unit_costs).get_unit_costs(np.array([50.0]))
+    assert install[0] == 2000.0
+
+
+def test_missing_rating_rows():
+    unit_costs = UNIT_COSTS.iloc[:0]
+    with pytest.raises(ValueError):
+        _old_unit_costs(50.0, unit_costs)
+    with pytest.raises(ValueError):
+        _TransformerCostIndex(unit_costs).get_unit_costs(np.array([50.0]))
@@ -0,0 +1,107 @@
+"""Tests for the persistent unit-cost database cache."""
+
+import os
+import stat
+
+import pandas as pd
+import pytest
+
+from disco.analysis import unit_cost_database
+from disco.analysis.unit_cost_database import UnitCostDatabase, load_unit_cost_database
+
+
+def _make_database(scale=1.0):
+    return UnitCostDatabase(
+        lines=pd.DataFrame({"description": ["a", "b"], "cost_per_m": [1.5 * scale, 2.0]}),
+        transformers=pd.DataFrame({"rated_kva": [25.0, 50.0], "total_cost": [100.0, 200.0]}),
+        control_changes=pd.DataFrame(
+            {"type": ["cap", "reg"], "total_cost": [10.0 * scale, 20.0]}
+        ).set_index("type"),
+        voltage_regulators=pd.DataFrame(
+            {"type": ["r1"], "total_cost": [30.0]}
+        ).set_index("type"),
+    )
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    filename = tmp_path / "inputs" / "costs.xlsx"
+    filename.parent.mkdir()
+    filename.write_bytes(b"version 1")
+    parsed = []
+
+    def from_excel(path):
+        parsed.append(path)
+        return _make_database(scale=len(parsed))
+
+    monkeypatch.setattr(UnitCostDatabase, "from_excel", staticmethod(from_excel))
+    monkeypatch.setattr(unit_cost_database, "_databases", {})
+    return filename, parsed
+
+
+def _assert_equal(db1, db2):
+    for name in UnitCostDatabase.SHEETS:
+        pd.testing.assert_frame_equal(getattr(db1, name), getattr(db2, name))
+
+
+def test_cache_round_trip(tmp_path, workbook):
+    filename, parsed = workbook
+    cache_dir = str(tmp_path / "cache")
+    database = load_unit_cost_database(str(filename), cache_dir=cache_dir)
+    assert load_unit_cost_database(str(filename), cache_dir=cache_dir) is database
+
+    # A new process reads the cache instead of the workbook.
+    unit_cost_database._databases.clear()
+    cached = load_unit_cost_database(str(filename), cache_dir=cache_dir)
+    assert len(parsed) == 1
+    _assert_equal(cached, database)
+    assert cached.get_control_change_cost("cap") == 10.0
+    assert not [x for x in os.listdir(cache_dir) if x.startswith(".tmp")]
+    assert os.listdir(filename.parent) == ["costs.xlsx"]
+
+
+def test_changed_workbook_replaces_entry(tmp_path, workbook):
+    filename, parsed = workbook
+    cache_dir = str(tmp_path / "cache")
+    load_unit_cost_database(str(filename), cache_dir=cache_dir)
+    entries = os.listdir(cache_dir)
+    assert len(entries) == 1
+
+    filename.write_bytes(b"version 2 is longer")
+    unit_cost_database._databases.clear()
+    database = load_unit_cost_database(str(filename), cache_dir=cache_dir)
+    assert len(parsed) == 2
+    assert database.get_control_change_cost("cap") == 20.0
+    new_entries = os.listdir(cache_dir)
+    assert len(new_entries) == 1
+    assert new_entries != entries
+
+
+def test_unwritable_cache_dir(tmp_path, workbook):
+    if os.geteuid() == 0:
+        pytest.skip("root can write to read-only directories")
+
+    filename, parsed = workbook
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    os.chmod(cache_dir, stat.S_IRUSR | stat.S_IXUSR)
+    try:
+        database = load_unit_cost_database(str(filename), cache_dir=str(cache_dir))
+    finally:
+        os.chmod(cache_dir, stat.S_IRWXU)
+    _assert_equal(database, _make_database())
+    assert os.listdir(cache_dir) == []
+
+
+def test_cache_dir_is_a_file(tmp_path, workbook):
+    filename, parsed = workbook
+    cache_dir = tmp_path / "cache"
+    cache_dir.write_text("")
+    database = load_unit_cost_database(str(filename), cache_dir=str(cache_dir))
+    _assert_equal(database, _make_database())
+
+
+def test_no_cache_dir(workbook):
+    filename, parsed = workbook
+    load_unit_cost_database(str(filename))
+    assert os.listdir(filename.parent) == ["costs.xlsx"]
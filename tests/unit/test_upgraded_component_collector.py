@@ -0,0 +1,84 @@
+"""Tests for reading component costs in UpgradedComponentCollector."""
+
+import os
+
+import pandas as pd
+
+from disco.analysis.upgrade_cost_analysis import (
+    DETAILED_LINE_COSTS_FILENAME,
+    DETAILED_TRANSFORMER_COSTS_FILENAME,
+    POST_PROCESS_DIRNAME,
+    SUMMARY_COSTS_FILENAME,
+)
+from disco.analysis.upgraded_component_collector import UpgradedComponentCollector
+
+
+def _write_job(job_dir, lines, transformers, summary=True):
+    path = os.path.join(job_dir, POST_PROCESS_DIRNAME)
+    os.makedirs(path)
+    if summary:
+        pd.DataFrame({"type": ["lines"], "count": [1], "total_cost_usd": [10.0]}).to_csv(
+            os.path.join(path, SUMMARY_COSTS_FILENAME), index=False
+        )
+    # Same layout as UpgradeCostAnalysis.get_thermal_costs.
+    for filename, records in (
+        (DETAILED_LINE_COSTS_FILENAME, lines),
+        (DETAILED_TRANSFORMER_COSTS_FILENAME, transformers),
+    ):
+        if records is not None:
+            df = pd.DataFrame(records, columns=["id", "new_equip_cost", "upgraded_equip_cost"])
+            df.to_csv(os.path.join(path, filename))
+
+
+def test_get_component_costs(tmp_path):
+    job_dir = str(tmp_path / "job1")
+    _write_job(
+        job_dir,
+        [("Line.l1", 0.0, 100.0), ("Line.l2", 50.0, 0.0)],
+        [("Transformer.t1", 0.0, 11329.0)],
+    )
+    collector = UpgradedComponentCollector(None, job_dir, None)
+    assert collector.get_component_costs() == [
+        {"name": "Line.l1", "new_equipment_cost": 0.0, "upgraded_equipment_cost": 100.0,
+         "type": "line"},
+        {"name": "Line.l2", "new_equipment_cost": 50.0, "upgraded_equipment_cost": 0.0,
+         "type": "line"},
+        {"name": "Transformer.t1", "new_equipment_cost": 0.0,
+         "upgraded_equipment_cost": 11329.0, "type": "transformer"},
+    ]
+
+
+def test_get_component_costs_without_summary(tmp_path):
+    job_dir = str(tmp_path / "job1")
+    _write_job(job_dir, [("Line.l1", 0.0, 100.0)], None, summary=False)
+    collector = UpgradedComponentCollector(None, job_dir, None)
+    assert collector.get_component_costs() == [
+        {"name": "Line.l1", "new_equipment_cost": 0.0, "upgraded_equipment_cost": 100.0,
+         "type": "line"},
+    ]
+
+
+def test_collect_component_costs(tmp_path):
+    job_dirs = {
+        "job1": str(tmp_path / "job1"),
+        "job2": str(tmp_path / "job2"),
+        "job3": str(tmp_path / "job3"),
+    }
+    _write_job(job_dirs["job1"], [("Line.l1", 0.0, 100.0)], [])
+    _write_job(job_dirs["job2"], [], [("Transformer.t1", 5.0, 0.0)])
+    # No thermal upgrades: the detailed files are not written.
+    _write_job(job_dirs["job3"], None, None)
+
+    df = UpgradedComponentCollector.collect_component_costs(job_dirs)
+    assert list(df.columns) == [
+        "job", "name", "new_equipment_cost", "upgraded_equipment_cost", "type"
+    ]
+    assert df.values.tolist() == [
+        ["job1", "Line.l1", 0.0, 100.0, "line"],
+        ["job2", "Transformer.t1", 5.0, 0.0, "transformer"],
+    ]
+
+    df = UpgradedComponentCollector.collect_component_costs({})
+    assert list(df.columns) == [
+        "job", "name", "new_equipment_cost", "upgraded_equipment_cost", "type"
+    ]